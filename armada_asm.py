@@ -0,0 +1,265 @@
+"""
+armada_asm.py
+
+Robot-T-ohjelmien assembleri, disassembleri ja binäärinen ohjelmakuva.
+- assemble(teksti) -> uint32-käskysanat; hyväksyy asm_from_wordin tulostaman muodon
+  (MOV R0, 5 / ADD R1, R2 / JMP 3 / SEN R0, 2 / ACT R1 / LDK R0, 4 / WRT 7 / NOP / OP77 1 2 3),
+  ja disassemble() tuottaa rivit joista assemble() antaa täsmälleen samat sanat
+- Lisäksi nimiöt (loop:) hyppykohteina, kommentit (; tai #), .word-raakasana ja
+  UI:n listauksen rivinumerot (003: MOV R0, 5)
+- Ohjelmakuva (.rbt): 16 tavun otsake + käskysanat little-endian uint32:na.
+  load_image() palauttaa memmap-näkymän ja image_from_bytes() np.frombuffer-näkymän,
+  joten kuva ladataan kopioimatta; Armada.load_program jakaa sen kaikille boteille.
+
+Otsake: magic b'RBTP', versio (u16), otsakkeen koko (u16), sanojen määrä (u32), varattu (u32).
+
+Käyttö:
+    python armada_asm.py asm forager.asm -o forager.rbt
+    python armada_asm.py dis forager.rbt
+    words = armada_asm.assemble(open('forager.asm').read())
+    world.load_program(armada_asm.load_image('forager.rbt'))
+"""
+
+import argparse
+import re
+import struct
+
+import numpy as np
+
+from armada_core import (OP_ACT, OP_ADD, OP_CMP, OP_JMP, OP_JZ, OP_LDK, OP_MOV, OP_NAMES, OP_NOP,
+                         OP_SEN, OP_SUB, OP_WRT, RAM_WORDS, asm_from_word, encode, program_ram)
+
+MAGIC = b'RBTP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+WORD = np.dtype('<u4')
+
+OPCODES = {name: op for op, name in OP_NAMES.items()}
+# operandimuodot kuten asm_from_word ne tulostaa
+ALU_OPS = (OP_MOV, OP_ADD, OP_SUB, OP_CMP)  # MN Ra, imm | MN Ra, Rb
+JUMP_OPS = (OP_JMP, OP_JZ)                  # MN kohde
+REG_IMM_OPS = (OP_SEN, OP_LDK)              # MN Ra, imm
+
+_LABEL = re.compile(r'^([A-Za-z_]\w*|\d+)\s*:\s*')
+
+
+# ---------------- Assembler ----------------
+def _byte(text, labels=None):
+    # luku 0..255 (desimaali tai 0x..) tai nimiö
+    if labels is not None and text in labels:
+        return labels[text]
+    try:
+        value = int(text, 0)
+    except ValueError:
+        raise ValueError(f'expected a number 0..255, got {text!r}') from None
+    if not 0 <= value <= 255:
+        raise ValueError(f'{value} does not fit in 8 bits')
+    return value
+
+
+def _register(text):
+    if text[:1] not in ('R', 'r'):
+        raise ValueError(f'expected a register R0..R255, got {text!r}')
+    return _byte(text[1:])
+
+
+def _is_register(text):
+    return text[:1] in ('R', 'r') and text[1:].isdigit()
+
+
+def assemble_line(text, labels=None):
+    # yksi käsky (ilman nimiötä / kommenttia) -> käskysana
+    name, _, rest = text.strip().partition(' ')
+    name = name.upper()
+    args = [a.strip() for a in rest.replace(',', ' ').split()]
+    if name == '.WORD':
+        if len(args) != 1:
+            raise ValueError('.word takes one value')
+        return int(args[0], 0) & 0xFFFFFFFF
+    if name in OPCODES:
+        op = OPCODES[name]
+    elif name.startswith('OP') and name[2:].isdigit():
+        op = _byte(name[2:])
+    else:
+        raise ValueError(f'unknown mnemonic {name!r}')
+
+    def need(n, form):
+        if len(args) != n:
+            raise ValueError(f'{name} takes {form}')
+
+    if op in ALU_OPS and name in OPCODES:
+        need(2, 'Ra, imm or Ra, Rb')
+        a = _register(args[0])
+        if _is_register(args[1]):
+            b = _register(args[1])
+            if b == 0:
+                # b == 0 tarkoittaa käskysanassa välitöntä arvoa, joten R0 ei kelpaa lähteeksi
+                raise ValueError(f'{name}: R0 cannot be the source register (b=0 selects imm)')
+            return int(encode(op, a, b, 0))
+        return int(encode(op, a, 0, _byte(args[1])))
+    if op in JUMP_OPS and name in OPCODES:
+        need(1, 'a target address or label')
+        return int(encode(op, _byte(args[0], labels)))
+    if op in REG_IMM_OPS and name in OPCODES:
+        need(2, 'Ra, imm')
+        return int(encode(op, _register(args[0]), 0, _byte(args[1])))
+    if op == OP_ACT and name in OPCODES:
+        need(1, 'Ra')
+        return int(encode(op, _register(args[0])))
+    if op == OP_WRT and name in OPCODES:
+        need(1, 'imm')
+        return int(encode(op, 0, 0, _byte(args[0])))
+    if op == OP_NOP and name in OPCODES and not args:
+        return 0
+    # raakamuoto: OPn a b imm (myös tunnetuille opcodeille)
+    need(3, 'a b imm')
+    return int(encode(op, _byte(args[0]), _byte(args[1]), _byte(args[2])))
+
+
+def _split(source):
+    # -> [(rivinumero, nimiöt, käsky tai '')]
+    out = []
+    for lineno, line in enumerate(source.splitlines(), 1):
+        line = re.split(r'[;#]', line, maxsplit=1)[0].strip()
+        labels = []
+        m = _LABEL.match(line)
+        while m:
+            labels.append(m.group(1))
+            line = line[m.end():]
+            m = _LABEL.match(line)
+        out.append((lineno, labels, line))
+    return out
+
+
+def assemble(source):
+    # assembly-teksti -> np.uint32-taulukko (yksi sana per käsky)
+    lines = _split(source)
+    labels = {}
+    pc = 0
+    for lineno, names, text in lines:
+        for name in names:
+            if name.isdigit():
+                continue  # UI-listauksen rivinumero, ei nimiö
+            if name in labels:
+                raise ValueError(f'line {lineno}: label {name!r} defined twice')
+            labels[name] = pc
+        pc += bool(text)
+    if pc > RAM_WORDS:
+        raise ValueError(f'program has {pc} instructions, RAM holds {RAM_WORDS}')
+    words = []
+    for lineno, _, text in lines:
+        if text:
+            try:
+                words.append(assemble_line(text, labels))
+            except ValueError as e:
+                raise ValueError(f'line {lineno}: {e}') from None
+    return np.array(words, dtype=np.uint32)
+
+
+def disassemble_word(word):
+    # asm_from_word, tai .word jos rivi ei kokoonnu takaisin samaksi sanaksi
+    # (esim. NOP jonka kentät eivät ole nollia tai JMP jolla on imm)
+    line = asm_from_word(word)
+    try:
+        if assemble_line(line) == int(word):
+            return line
+    except ValueError:
+        pass
+    return f'.word 0x{int(word):08X}'
+
+
+def disassemble(words, numbered=False):
+    # käskysanat -> rivit; loppuosan nollasanat jätetään pois
+    words = np.asarray(words, dtype=np.uint32)
+    nz = np.flatnonzero(words)
+    end = int(nz[-1]) + 1 if len(nz) else 0
+    lines = [disassemble_word(w) for w in words[:end].tolist()]
+    if numbered:
+        lines = [f'{i:03}: {ln}' for i, ln in enumerate(lines)]
+    return lines
+
+
+# ---------------- Binary program images ----------------
+def image_bytes(words, pad=True):
+    # pad=True: runko on täysi RAM (RAM_WORDS sanaa), jolloin ladattu näkymä kelpaa
+    # program_ram()ille sellaisenaan eikä sitä tarvitse kopioida
+    words = np.asarray(words, dtype=np.uint32)
+    if pad:
+        words = program_ram(words)
+    return HEADER.pack(MAGIC, VERSION, HEADER.size, len(words), 0) + words.astype(WORD).tobytes()
+
+
+def _parse_header(head):
+    if len(head) < HEADER.size:
+        raise ValueError('truncated program image header')
+    magic, version, size, count, _ = HEADER.unpack_from(head)
+    if magic != MAGIC:
+        raise ValueError(f'not a Robot-T program image (magic {magic!r})')
+    if version != VERSION:
+        raise ValueError(f'unsupported program image version {version}')
+    return size, count
+
+
+def image_from_bytes(buf):
+    # bytes/bytearray/mmap -> vain luku uint32-näkymä puskuriin (np.frombuffer, ei kopiota)
+    size, count = _parse_header(bytes(memoryview(buf)[:HEADER.size]))
+    words = np.frombuffer(buf, dtype=WORD, count=count, offset=size)
+    if words.flags.writeable:
+        words = words.view()
+        words.flags.writeable = False
+    return words
+
+
+def save_image(path, words, pad=True):
+    with open(path, 'wb') as f:
+        f.write(image_bytes(words, pad))
+    return path
+
+
+def load_image(path, mmap=True):
+    # mmap=True: np.memmap tiedostoon (vain luku), muuten tiedosto luetaan muistiin
+    with open(path, 'rb') as f:
+        size, count = _parse_header(f.read(HEADER.size))
+    if mmap:
+        return np.memmap(path, dtype=WORD, mode='r', offset=size, shape=(count,))
+    with open(path, 'rb') as f:
+        return image_from_bytes(f.read())
+
+
+def is_image(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_program(path):
+    # .rbt-kuva (tunnistetaan otsakkeesta) tai assembly-teksti -> käskysanat
+    if is_image(path):
+        return load_image(path)
+    with open(path) as f:
+        return assemble(f.read())
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Assemble and disassemble Robot-T programs.')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    asm = sub.add_parser('asm', help='assembly text -> binary image')
+    asm.add_argument('src')
+    asm.add_argument('-o', '--out')
+    asm.add_argument('--no-pad', action='store_true', help='store only the program words, not a full RAM')
+    dis = sub.add_parser('dis', help='binary image or assembly -> listing')
+    dis.add_argument('src')
+    dis.add_argument('-n', '--numbered', action='store_true')
+    args = ap.parse_args()
+
+    if args.cmd == 'asm':
+        words = read_program(args.src)
+        out = args.out or re.sub(r'\.\w+$', '', args.src) + '.rbt'
+        save_image(out, words, pad=not args.no_pad)
+        print(f'{len(disassemble(words))} instructions -> {out}')
+    else:
+        for line in disassemble(read_program(args.src), args.numbered):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1447 @@
+"""
+armada_core.py
+
+Robot-T armadan simulaatioydin ilman pygamea (x_botsArmada.py on sen käyttöliittymä).
+- Armada: maailma joka omistaa botit, resurssit (ResourceIndex) ja jaetun
+  tietovaraston (KnowledgeStore) sekä oman satunnaislähteensä
+- Bot: RAM, rekisterit, tulkki (HANDLERS + JIT) ja aikaviipaleet (run_slice)
+- ArmadaVM: kaikkien bottien lockstep-suoritus numpy-taulukoilla
+- Armada.step() ajaa yhden ruudun; Armada.run() monta ruutua täydellä nopeudella
+
+Käyttö:
+    from armada_core import Armada, encode, OP_MOV, OP_SEN, OP_ACT, OP_JMP
+    world = Armada(n_bots=1000, n_resources=200, seed=1)
+    world.load_program([encode(OP_MOV, 1, 0, 2), encode(OP_SEN, 0, 0, 2),
+                        encode(OP_ACT, 1), encode(OP_JMP, 1)])
+    world.run(2000, budget=16, use_vm=True)
+"""
+
+import hashlib
+import math
+import random
+from collections import Counter
+
+import numpy as np
+
+# ---------------- Config ----------------
+WIDTH, HEIGHT = 500, 500
+BOT_RADIUS = 3
+N_AGENTS = 5
+FOV_DEG = 30
+FOV_RANGE = 75
+FOV_STEP_DEG = 6  # FOV-kaaren pisteiden väli piirrossa (FOV_CONE)
+FOV_CELL = 25  # PointGridin ruudun koko: kartion rajaava laatikko kattaa vain muutaman ruudun
+N_SENSORS = 5  # SEN 0..4, ks. Bot.sensor (3 = resurssit ja 4 = botit näkökartiossa)
+BOT_SPEED = 2.0
+RAM_WORDS = 256  # 1 KB (256 * 4 bytes)
+STEP_COST = 0.02  # energiaa per käsky
+CYCLES_PER_FRAME = 1  # käskybudjetti per botti per ruutu, ks. Bot.run_slice
+JIT = True  # run_slice ajaa peruslohkot käännettyinä Python-funktioina (jit_program)
+
+# Opcodes (8-bit)
+OP_NOP  = 0
+OP_MOV  = 1
+OP_ADD  = 2
+OP_SUB  = 3
+OP_JMP  = 4
+OP_JZ   = 5
+OP_CMP  = 6
+OP_SEN  = 7
+OP_ACT  = 8
+OP_LDK  = 9
+OP_WRT  = 10
+
+OP_NAMES = {
+    OP_NOP: "NOP", OP_MOV: "MOV", OP_ADD: "ADD", OP_SUB: "SUB",
+    OP_JMP: "JMP", OP_JZ: "JZ", OP_CMP: "CMP", OP_SEN: "SEN",
+    OP_ACT: "ACT", OP_LDK: "LDK", OP_WRT: "WRT"
+}
+
+# Registers indices
+R0, R1, R2, R3 = 0, 1, 2, 3
+NREG = 4
+
+# Shared knowledge repository
+KNOWLEDGE_CAPACITY = 256  # LDK:n osoite (imm) kattaa koko ikkunan
+
+class KnowledgeStore:
+    """
+    Rajattu jaettu tietovarasto (korvaa kasvavan REPO-listan).
+    - Rengaspuskuri: capacity tavua, append ja indeksiluku O(1), muisti ei kasva
+    - Indeksi on ikkunan sisäinen: 0 = vanhin vielä tallessa oleva merkintä.
+      Kunnes kapasiteetti täyttyy, tämä on sama kuin vanha REPO[i].
+    - writers: jokaisen merkinnän kirjoittaneen botin id rinnakkaisessa int32-taulukossa
+    - snapshot()/export() antavat ikkunan vanhimmasta uusimpaan
+    """
+
+    def __init__(self, capacity=KNOWLEDGE_CAPACITY):
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=np.uint8)
+        self.writers = np.full(capacity, -1, dtype=np.int32)
+        self.total = 0  # kaikki koskaan kirjoitetut (total - len = ylikirjoitetut)
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def _start(self):
+        return self.total % self.capacity if self.total > self.capacity else 0
+
+    def append(self, value, writer=-1):
+        i = self.total % self.capacity
+        self.values[i] = value & 0xFF
+        self.writers[i] = writer
+        self.total += 1
+
+    def extend(self, values, writers=-1):
+        # monta merkintää kerralla (ArmadaVM); vain viimeiset capacity jäävät
+        values = np.asarray(values, dtype=np.int64) & 0xFF
+        writers = np.broadcast_to(np.asarray(writers, dtype=np.int32), values.shape)
+        n = len(values)
+        if n > self.capacity:
+            self.total += n - self.capacity
+            values, writers, n = values[-self.capacity:], writers[-self.capacity:], self.capacity
+        idx = (self.total + np.arange(n)) % self.capacity
+        self.values[idx] = values
+        self.writers[idx] = writers
+        self.total += n
+
+    def read(self, i, default=0):
+        # LDK: ikkunan i:s merkintä tai default
+        if 0 <= i < len(self):
+            return int(self.values[(self._start() + i) % self.capacity])
+        return default
+
+    def window(self):
+        # (values, writers) vanhimmasta uusimpaan
+        order = (self._start() + np.arange(len(self))) % self.capacity
+        return self.values[order], self.writers[order]
+
+    def tail(self, n):
+        return self.window()[0][-n:].tolist() if n else []
+
+    def clear(self):
+        self.total = 0
+
+    def snapshot(self):
+        values, writers = self.window()
+        return {'values': values, 'writers': writers, 'total': np.int64(self.total),
+                'capacity': np.int64(self.capacity)}
+
+    def export(self, path):
+        np.savez(path, **self.snapshot())
+        return path
+
+    @classmethod
+    def from_snapshot(cls, snap):
+        store = cls(int(snap['capacity']))
+        store.total = int(snap['total']) - len(snap['values'])
+        store.extend(snap['values'], snap['writers'])  # samoihin rengaspaikkoihin kuin alun perin
+        return store
+
+# --- Helpers for encoding/decoding 32-bit instruction words ---
+def encode(op, a=0, b=0, imm=0):
+    return np.uint32((op & 0xFF) << 24 | (a & 0xFF) << 16 | (b & 0xFF) << 8 | (imm & 0xFF))
+
+def decode(word):
+    w = int(np.uint32(word))
+    op = (w >> 24) & 0xFF
+    a  = (w >> 16) & 0xFF
+    b  = (w >> 8) & 0xFF
+    imm= w & 0xFF
+    return op, a, b, imm
+
+def asm_from_word(word):
+    op, a, b, imm = decode(word)
+    name = OP_NAMES.get(op, f"OP{op}")
+    if op in (OP_MOV, OP_ADD, OP_SUB, OP_CMP):
+        # format common: MN A, B/IMM
+        if b == 0:
+            return f"{name} R{a}, {imm}"
+        else:
+            return f"{name} R{a}, R{b}"
+    elif op in (OP_JMP, OP_JZ):
+        return f"{name} {a}"
+    elif op == OP_SEN:
+        return f"{name} R{a}, {imm}"
+    elif op == OP_ACT:
+        return f"{name} R{a}"
+    elif op == OP_LDK:
+        return f"{name} R{a}, {imm}"
+    elif op == OP_WRT:
+        return f"{name} {imm}"
+    elif op == OP_NOP:
+        return "NOP"
+    else:
+        return f"{name} {a} {b} {imm}"
+
+# --- Predecoded programs + dispatch table for Bot.step ---
+# Jokainen handler saa (bot, a, b, imm) ja palauttaa hyppyosoitteen tai None (pc + 1).
+# Rekisteri-indeksit >= NREG luetaan nollana ja kirjoitukset niihin ohitetaan.
+def _reg(bot, idx):
+    return int(bot.reg[idx]) if idx < NREG else 0
+
+def _set_reg(bot, idx, val):
+    if idx < NREG:
+        bot.reg[idx] = int(val)
+
+def _op_nop(bot, a, b, imm):
+    return None
+
+def _op_mov(bot, a, b, imm):
+    _set_reg(bot, a, imm if b == 0 else _reg(bot, b))
+
+def _op_add(bot, a, b, imm):
+    _set_reg(bot, a, _reg(bot, a) + (_reg(bot, b) if b != 0 else imm))
+
+def _op_sub(bot, a, b, imm):
+    _set_reg(bot, a, _reg(bot, a) - (_reg(bot, b) if b != 0 else imm))
+
+def _op_jmp(bot, a, b, imm):
+    return a % RAM_WORDS
+
+def _op_jz(bot, a, b, imm):
+    return a % RAM_WORDS if bot.zero_flag else None
+
+def _op_cmp(bot, a, b, imm):
+    bot.zero_flag = (_reg(bot, a) == (_reg(bot, b) if b != 0 else imm))
+
+def _op_sen(bot, a, b, imm):
+    _set_reg(bot, a, int(bot.sensor(imm)))
+
+def _op_act(bot, a, b, imm):
+    bot.act(_reg(bot, a))
+
+def _op_ldk(bot, a, b, imm):
+    _set_reg(bot, a, bot.world.repo.read(imm))
+
+def _op_wrt(bot, a, b, imm):
+    bot.world.repo.append(imm, bot.id)
+
+# tuntemattomat opcodet käyttäytyvät kuten NOP
+HANDLERS = [_op_nop] * 256
+HANDLERS[OP_MOV] = _op_mov
+HANDLERS[OP_ADD] = _op_add
+HANDLERS[OP_SUB] = _op_sub
+HANDLERS[OP_JMP] = _op_jmp
+HANDLERS[OP_JZ] = _op_jz
+HANDLERS[OP_CMP] = _op_cmp
+HANDLERS[OP_SEN] = _op_sen
+HANDLERS[OP_ACT] = _op_act
+HANDLERS[OP_LDK] = _op_ldk
+HANDLERS[OP_WRT] = _op_wrt
+
+# käskyt jotka lukevat tai muuttavat maailmaa / tietovarastoa päättävät bottien aikaviipaleen
+YIELD_OPS = (OP_SEN, OP_ACT, OP_LDK, OP_WRT)
+YIELD_HANDLERS = frozenset(HANDLERS[op] for op in YIELD_OPS)
+REG_WRITE_OPS = (OP_MOV, OP_ADD, OP_SUB, OP_SEN, OP_LDK)  # kirjoittavat rekisteriin Ra
+
+def program_ram(words):
+    # ohjelma -> RAM_WORDS-sanainen vain luku -taulukko, jonka monta bottia voi jakaa
+    # (Bot.share_ram). Täysi RAM-kuva (esim. armada_asm.load_image) käytetään sellaisenaan.
+    words = np.asarray(words)
+    if words.dtype == np.uint32 and words.shape == (RAM_WORDS,) and not words.flags.writeable:
+        return words
+    if len(words) > RAM_WORDS:
+        raise ValueError(f'program has {len(words)} words, RAM holds {RAM_WORDS}')
+    ram = np.zeros(RAM_WORDS, dtype=np.uint32)
+    ram[:len(words)] = words
+    ram.flags.writeable = False
+    return ram
+
+def decode_fields(ram):
+    # koko RAM kerralla -> (op, a, b, imm) -taulukot
+    ram = np.asarray(ram, dtype=np.uint32)
+    return ((ram >> 24) & 0xFF, (ram >> 16) & 0xFF, (ram >> 8) & 0xFF, ram & 0xFF)
+
+def decode_program(ram):
+    # RAM -> tuple of (handler, a, b, imm), yksi per sana
+    op, a, b, imm = (f.tolist() for f in decode_fields(ram))
+    return tuple((HANDLERS[o], x, y, z) for o, x, y, z in zip(op, a, b, imm))
+
+# --- Basic-block JIT: RAM-ohjelman lohkot Python-funktioiksi ---
+# Lohko alkaa mistä tahansa pc:stä ja seuraa MOV/ADD/SUB/CMP/NOP-käskyjä ja hyppyjä
+# (JMP jatkaa kohteesta, JZ:n ohitus jatkaa seuraavasta). Hyppy lohkon alkuun on
+# silmukka funktion sisällä, joten tiukka sisäsilmukka pyörii ilman tulkkia.
+# Yield-käskyt, tuntemattomat opcodet ja hypyt itseensä jäävät tulkille (Bot.step).
+# Rekisterit ovat paikallisia int-muuttujia; jokainen käsky tarkistaa energian ja
+# budjetin ja vähentää STEP_COST kuten Bot.step, joten tulos on sama kuin tulkilla.
+# Lohko käännetään vasta kun sen alkuun on tultu JIT_THRESHOLD kertaa.
+JIT_OPS = (OP_NOP, OP_MOV, OP_ADD, OP_SUB, OP_CMP, OP_JMP, OP_JZ)
+JIT_MAX_BLOCK = 64
+JIT_THRESHOLD = 32
+JIT_CACHE_SIZE = 4096
+_JIT_CACHE = {}  # RAM-sisällön tiiviste -> JitProgram (samaa ohjelmaa ajavat botit jakavat koodin)
+
+def _jit_reg(idx):
+    return f"r{idx}" if idx < NREG else "0"
+
+def _jit_ok(ops, aa, pc):
+    # hyppy itseensä jätetään tulkille, joka lopettaa aikaviipaleen (run_slice)
+    return ops[pc] in JIT_OPS and not (ops[pc] in (OP_JMP, OP_JZ) and aa[pc] % RAM_WORDS == pc)
+
+def compile_block(fields, start):
+    # fields: (op, a, b, imm) -listat koko RAMille. Palauttaa funktion f(bot, limit) ->
+    # ajettujen käskyjen määrä (1..limit), tai None jos pc:n käskyä JIT ei käännä.
+    ops, aa, bb, imms = fields
+    if not _jit_ok(ops, aa, start):
+        return None
+    body = []  # lähdekoodirivejä tai ("exit"/"raise", sisennys, pc) -paikkoja
+    used, written, zflag = set(), set(), False
+    visited = set()
+    pc = start
+
+    def goto(target, indent):
+        # siirtyminen käskyyn target: silmukka alkuun, paluu tulkille tai jatko (None)
+        if target == start:
+            body.append(" " * indent + "continue")
+        elif target in visited or len(visited) >= JIT_MAX_BLOCK or not _jit_ok(ops, aa, target):
+            body.append(("exit", indent, target))
+        else:
+            return target
+        return None
+
+    while pc is not None:
+        visited.add(pc)
+        op, a, b, imm = ops[pc], aa[pc], bb[pc], imms[pc]
+        operand = _jit_reg(b) if b != 0 else str(imm)
+        if op in (OP_MOV, OP_ADD, OP_SUB, OP_CMP):
+            used.update(i for i in (a, b) if i < NREG)
+        body += ["        if e <= 0 or n >= limit:", ("exit", 12, pc)]
+        if op == OP_MOV and a < NREG:
+            body.append(f"        r{a} = {operand}")
+            written.add(a)
+        elif op in (OP_ADD, OP_SUB) and a < NREG:
+            # ylivuoto kuten numpy-rekisterin kirjoitus Bot.stepissä: aiemmat käskyt jäävät voimaan
+            body += [f"        v = r{a} {'+' if op == OP_ADD else '-'} {operand}",
+                     "        if not -2147483648 <= v <= 2147483647:",
+                     ("raise", 12, pc),
+                     f"        r{a} = v"]
+            written.add(a)
+        elif op == OP_CMP:
+            body.append(f"        z = {_jit_reg(a)} == {operand}")
+            zflag = True
+        body += ["        e -= C", "        n += 1"]
+        if op == OP_JMP:
+            pc = goto(a % RAM_WORDS, 8)
+        elif op == OP_JZ:
+            zflag = True
+            body.append("        if z:")
+            target = goto(a % RAM_WORDS, 12)
+            if target is not None:
+                body.append(("exit", 12, target))
+            pc = goto((pc + 1) % RAM_WORDS, 8)
+        else:
+            pc = goto((pc + 1) % RAM_WORDS, 8)
+
+    # paluukohdissa kirjoitetaan takaisin kaikki lohkon muuttamat rekisterit
+    # (vielä muuttamattomat ovat alkuarvoissaan, joten aikainen paluu on oikein)
+    saved = "(" + "".join(f"({k}, r{k}), " for k in sorted(written)) + ")"
+    src = ["def block(bot, limit):", "    reg = bot.reg"]
+    src += [f"    r{k} = int(reg[{k}])" for k in sorted(used | written)]
+    if zflag:
+        src.append("    z = bot.zero_flag")
+    src += ["    e = bot.energy", "    n = 0", "    while True:"]
+    for line in body:
+        if isinstance(line, str):
+            src.append(line)
+            continue
+        kind, indent, target = line
+        call = f"_exit(bot, reg, {saved}, {'z' if zflag else 'None'}, e, {target}, n)"
+        if kind == "raise":
+            src += [" " * indent + call,
+                    " " * indent + "raise OverflowError(f'Python integer {v} out of bounds for int32')"]
+        else:
+            src.append(" " * indent + "return " + call)
+    source = "\n".join(src)
+    ns = {"_exit": _jit_exit, "C": STEP_COST}
+    exec(compile(source, f"<jit block {start}>", "exec"), ns)
+    block = ns["block"]
+    block.source = source
+    return block
+
+def _jit_exit(bot, reg, written, z, e, pc, n):
+    for k, v in written:
+        reg[k] = v
+    if z is not None:
+        bot.zero_flag = z
+    bot.energy = e
+    bot.pc = pc
+    return n
+
+class JitProgram:
+    # Yhden RAM-sisällön käännetyt lohkot; lohko käännetään ensimmäisellä käyttökerralla
+    def __init__(self, ram):
+        self.fields = tuple(f.tolist() for f in decode_fields(ram))
+        self.blocks = {}
+        self.hits = {}
+
+    def block(self, pc):
+        # käännetty lohko tai None (kylmä tai ei käännettävissä -> tulkki)
+        try:
+            return self.blocks[pc]
+        except KeyError:
+            pass
+        hits = self.hits[pc] = self.hits.get(pc, 0) + 1
+        if hits < JIT_THRESHOLD:
+            return None
+        blk = self.blocks[pc] = compile_block(self.fields, pc)
+        return blk
+
+def jit_program(ram):
+    key = hashlib.blake2b(np.ascontiguousarray(ram, dtype=np.uint32).tobytes(), digest_size=16).digest()
+    prog = _JIT_CACHE.get(key)
+    if prog is None:
+        if len(_JIT_CACHE) >= JIT_CACHE_SIZE:
+            _JIT_CACHE.clear()
+        prog = _JIT_CACHE[key] = JitProgram(ram)
+    return prog
+
+# ---------------- Legibility Evaluator ----------------
+LONG_LINE = 80
+LEGIBILITY_CACHE_SIZE = 4096
+_LEGIBILITY_CACHE = {}  # RAM-sisällön tiiviste -> legibility_score
+
+def legibility_score(source_lines):
+    """
+    Compute a 0..100 readability score for an assembly-like source (list of lines).
+    Heuristics:
+      - shorter average line length -> better
+      - fewer excessively long lines (>80 chars) -> better
+      - higher variety of instructions (not repeating same line) -> better
+      - presence of multiple opcodes -> slightly better
+    This is intentionally simple and fast — it's a heuristic "legibility" signal used as part of a penalty.
+    """
+    if not source_lines:
+        return 100.0
+
+    # clean lines
+    lines = [ln.strip() for ln in source_lines if ln.strip()]
+    if not lines:
+        return 100.0
+
+    opcodes = [ln.split()[0] for ln in lines]
+    return _legibility(len(lines), sum(len(ln) for ln in lines), sum(1 for ln in lines if len(ln) > LONG_LINE),
+                       len(set(lines)), len(set(opcodes)))
+
+def _legibility(n, total_len, long_lines, unique_lines, unique_opcodes):
+    # legibility_score tilastoista; toimii myös numpy-taulukoilla (legibility_scores)
+    vec = isinstance(n, np.ndarray)
+    avg_len = total_len / n
+    long_lines_ratio = long_lines / n
+
+    # repetitiveness: unique lines ratio
+    unique_ratio = unique_lines / n
+
+    # opcode diversity
+    opcode_diversity = unique_opcodes / n
+
+    # heuristic penalties/bonuses
+    score = 100.0
+
+    # average line length penalty (scaled)
+    over = avg_len - 40.0
+    score -= (np.maximum(over, 0.0) if vec else max(0.0, over)) * 0.6  # lines longer than 40 cost points
+
+    # long line heavy penalty
+    score -= long_lines_ratio * 20.0
+
+    # repetitiveness penalty
+    score -= (1.0 - unique_ratio) * 30.0
+
+    # opcode diversity bonus
+    score += opcode_diversity * 10.0
+
+    # clamp
+    if vec:
+        return np.clip(score, 0.0, 100.0)
+    score = max(0.0, min(100.0, score))
+    return score
+
+class LegibilityStats:
+    """
+    legibility_scoren juoksevat tilastot yhdelle ohjelmalle (Bot.get_program_lines).
+    add() kun käsky lisätään loppuun ja clear() kun RAM tyhjennetään; score() lasketaan
+    laskureista eikä rivejä käydä uudelleen läpi.
+    """
+
+    def __init__(self, lines=()):
+        self.clear()
+        for ln in lines:
+            self.add(ln)
+
+    def clear(self):
+        self.lines = []
+        self.total_len = 0
+        self.long_lines = 0
+        self.line_counts = Counter()
+        self.opcode_counts = Counter()
+        self._score = 100.0
+
+    def add(self, line):
+        line = line.strip()
+        if not line:
+            return
+        self.lines.append(line)
+        self.total_len += len(line)
+        self.long_lines += len(line) > LONG_LINE
+        self.line_counts[line] += 1
+        self.opcode_counts[line.split()[0]] += 1
+        self._score = None
+
+    def score(self):
+        if self._score is None:
+            self._score = _legibility(len(self.lines), self.total_len, self.long_lines,
+                                      len(self.line_counts), len(self.opcode_counts))
+        return self._score
+
+def legibility_of(ram):
+    # legibility_score(RAMin ohjelmarivit), muistissa RAM-sisällön tiivisteen mukaan
+    # (samaa ohjelmaa ajavat botit ja toistuvat kutsut eivät dekoodaa uudelleen)
+    ram = np.ascontiguousarray(ram, dtype=np.uint32)
+    key = hashlib.blake2b(ram.tobytes(), digest_size=16).digest()
+    score = _LEGIBILITY_CACHE.get(key)
+    if score is None:
+        if len(_LEGIBILITY_CACHE) >= LEGIBILITY_CACHE_SIZE:
+            _LEGIBILITY_CACHE.clear()
+        zero = np.flatnonzero(ram == 0)
+        end = int(zero[0]) if len(zero) else len(ram)
+        score = _LEGIBILITY_CACHE[key] = legibility_score([asm_from_word(w) for w in ram[:end].tolist()])
+    return score
+
+def _digits(x):
+    return 1 + (x >= 10) + (x >= 100)
+
+_NAME_LEN = np.array([len(OP_NAMES.get(op, f"OP{op}")) for op in range(256)], dtype=np.int64)
+
+def legibility_scores(rams):
+    """
+    legibility_score koko populaatiolle kerralla: rams on (n, RAM_WORDS) -taulukko,
+    tulos float64-taulukko (n,), sama arvo kuin legibility_of(rams[i]).
+    Rivien pituudet lasketaan asm_from_wordin muodoista kenttien numeroiden määrällä
+    ja samat rivit tunnistetaan kanonisista sanoista (kentät joita rivi ei näytä nollattu).
+    """
+    rams = np.atleast_2d(np.asarray(rams, dtype=np.uint32))
+    op, a, b, imm = (f.astype(np.int64) for f in decode_fields(rams))
+    valid = np.logical_and.accumulate(rams != 0, axis=1)  # ohjelma päättyy ensimmäiseen nollaan
+    n = valid.sum(axis=1)
+
+    name = _NAME_LEN[op]
+    alu = np.isin(op, (OP_MOV, OP_ADD, OP_SUB, OP_CMP))
+    reg_b = alu & (b != 0)
+    jump = np.isin(op, (OP_JMP, OP_JZ))
+    reg_imm = np.isin(op, (OP_SEN, OP_LDK))
+    act, wrt, nop = op == OP_ACT, op == OP_WRT, op == OP_NOP
+    other = ~(alu | jump | reg_imm | act | wrt | nop)
+    length = np.select(
+        [reg_b, alu | reg_imm, jump, act, wrt, nop],
+        [name + 5 + _digits(a) + _digits(b), name + 4 + _digits(a) + _digits(imm), name + 1 + _digits(a),
+         name + 2 + _digits(a), name + 1 + _digits(imm), np.full_like(op, 3)],
+        name + 3 + _digits(a) + _digits(b) + _digits(imm))
+    # rivin kanoninen sana: vain ne kentät jotka asm_from_word tulostaa
+    keep = np.select(
+        [reg_b, alu | reg_imm, jump | act, wrt, nop, other],
+        [0xFFFFFF00, 0xFFFF00FF, 0xFFFF0000, 0xFF0000FF, 0xFF000000, 0xFFFFFFFF]).astype(np.uint32)
+    canon = np.where(valid, (rams & keep).astype(np.int64), -1)
+    ops = np.where(valid, op, -1)
+
+    def distinct(x):
+        x = np.sort(x, axis=1)
+        d = 1 + (np.diff(x, axis=1) != 0).sum(axis=1)
+        return d - (x[:, 0] == -1)  # -1 = ohjelman ulkopuolinen sana
+
+    total_len = np.where(valid, length, 0).sum(axis=1)
+    long_lines = (valid & (length > LONG_LINE)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = _legibility(n, total_len, long_lines, distinct(canon), distinct(ops))
+    return np.where(n == 0, 100.0, scores)
+
+# ---------------- Field of view ----------------
+# Yksikkökartio lasketaan kerran: kärki + kaaren pisteet kulmissa -FOV_DEG/2 .. +FOV_DEG/2.
+# fov_polygons() kiertää ja siirtää sen kaikille boteille yhdellä taulukko-operaatiolla.
+_FOV_OFFSETS = np.radians(np.linspace(-FOV_DEG / 2, FOV_DEG / 2, int(FOV_DEG // FOV_STEP_DEG) + 1))
+FOV_CONE = np.vstack([[0.0, 0.0], np.column_stack([np.cos(_FOV_OFFSETS), np.sin(_FOV_OFFSETS)])]) * FOV_RANGE
+COS_HALF_FOV = math.cos(math.radians(FOV_DEG / 2))
+
+def fov_polygons(xs, ys, angles):
+    # (n,) paikat ja suunnat asteina -> (n, len(FOV_CONE), 2) monikulmiot
+    rad = np.radians(np.asarray(angles, dtype=float))
+    c, s = np.cos(rad)[:, None], np.sin(rad)[:, None]
+    ux, uy = FOV_CONE[:, 0], FOV_CONE[:, 1]
+    return np.stack([np.asarray(xs, dtype=float)[:, None] + c * ux - s * uy,
+                     np.asarray(ys, dtype=float)[:, None] + s * ux + c * uy], axis=-1)
+
+def _in_cone(dx, dy, c, s, sqrt=np.sqrt):
+    # kohde (dx, dy) katsojasta, c/s = katselusuunnan cos/sin: etäisyys <= FOV_RANGE ja
+    # kulma <= FOV_DEG/2 (samassa pisteessä oleva näkyy). Skalaareille sqrt=math.sqrt;
+    # laskujärjestys on sama, joten Bot.sensor ja ArmadaVM saavat saman tuloksen.
+    d2 = dx * dx + dy * dy
+    return (d2 <= FOV_RANGE * FOV_RANGE) & (dx * c + dy * s >= COS_HALF_FOV * sqrt(d2))
+
+class PointGrid:
+    """
+    Muuttumaton tilannekuva pisteistä tasavälisessä ruudukossa numpy-taulukkoina
+    (pisteet ruuduittain lajiteltuina, kuten ResourceIndex._snapshot).
+    count_in_cones() laskee kaikille kyselyille näkökartiossa olevat pisteet kerralla.
+    """
+
+    def __init__(self, xs, ys, ids=None, cell=FOV_CELL):
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        self.cell = cell
+        self.n = len(xs)
+        ids = np.arange(self.n) if ids is None else np.asarray(ids)
+        cx = np.floor(xs / cell).astype(np.int64)
+        cy = np.floor(ys / cell).astype(np.int64)
+        self.x0, self.y0 = (int(cx.min()), int(cy.min())) if self.n else (0, 0)
+        self.nx = int(cx.max()) - self.x0 + 1 if self.n else 1
+        self.ny = int(cy.max()) - self.y0 + 1 if self.n else 1
+        cid = (cx - self.x0) * self.ny + cy - self.y0
+        order = np.argsort(cid, kind="stable")
+        self.px, self.py, self.ids = xs[order], ys[order], ids[order]
+        self.starts = np.searchsorted(cid[order], np.arange(self.nx * self.ny + 1))
+
+    def pairs(self, xs, ys, radius, box=None):
+        # (kysely, piste) -parit joiden ruudut ovat enintään radius päässä kyselyn ruudusta;
+        # box = (x_lo, x_hi, y_lo, y_hi) per kysely rajaa pois ruudut laatikon ulkopuolelta
+        reach = math.ceil(radius / self.cell)
+        qx = np.floor(xs / self.cell).astype(np.int64) - self.x0
+        qy = np.floor(ys / self.cell).astype(np.int64) - self.y0
+        q_all = np.arange(len(xs))
+        out_q, out_p = [], []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                cx, cy = qx + dx, qy + dy
+                ok = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+                if box is not None:
+                    left, top = (cx + self.x0) * self.cell, (cy + self.y0) * self.cell
+                    ok &= ((left + self.cell >= box[0]) & (left <= box[1])
+                           & (top + self.cell >= box[2]) & (top <= box[3]))
+                c = cx[ok] * self.ny + cy[ok]
+                lo, hi = self.starts[c], self.starts[c + 1]
+                cnt = hi - lo
+                total = int(cnt.sum())
+                if not total:
+                    continue
+                out_q.append(np.repeat(q_all[ok], cnt))
+                out_p.append(np.repeat(lo - np.cumsum(cnt) + cnt, cnt) + np.arange(total))
+        if not out_q:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(out_q), np.concatenate(out_p)
+
+    def count_in_cones(self, xs, ys, angles, exclude=None):
+        # näkökartiossa olevien pisteiden määrä jokaiselle kyselylle;
+        # exclude[i] = id jota kysely i ei laske (botti itse)
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        k = len(xs)
+        if not self.n or not k:
+            return np.zeros(k, dtype=np.int64)
+        # kartion rajaava laatikko monikulmiosta (kaari pullistuu jänteiden yli < 1 px)
+        poly = fov_polygons(xs, ys, angles)
+        lo, hi = poly.min(axis=1) - 1.0, poly.max(axis=1) + 1.0
+        qi, pi = self.pairs(xs, ys, FOV_RANGE, (lo[:, 0], hi[:, 0], lo[:, 1], hi[:, 1]))
+        rad = np.radians(np.asarray(angles, dtype=float))
+        c, s = np.cos(rad), np.sin(rad)
+        ok = _in_cone(self.px[pi] - xs[qi], self.py[pi] - ys[qi], c[qi], s[qi])
+        if exclude is not None:
+            ok &= self.ids[pi] != np.asarray(exclude)[qi]
+        return np.bincount(qi[ok], minlength=k)
+
+    def count_in_cone(self, x, y, angle, exclude=None):
+        return int(self.count_in_cones([x], [y], [angle], None if exclude is None else [exclude])[0])
+
+# ---------------- World (resources) ----------------
+RESOURCE_COUNT = 12
+RESOURCE_ENERGY = 8  # ACT syö resurssin (dist < 2): energiaa +8, enintään MAX_ENERGY
+MAX_ENERGY = 200
+RESOURCE_CELL = 32  # ResourceIndex-ruudun koko pikseleinä
+
+class ResourceIndex:
+    """
+    Resurssit tasavälisessä ruudukossa: lähin resurssi ja poisto ilman koko listan läpikäyntiä.
+    Käyttäytyy kuin vanha resources-lista (iterointi, len, remove((x, y))).
+    nearest() palauttaa saman kuin min((math.hypot(rx - x, ry - y), rx, ry) for ...),
+    myös tasapeleissä; nearest_many() tekee saman kaikille kyselypisteille kerralla.
+    """
+
+    def __init__(self, points=(), cell=RESOURCE_CELL):
+        self.cell = cell
+        self._cells = {}  # (cx, cy) -> [(x, y), ...]
+        self._n = 0
+        self._bounds = None  # (min cx, min cy, max cx, max cy), kasvaa vain
+        self._arrays = None  # nearest_many:n lajiteltu kopio, nollataan muutoksissa
+        self._grid = None  # count_in_cones:n PointGrid, nollataan muutoksissa
+        for p in points:
+            self.add(p)
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    def add(self, p):
+        key = self._key(*p)
+        self._cells.setdefault(key, []).append(p)
+        self._n += 1
+        b = self._bounds
+        self._bounds = key + key if b is None else (min(b[0], key[0]), min(b[1], key[1]),
+                                                    max(b[2], key[0]), max(b[3], key[1]))
+        self._arrays = self._grid = None
+
+    def remove(self, p):
+        # kuten list.remove: ValueError jos pistettä ei ole
+        items = self._cells.get(self._key(*p))
+        if not items:
+            raise ValueError(f"{p} not in resources")
+        items.remove(p)
+        if not items:
+            del self._cells[self._key(*p)]
+        self._n -= 1
+        self._arrays = self._grid = None
+
+    def clear(self):
+        self._cells.clear()
+        self._n = 0
+        self._bounds = self._arrays = self._grid = None
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for items in list(self._cells.values()):
+            yield from items
+
+    def __contains__(self, p):
+        return p in self._cells.get(self._key(*p), ())
+
+    # --- kyselyt ---
+
+    def _rings(self, cx, cy):
+        # renkaat r = 0, 1, ... kunnes koko käytössä oleva ruudukko on katettu
+        x0, y0, x1, y1 = self._bounds
+        last = max(cx - x0, x1 - cx, cy - y0, y1 - cy, 0)
+        for r in range(last + 1):
+            if r == 0:
+                yield r, ((cx, cy),)
+                continue
+            ring = [(cx + dx, cy + dy) for dx in range(-r, r + 1) for dy in (-r, r)]
+            ring += [(cx + dx, cy + dy) for dx in (-r, r) for dy in range(-r + 1, r)]
+            yield r, ring
+
+    def nearest(self, x, y):
+        # (dist, rx, ry) tai None jos resursseja ei ole
+        if not self._n:
+            return None
+        best = None
+        cells = self._cells
+        for r, ring in self._rings(*self._key(x, y)):
+            # renkaan r jälkeen kaikki käymättömät ovat vähintään r * cell päässä
+            if best is not None and (r - 1) * self.cell > best[0]:
+                break
+            for key in ring:
+                for rx, ry in cells.get(key, ()):
+                    cand = (math.hypot(rx - x, ry - y), rx, ry)
+                    if best is None or cand < best:
+                        best = cand
+        return best
+
+    def _snapshot(self):
+        # pisteet ruuduittain lajiteltuina + ruutujen alkuindeksit (kuten oxoplect_vec.VecGrid)
+        if self._arrays is None:
+            x0, y0, x1, y1 = self._bounds
+            nx, ny = x1 - x0 + 1, y1 - y0 + 1
+            pts = [p for items in self._cells.values() for p in items]
+            px = np.array([p[0] for p in pts], dtype=float)
+            py = np.array([p[1] for p in pts], dtype=float)
+            cid = ((np.floor(px / self.cell).astype(np.int64) - x0) * ny
+                   + np.floor(py / self.cell).astype(np.int64) - y0)
+            order = np.argsort(cid, kind="stable")
+            starts = np.searchsorted(cid[order], np.arange(nx * ny + 1))
+            self._arrays = (pts, order, px[order], py[order], starts, nx, ny)
+        return self._arrays
+
+    def nearest_many(self, xs, ys):
+        # Lähin resurssi jokaiselle (xs[i], ys[i]) -> (dist, rx, ry, found) -taulukot;
+        # dist = 999.0 ja found = False jos resursseja ei ole.
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        k = len(xs)
+        dist = np.full(k, 999.0)
+        rx, ry = np.zeros(k), np.zeros(k)
+        found = np.zeros(k, dtype=bool)
+        if not self._n or not k:
+            return dist, rx, ry, found
+        pts, order, px, py, starts, nx, ny = self._snapshot()
+        x0, y0 = self._bounds[:2]
+        qx = np.floor(xs / self.cell).astype(np.int64) - x0
+        qy = np.floor(ys / self.cell).astype(np.int64) - y0
+        last = np.maximum.reduce([qx, nx - 1 - qx, qy, ny - 1 - qy, np.zeros(k, dtype=np.int64)])
+        best = np.full(k, np.inf)
+        pairs_q, pairs_p = [], []
+        active = np.arange(k)
+        r = 0
+        while len(active):
+            offs = [(0, 0)] if r == 0 else (
+                [(dx, dy) for dx in range(-r, r + 1) for dy in (-r, r)]
+                + [(dx, dy) for dx in (-r, r) for dy in range(-r + 1, r)])
+            for dx, dy in offs:
+                cx, cy = qx[active] + dx, qy[active] + dy
+                ok = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+                q = active[ok]
+                c = cx[ok] * ny + cy[ok]
+                lo, hi = starts[c], starts[c + 1]
+                cnt = hi - lo
+                if not cnt.sum():
+                    continue
+                qi = np.repeat(q, cnt)
+                pi = np.repeat(lo - np.cumsum(cnt) + cnt, cnt) + np.arange(cnt.sum())
+                d2 = (px[pi] - xs[qi]) ** 2 + (py[pi] - ys[qi]) ** 2
+                np.minimum.at(best, qi, d2)
+                pairs_q.append(qi)
+                pairs_p.append(pi)
+            # valmis kun kaikki käymättömät ovat kauempana kuin paras (pieni varmuusmarginaali)
+            done = (r * self.cell > np.sqrt(best[active]) * (1 + 1e-9) + 1e-9) | (r >= last[active])
+            active = active[~done]
+            r += 1
+        qi, pi = np.concatenate(pairs_q), np.concatenate(pairs_p)
+        d2 = (px[pi] - xs[qi]) ** 2 + (py[pi] - ys[qi]) ** 2
+        keep = d2 <= best[qi] * (1 + 1e-9) + 1e-12
+        qi, pi = qi[keep], order[pi[keep]]
+        # tarkka valinta math.hypotilla, kuten nearest()
+        cands = {}
+        for q, p in zip(qi.tolist(), pi.tolist()):
+            cands.setdefault(q, []).append(p)
+        xl, yl = xs.tolist(), ys.tolist()
+        for q, plist in cands.items():
+            x, y = xl[q], yl[q]
+            d, bx, by = min((math.hypot(pts[p][0] - x, pts[p][1] - y), pts[p][0], pts[p][1]) for p in plist)
+            dist[q], rx[q], ry[q], found[q] = d, bx, by, True
+        return dist, rx, ry, found
+
+    def count_in_cone(self, x, y, angle):
+        # näkökartiossa (FOV_DEG, FOV_RANGE) olevat resurssit; käy läpi vain kartion ruudut
+        if not self._n:
+            return 0
+        rad = math.radians(angle)
+        c, s = math.cos(rad), math.sin(rad)
+        cx, cy = self._key(x, y)
+        reach = math.ceil(FOV_RANGE / self.cell)
+        cells = self._cells
+        n = 0
+        for kx in range(cx - reach, cx + reach + 1):
+            for ky in range(cy - reach, cy + reach + 1):
+                for rx, ry in cells.get((kx, ky), ()):
+                    n += _in_cone(rx - x, ry - y, c, s, math.sqrt)
+        return n
+
+    def count_in_cones(self, xs, ys, angles):
+        # count_in_cone kaikille kyselyille kerralla
+        if self._grid is None:
+            pts = list(self)
+            self._grid = PointGrid([p[0] for p in pts], [p[1] for p in pts], cell=self.cell)
+        return self._grid.count_in_cones(xs, ys, angles)
+
+# ---------------- Bot Class with Interpreter ----------------
+class Bot:
+    def __init__(self, x, y, angle, idnum, world=None):
+        self.world = world  # Armada: resurssit, tietovarasto ja satunnaislähde
+        self.x = float(x)
+        self.y = float(y)
+        self.angle = float(angle)
+        self.id = idnum
+        self.ram = np.zeros(RAM_WORDS, dtype=np.uint32)
+        self.reg = np.zeros(NREG, dtype=np.int32)
+        self.pc = 0
+        self.zero_flag = False
+        self.energy = 100.0
+        # boot small program (optional) - leave zeros by default
+        self.init_ptr = 0
+        # predecoded RAM, ks. program(); None = dekoodataan seuraavalla stepillä
+        self._decoded = None
+        self._jit = None  # JitProgram, ks. run_slice
+        self._legibility = None  # LegibilityStats ohjelmariveille, ks. legibility()
+        self.ipf = 0  # edellisen ruudun käskymäärä (run_slice)
+
+    def find_next_free(self):
+        # find first index from 0 where ram==0 (treat 0 as free)
+        nz = np.nonzero(self.ram)[0]
+        if len(nz) == 0:
+            return 0
+        # find first gap after last nonzero? We'll append after last nonzero index
+        last = int(nz.max())
+        if last + 1 < RAM_WORDS:
+            return last + 1
+        # wrap search for any zero
+        zeros = np.where(self.ram == 0)[0]
+        if zeros.size > 0:
+            return int(zeros[0])
+        return 0  # fallback
+
+    def _own_ram(self):
+        # jaettu (vain luku) ohjelma kopioidaan botille ennen ensimmäistä kirjoitusta
+        if not self.ram.flags.writeable:
+            self.ram = self.ram.copy()
+
+    def append_instr(self, word):
+        self._own_ram()
+        idx = self.find_next_free()
+        self.ram[idx] = word
+        self._decoded = self._jit = None
+        stats = self._legibility
+        if stats is not None and word:
+            # lisäys ohjelman loppuun päivittää tilastot; muu kirjoitus (RAM täynnä) nollaa ne
+            if idx == len(stats.lines):
+                stats.add(asm_from_word(word))
+            elif idx < len(stats.lines):
+                self._legibility = None
+        return idx
+
+    def clear_ram(self):
+        self._own_ram()
+        self.ram.fill(0)
+        self.pc = 0
+        self._decoded = self._jit = None
+        if self._legibility is not None:
+            self._legibility.clear()
+
+    def load_words(self, words):
+        # koko ohjelma kerralla (RAMin alusta, loppu nolliksi) ilman append_instr-kierrosta
+        self._own_ram()
+        n = min(len(words), RAM_WORDS)
+        self.ram[:n] = words[:n]
+        self.ram[n:] = 0
+        self.pc = 0
+        self._decoded = self._jit = self._legibility = None
+
+    def share_ram(self, ram, decoded=None, jit=None):
+        # ohjelma ilman kopiota: ram on program_ram()-taulukko (tai sen memmap-näkymä), jota
+        # moni botti lukee; dekoodaus ja JIT voidaan antaa valmiina samalle ohjelmalle
+        self.ram = ram
+        self.pc = 0
+        self._decoded, self._jit = decoded, jit
+        self._legibility = None
+
+    def get_program_lines(self):
+        lines = []
+        # decode until a zero or RAM_WORDS
+        for w in self.ram:
+            if int(w) == 0:
+                break
+            lines.append(asm_from_word(w))
+        return lines
+
+    def program_lines(self):
+        # get_program_lines välimuistista (rivit pidetään ajan tasalla append_instr/clear_ram)
+        if self._legibility is None:
+            self._legibility = LegibilityStats(self.get_program_lines())
+        return self._legibility.lines
+
+    def legibility(self):
+        # legibility_score(get_program_lines()) ilman uudelleendekoodausta joka ruudulla
+        if self._legibility is not None:
+            return self._legibility.score()
+        return legibility_of(self.ram)
+
+    # Interpreter step: RAM on dekoodattu valmiiksi (decode_program) ja
+    # käsky ajetaan HANDLERS-taulun kautta. Välimuisti nollataan kun RAMiin kirjoitetaan.
+    def program(self):
+        if self._decoded is None:
+            self._decoded = decode_program(self.ram)
+        return self._decoded
+
+    def step(self):
+        if self.energy <= 0:
+            return
+        prog = self._decoded
+        if prog is None:
+            prog = self.program()
+        handler, a, b, imm = prog[self.pc]
+        jump = handler(self, a, b, imm)
+        self.energy -= STEP_COST
+        self.pc = (self.pc + 1) % RAM_WORDS if jump is None else jump
+
+    def run_slice(self, budget=CYCLES_PER_FRAME):
+        # Ajaa käskyjä kunnes budjetti tai energia loppuu, ajettiin maailmaan koskeva
+        # käsky (SEN/ACT/LDK/WRT = yield) tai hyppy osoitti itseensä (ikuinen silmukka).
+        # Jokainen käsky maksaa STEP_COST, joten energia rajoittaa budjettia.
+        # JIT: kuumat lohkot ajetaan käännettyinä, muut käskyt tulkilla.
+        tracer = self.world.tracer if self.world is not None else None
+        if tracer is not None:
+            return self._run_slice_traced(budget, tracer)
+        n = 0
+        jit = None
+        if JIT:
+            jit = self._jit
+            if jit is None:
+                jit = self._jit = jit_program(self.ram)
+        while n < budget and self.energy > 0:
+            pc = self.pc
+            if jit is not None:
+                block = jit.block(pc)
+                if block is not None:
+                    n += block(self, budget - n)
+                    continue
+            handler = self.program()[pc][0]
+            self.step()
+            n += 1
+            if handler in YIELD_HANDLERS or self.pc == pc:
+                break
+        self.ipf = n
+        return n
+
+    def _run_slice_traced(self, budget, tracer):
+        # run_slice käsky kerrallaan tulkilla (ei JITiä), jokainen käsky tracer.recordiin
+        n = 0
+        tick = self.world.frames
+        while n < budget and self.energy > 0:
+            pc = self.pc
+            handler, a, b, imm = self.program()[pc]
+            op = int(self.ram[pc]) >> 24
+            reg = a if op in REG_WRITE_OPS and a < NREG else -1
+            before = int(self.reg[reg]) if reg >= 0 else 0
+            self.step()
+            n += 1
+            tracer.record(tick, self.id, pc, op, reg, int(self.reg[reg]) - before if reg >= 0 else 0,
+                          self.zero_flag, self.energy)
+            if handler in YIELD_HANDLERS or self.pc == pc:
+                break
+        self.ipf = n
+        return n
+
+    # primitives
+    def sensor(self, sensor_id):
+        if sensor_id == 0:
+            dist_left = self.x
+            dist_right = WIDTH - self.x
+            dist_top = self.y
+            dist_bottom = HEIGHT - self.y
+            return int(min(dist_left, dist_right, dist_top, dist_bottom))
+        elif sensor_id == 1:
+            return int((math.sin(self.x / 30.0) + math.cos(self.y / 30.0)) * 50 + 50)
+        elif sensor_id == 2:
+            nearest = self.world.resources.nearest(self.x, self.y)
+            return int(nearest[0]) if nearest else 999
+        elif sensor_id == 3:
+            # resurssit näkökartiossa
+            return self.world.resources.count_in_cone(self.x, self.y, self.angle)
+        elif sensor_id == 4:
+            # muut botit näkökartiossa (paikat ruudun alusta, Armada.bot_grid)
+            return self.world.bot_grid().count_in_cone(self.x, self.y, self.angle, self.id)
+        else:
+            return 0
+
+    def act(self, val):
+        if val <= 0:
+            return
+        resources = self.world.resources
+        nearest = resources.nearest(self.x, self.y)
+        if nearest:
+            dist, rx, ry = nearest
+            if dist < 2:
+                try:
+                    resources.remove((rx, ry))
+                except ValueError:
+                    pass
+                before = self.energy
+                self.energy = min(MAX_ENERGY, self.energy + RESOURCE_ENERGY)
+                self.world.resource_energy += self.energy - before
+            else:
+                step = min(BOT_SPEED * (val / 2.0), 2.0)
+                ang = math.atan2(ry - self.y, rx - self.x)
+                self.x += math.cos(ang) * step
+                self.y += math.sin(ang) * step
+        self.x = max(BOT_RADIUS, min(WIDTH - BOT_RADIUS, self.x))
+        self.y = max(BOT_RADIUS, min(HEIGHT - BOT_RADIUS, self.y))
+
+    def wander(self):
+        rad = math.radians(self.angle)
+        self.x += math.cos(rad) * (BOT_SPEED * 0.15)
+        self.y += math.sin(rad) * (BOT_SPEED * 0.15)
+        if self.x <= BOT_RADIUS or self.x >= WIDTH - BOT_RADIUS:
+            self.angle = (180 - self.angle) % 360
+        if self.y <= BOT_RADIUS or self.y >= HEIGHT - BOT_RADIUS:
+            self.angle = (-self.angle) % 360
+        self.angle += self.world.rng.uniform(-8, 8)
+        self.angle %= 360
+
+    def hud_lines(self):
+        return [
+            f"ID:{self.id} PC:{self.pc} E:{self.energy:.1f}",
+            f"R0:{self.reg[0]} R1:{self.reg[1]} Z:{int(self.zero_flag)}",
+            f"ProgLines:{len(self.program_lines())} REPO:{len(self.world.repo)} IPF:{self.ipf}"
+        ]
+
+# ---------------- Lockstep VM (all bots at once) ----------------
+class ArmadaVM:
+    """
+    Kaikkien bottien RAM (N, RAM_WORDS) ja rekisterit (N, NREG) yhtenä taulukkona.
+    tick() ajaa yhden käskyn jokaiselle botille kerralla opcode-maskeilla; tulos on
+    sama kuin `for bot in bots: bot.step()` samassa järjestyksessä:
+    - ACT-kulutukset ratkaistaan bottien järjestyksessä (resurssi poistuu myöhemmiltä)
+    - LDK näkee samalla tickillä aiemmilta boteilta tulleet WRT-merkinnät
+    - SEN 3 näkee resurssit joita aiemmat botit eivät ole syöneet; SEN 4 käyttää
+      ruudun alun paikkoja (Armada.bot_grid) kuten Bot.sensor
+    wander() vastaa Bot.wanderia (world.rng.uniform samassa järjestyksessä).
+    Rekisterin ylivuoto nostaa OverflowErrorin kuten Bot.step, mutta ennen kuin
+    yhtäkään bottia on muutettu.
+    """
+
+    def __init__(self, n, world):
+        self.world = world
+        self.ram = np.zeros((n, RAM_WORDS), dtype=np.uint32)
+        self.reg = np.zeros((n, NREG), dtype=np.int32)
+        self.pc = np.zeros(n, dtype=np.int64)
+        self.zero_flag = np.zeros(n, dtype=bool)
+        self.energy = np.full(n, 100.0)
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.angle = np.zeros(n)
+        self.ipf = np.zeros(n, dtype=np.int64)
+        self.ids = np.arange(n, dtype=np.int32)  # bottien id:t (KnowledgeStore-kirjoittajat)
+        self.share = True
+        self._ram_src = [None] * n  # bot.ram-olio josta rivi viimeksi luettiin, ks. load()
+
+    @classmethod
+    def from_bots(cls, bots, share=True, world=None):
+        # share=True: bot.ram ja bot.reg korvataan näkymillä VM:n riveihin, jolloin
+        # ohjelmointi-UI:n kirjoitukset näkyvät suoraan VM:lle
+        vm = cls(len(bots), world if world is not None else bots[0].world if bots else None)
+        vm.share = share
+        for i, bot in enumerate(bots):
+            vm.ids[i] = bot.id
+            vm.ram[i] = bot.ram
+            vm.reg[i] = bot.reg
+            if share:
+                bot.ram, bot.reg = vm.ram[i], vm.reg[i]
+            vm._ram_src[i] = bot.ram
+        vm.load(bots)
+        return vm
+
+    def load(self, bots):
+        # skalaaritila boteista (esim. clear_ram nollaa bot.pc:n). Jos botin RAM-olio on
+        # vaihtunut (Bot.share_ram tai kirjoitusta varten tehty kopio), rivi kopioidaan kerran;
+        # kirjoitettava kopio korvataan taas näkymällä VM:n riviin (share=True).
+        src = self._ram_src
+        for i, bot in enumerate(bots):
+            ram = bot.ram
+            if ram is not src[i]:
+                if ram.base is not self.ram:
+                    self.ram[i] = ram
+                    if self.share and ram.flags.writeable:
+                        bot.ram = ram = self.ram[i]
+                src[i] = ram
+            self.pc[i], self.zero_flag[i], self.energy[i] = bot.pc, bot.zero_flag, bot.energy
+            self.x[i], self.y[i], self.angle[i] = bot.x, bot.y, bot.angle
+
+    def store(self, bots):
+        pc, zf, energy = self.pc.tolist(), self.zero_flag.tolist(), self.energy.tolist()
+        x, y, angle = self.x.tolist(), self.y.tolist(), self.angle.tolist()
+        for i, bot in enumerate(bots):
+            bot.pc, bot.zero_flag, bot.energy = pc[i], zf[i], energy[i]
+            bot.x, bot.y, bot.angle = x[i], y[i], angle[i]
+            bot.ipf = int(self.ipf[i])
+            if bot.ram.base is not self.ram and bot.ram.flags.writeable:
+                bot.ram[:] = self.ram[i]
+                bot._decoded = bot._jit = bot._legibility = None
+            if bot.reg.base is not self.reg:
+                bot.reg[:] = self.reg[i]
+
+    # --- resurssit ---
+
+    def _resolve_resources(self, rows, px, py, consumer):
+        # rows: botit (nousevassa järjestyksessä) jotka tarvitsevat lähimmän resurssin.
+        # consumer[j] = True jos rivi j on ACT (kuluttaa resurssin jos dist < 2).
+        # Palauttaa (dist, rx, ry, has) per rivi ja poistaa kulutetut resurssit;
+        # eaten = [(j, rx, ry)] poistojärjestyksessä.
+        resources = self.world.resources
+        dist, nx, ny, has = resources.nearest_many(px, py)
+        dist = dist.tolist()
+        eaten = []
+        for j in range(len(rows)):
+            if consumer[j] and has[j] and dist[j] < 2:
+                gone = (nx[j], ny[j])
+                resources.remove(gone)
+                eaten.append((j, gone[0], gone[1]))
+                # vain ne myöhemmät joiden lähin oli poistettu resurssi haetaan uudelleen
+                later = np.arange(j + 1, len(rows))
+                moved = later[has[later] & (nx[later] == gone[0]) & (ny[later] == gone[1])]
+                for m in moved.tolist():
+                    nearest = resources.nearest(px[m], py[m])
+                    if nearest:
+                        dist[m], nx[m], ny[m] = nearest
+                    else:
+                        dist[m], has[m] = 999.0, False
+        return dist, nx, ny, has, eaten
+
+    # --- suoritus ---
+
+    def tick(self, rows=None):
+        # rows: valinnainen bool-maski; vain ne botit ajavat käskyn tällä tickillä
+        live = np.flatnonzero(self.energy > 0 if rows is None else rows & (self.energy > 0))
+        k = len(live)
+        if not k:
+            return
+        pc = self.pc[live]
+        op, a, b, imm = (f.astype(np.int64) for f in decode_fields(self.ram[live, pc]))
+        regs = self.reg[live].astype(np.int64)
+        rows = np.arange(k)
+
+        def read(idx):
+            out = np.zeros(k, dtype=np.int64)
+            ok = idx < NREG
+            out[ok] = regs[rows[ok], idx[ok]]
+            return out
+
+        ra = read(a)
+        operand = np.where(b != 0, read(b), imm)
+        value = np.zeros(k, dtype=np.int64)
+        writes = np.zeros(k, dtype=bool)
+
+        m = op == OP_MOV
+        value[m], writes[m] = operand[m], True
+        m = op == OP_ADD
+        value[m], writes[m] = ra[m] + operand[m], True
+        m = op == OP_SUB
+        value[m], writes[m] = ra[m] - operand[m], True
+
+        # SEN 0/1/muut
+        sen = op == OP_SEN
+        x, y = self.x[live], self.y[live]
+        m = sen & (imm == 0)
+        value[m] = np.minimum(np.minimum(x[m], WIDTH - x[m]), np.minimum(y[m], HEIGHT - y[m])).astype(np.int64)
+        m = sen & (imm == 1)
+        value[m] = ((np.sin(x[m] / 30.0) + np.cos(y[m] / 30.0)) * 50 + 50).astype(np.int64)
+        writes |= sen
+
+        # LDK / WRT: LDK näkee aiemmin tällä tickillä kirjoitetut merkinnät. Ikkuna siirtyy
+        # jokaisen kirjoituksen myötä kun varasto on täynnä, kuten peräkkäisillä append-kutsuilla.
+        wrt = np.flatnonzero(op == OP_WRT)
+        markers = imm[wrt] & 0xFF
+        ldk = np.flatnonzero(op == OP_LDK)
+        if len(ldk):
+            repo = self.world.repo
+            n0 = len(repo)
+            known = np.concatenate([repo.window()[0].astype(np.int64), markers])
+            before = n0 + np.searchsorted(wrt, ldk)  # ikkuna + aiemmat kirjoitukset
+            offset = np.maximum(0, before - repo.capacity)
+            pos = imm[ldk]
+            ok = pos < before - offset
+            value[ldk] = known[np.where(ok, offset + pos, 0)] * ok if len(known) else 0
+            writes[ldk] = True
+
+        # SEN 2 ja ACT: lähin resurssi bottien järjestyksessä
+        act = op == OP_ACT
+        acting = act & (ra > 0)
+        need = np.flatnonzero((sen & (imm == 2)) | acting)
+        dist, nx, ny, has, eaten = self._resolve_resources(need, x[need], y[need], acting[need].tolist())
+        sen2 = ~acting[need]
+        value[need[sen2]] = np.array([int(d) for d, s in zip(dist, sen2.tolist()) if s], dtype=np.int64)
+
+        # SEN 3: resurssit näkökartiossa. Haku tehdään tickin poistojen jälkeen, ja
+        # myöhempien rivien syömät lisätään takaisin (ne olivat vielä paikallaan).
+        m = np.flatnonzero(sen & (imm == 3))
+        if len(m):
+            ang = self.angle[live[m]]
+            seen = self.world.resources.count_in_cones(x[m], y[m], ang)
+            if eaten:
+                er = need[[j for j, _, _ in eaten]]
+                ex = np.array([e[1] for e in eaten], dtype=float)
+                ey = np.array([e[2] for e in eaten], dtype=float)
+                rad = np.radians(ang)[:, None]
+                later = er[None, :] > m[:, None]
+                seen += (later & _in_cone(ex[None, :] - x[m][:, None], ey[None, :] - y[m][:, None],
+                                          np.cos(rad), np.sin(rad))).sum(axis=1)
+            value[m] = seen
+        # SEN 4: muut botit näkökartiossa ruudun alun paikoista
+        m = np.flatnonzero(sen & (imm == 4))
+        if len(m):
+            value[m] = self.world.bot_grid().count_in_cones(x[m], y[m], self.angle[live[m]], self.ids[live[m]])
+
+        # kaikki rekisterikirjoitukset; ylivuoto kuten Bot.step (int32)
+        wa = writes & (a < NREG)
+        if np.any((value[wa] < -2**31) | (value[wa] >= 2**31)):
+            bad = live[wa][(value[wa] < -2**31) | (value[wa] >= 2**31)][0]
+            raise OverflowError(f'bot {bad}: register value out of bounds for int32')
+        self.reg[live[wa], a[wa]] = value[wa]
+        if len(wrt):
+            self.world.repo.extend(markers, self.ids[live[wrt]])
+
+        m = op == OP_CMP
+        self.zero_flag[live[m]] = ra[m] == operand[m]
+
+        # ACT: kulutus tai liike kohti lähintä, sitten rajaus
+        energy = self.energy[live]
+        arows = need[acting[need]]
+        ad = np.array(dist)[acting[need]]
+        ahas = has[acting[need]]
+        atx, aty = nx[acting[need]], ny[acting[need]]
+        eat = ahas & (ad < 2)
+        if eat.any():
+            before = energy[arows[eat]]
+            energy[arows[eat]] = np.minimum(MAX_ENERGY, before + RESOURCE_ENERGY)
+            self.world.resource_energy += float((energy[arows[eat]] - before).sum())
+        mv = ahas & ~eat
+        if mv.any():
+            r = arows[mv]
+            step = np.minimum(BOT_SPEED * (ra[r] / 2.0), 2.0)
+            ang = np.array([math.atan2(ty - y0, tx - x0) for tx, ty, x0, y0 in
+                            zip(atx[mv].tolist(), aty[mv].tolist(), x[r].tolist(), y[r].tolist())])
+            x[r] += np.cos(ang) * step
+            y[r] += np.sin(ang) * step
+        x[arows] = np.maximum(BOT_RADIUS, np.minimum(WIDTH - BOT_RADIUS, x[arows]))
+        y[arows] = np.maximum(BOT_RADIUS, np.minimum(HEIGHT - BOT_RADIUS, y[arows]))
+        self.x[live], self.y[live] = x, y
+        self.energy[live] = energy - STEP_COST
+
+        next_pc = (pc + 1) % RAM_WORDS
+        jump = (op == OP_JMP) | ((op == OP_JZ) & self.zero_flag[live])
+        self.pc[live] = np.where(jump, a % RAM_WORDS, next_pc)
+
+        tracer = self.world.tracer
+        if tracer is not None:
+            tracer.record_many(self.world.frames, self.ids[live], pc, op, np.where(wa, a, -1),
+                               np.where(wa, value - ra, 0), self.zero_flag[live], self.energy[live])
+
+    def wander(self, rnd=None):
+        self.x += np.cos(np.radians(self.angle)) * (BOT_SPEED * 0.15)
+        self.y += np.sin(np.radians(self.angle)) * (BOT_SPEED * 0.15)
+        hit = (self.x <= BOT_RADIUS) | (self.x >= WIDTH - BOT_RADIUS)
+        self.angle[hit] = (180 - self.angle[hit]) % 360
+        hit = (self.y <= BOT_RADIUS) | (self.y >= HEIGHT - BOT_RADIUS)
+        self.angle[hit] = (-self.angle[hit]) % 360
+        r = (rnd or self.world.rng).random
+        self.angle += np.array([-8 + 16 * r() for _ in range(len(self.angle))])
+        self.angle %= 360
+
+    def run_frame(self, budget=CYCLES_PER_FRAME):
+        # Bot.run_slice kaikille: yksityiset käskyt (MOV..JZ) ajetaan lockstepissä kunnes
+        # jokainen botti on budjetin, energian tai yield-käskyn kohdalla; yield-käskyt
+        # ajetaan lopuksi yhdellä tickillä bottien järjestyksessä. Tulos on sama kuin
+        # `for bot in bots: bot.run_slice(budget)`, koska ennen yieldiä botti ei näe muita.
+        count = np.zeros(len(self.pc), dtype=np.int64)
+        active = self.energy > 0
+        rows = np.arange(len(self.pc))
+        while True:
+            active &= (count < budget) & (self.energy > 0)
+            if not active.any():
+                break
+            op = (self.ram[rows, self.pc] >> 24) & 0xFF
+            world = active & np.isin(op, YIELD_OPS)
+            private = active & ~world
+            if private.any():
+                pc = self.pc.copy()
+                self.tick(private)
+                count[private] += 1
+                active &= ~(private & (self.pc == pc))  # hyppy itseensä
+                continue
+            self.tick(world)
+            count[world] += 1
+            active &= ~world
+        self.ipf = count
+        return count
+
+    def step_all(self):
+        # sama kuin pääsilmukan `for bot in bots: bot.step(); bot.wander()`
+        self.tick()
+        self.wander()
+
+
+# ---------------- World ----------------
+class Armada:
+    """
+    Botit, resurssit ja tietovarasto yhdessä maailmassa; ei pygamea.
+    Satunnaisluvut (resurssien ja bottien paikat, wander) tulevat world.rng:stä,
+    joten sama siemen antaa saman ajon.
+    """
+
+    def __init__(self, n_bots=N_AGENTS, n_resources=RESOURCE_COUNT, seed=None,
+                 knowledge_capacity=KNOWLEDGE_CAPACITY):
+        self.rng = random.Random(seed)
+        rng = self.rng
+        self.resources = ResourceIndex((rng.randint(20, WIDTH - 20), rng.randint(20, HEIGHT - 20))
+                                       for _ in range(n_resources))
+        self.repo = KnowledgeStore(knowledge_capacity)
+        self.resource_energy = 0.0  # boteille resursseista tullut energia MAX_ENERGY-rajauksen jälkeen
+        self.bots = []
+        for i in range(n_bots):
+            x = rng.randint(40, WIDTH - 40)
+            y = rng.randint(40, HEIGHT - 40)
+            angle = rng.uniform(0, 360)
+            self.bots.append(Bot(x, y, angle, idnum=i, world=self))
+        # bottien RAM ja rekisterit ovat näkymiä VM:n taulukoihin, joten molemmat polut näkevät samat ohjelmat
+        self.vm = ArmadaVM.from_bots(self.bots, world=self)
+        self.frames = 0
+        self.tracer = None  # armada_trace.Tracer: käskyt talteen (Bot.run_slice, ArmadaVM.tick)
+        self._bot_xy = None  # bottien paikat ruudun alussa (SEN 4)
+        self._bot_grid = None
+
+    def _perceive(self, xs=None, ys=None):
+        # ruudun alku: SEN 4 näkee kaikki botit näissä paikoissa koko ruudun ajan
+        if xs is None:
+            xs = np.array([b.x for b in self.bots])
+            ys = np.array([b.y for b in self.bots])
+        self._bot_xy = (xs, ys)
+        self._bot_grid = None
+
+    def bot_grid(self):
+        # PointGrid bottien ruudun alun paikoista; rakennetaan vasta ensimmäisellä SEN 4:llä
+        if self._bot_grid is None:
+            if self._bot_xy is None:
+                self._perceive()
+            self._bot_grid = PointGrid(*self._bot_xy, ids=[b.id for b in self.bots])
+        return self._bot_grid
+
+    def fov_polygons(self):
+        # kaikkien bottien FOV-monikulmiot piirtoa varten, ks. fov_polygons
+        return fov_polygons([b.x for b in self.bots], [b.y for b in self.bots], [b.angle for b in self.bots])
+
+    def load_program(self, words, bots=None):
+        # sama ohjelma (käskysanat tai RAM-kuva) kaikille tai annetuille boteille ilman
+        # bottikohtaisia kopioita: botit jakavat yhden vain luku -RAMin, dekoodauksen ja JITin
+        ram = program_ram(words)
+        decoded = decode_program(ram)
+        jit = jit_program(ram) if JIT else None
+        for bot in self.bots if bots is None else bots:
+            bot.share_ram(ram, decoded, jit)
+
+    def step(self, budget=CYCLES_PER_FRAME, use_vm=False):
+        # yksi ruutu: jokaiselle botille aikaviipale ja wander; palauttaa ajettujen käskyjen määrän
+        self.frames += 1
+        if use_vm:
+            self.vm.load(self.bots)
+            self._perceive(self.vm.x.copy(), self.vm.y.copy())
+            n = int(self.vm.run_frame(budget).sum())
+            self.vm.wander()
+            self.vm.store(self.bots)
+            return n
+        self._perceive()
+        n = 0
+        for bot in self.bots:
+            n += bot.run_slice(budget)
+            bot.wander()
+        return n
+
+    def run(self, frames, budget=CYCLES_PER_FRAME, use_vm=False):
+        # monta ruutua täydellä nopeudella; VM:n tila siirretään botteihin vain lopussa
+        if not use_vm:
+            return sum(self.step(budget) for _ in range(frames))
+        vm = self.vm
+        vm.load(self.bots)
+        n = 0
+        for _ in range(frames):
+            self.frames += 1
+            self._perceive(vm.x.copy(), vm.y.copy())
+            n += int(vm.run_frame(budget).sum())
+            vm.wander()
+        vm.store(self.bots)
+        return n
+
+    def legibility(self):
+        # jokaisen botin ohjelman legibility_score yhtenä taulukkona (legibility_scores)
+        if not self.bots:
+            return np.zeros(0)
+        return legibility_scores(np.stack([bot.ram for bot in self.bots]))
+
+    def stats(self):
+        # (elossa olevat botit, keskienergia, resursseja jäljellä, tietovaraston kirjoitukset)
+        energy = [b.energy for b in self.bots]
+        alive = sum(e > 0 for e in energy)
+        return alive, sum(energy) / max(1, len(energy)), len(self.resources), self.repo.total
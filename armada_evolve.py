@@ -0,0 +1,252 @@
+"""
+armada_evolve.py
+
+Geneettinen ohjelmointi Robot-T-ohjelmille prosessipoolilla (kaikki ytimet).
+- Yksilö on RAM-kuva (käskysanat, enintään --max-len käskyä, loppu nollia)
+- Muuntelu: käskyn kentän vaihto, käskyn lisäys / poisto ja yhden pisteen risteytys
+  kahden vanhemman välillä; turnausvalinta ja eliitti siirtyy sellaisenaan
+- Kelpoisuus: resursseista saatu energia per botti kiinteissä ilman näyttöä ajetuissa
+  episodeissa (samat siemenet kaikille) miinus luettavuussakko
+  LEGIBILITY_WEIGHT * (100 - legibility_score). Pisteytetään koko genomi viimeiseen
+  käskyyn asti (genome_lines): Bot.get_program_lines pysähtyy ensimmäiseen nollaan,
+  ja NOP on nolla, joten aikainen NOP piilottaisi muun ohjelman luettavuudelta.
+- Episodit ajetaan poolissa; tulokset muistetaan RAM-tavujen mukaan, joten toistuvia
+  ohjelmia (eliitti, samat jälkeläiset) ei ajeta uudelleen. Ylivuotava ohjelma saa -inf.
+
+Käyttö:
+    python armada_evolve.py --generations 50 --population 200 --out best.rbt
+    python armada_evolve.py --start forager.asm --ticks 400 --processes 8
+    python armada_asm.py dis best.rbt
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import armada_asm
+import armada_core as core
+from armada_core import (OP_ACT, OP_ADD, OP_CMP, OP_JMP, OP_JZ, OP_LDK, OP_MOV, OP_NOP, OP_SEN,
+                         OP_SUB, OP_WRT, encode)
+
+GENE_OPS = (OP_NOP, OP_MOV, OP_ADD, OP_SUB, OP_JMP, OP_JZ, OP_CMP, OP_SEN, OP_ACT, OP_LDK, OP_WRT)
+MAX_LEN = 24
+LEGIBILITY_WEIGHT = 0.05  # energiaa per luettavuuspiste alle 100
+TOURNAMENT = 3
+ELITE = 2
+P_CROSSOVER = 0.5
+
+
+# ---------------- Episodes (työprosessit) ----------------
+def episode_energy(words, seed, n_bots, n_resources, ticks, budget, use_vm):
+    # resursseista todella saatu energia per botti yhdessä episodissa (MAX_ENERGY-katossa
+    # olevan botin syömä resurssi ei tuo mitään)
+    world = core.Armada(n_bots, n_resources, seed=seed)
+    world.load_program(words)
+    world.run(ticks, budget, use_vm)
+    return world.resource_energy / n_bots
+
+
+def evaluate(job):
+    # (RAM-tavut, episodiasetukset) -> (RAM-tavut, keskimääräinen energia tai -inf)
+    key, seeds, n_bots, n_resources, ticks, budget, use_vm = job
+    words = np.frombuffer(key, dtype=np.uint32)
+    try:
+        gained = [episode_energy(words, seed, n_bots, n_resources, ticks, budget, use_vm) for seed in seeds]
+    except OverflowError:
+        return key, -math.inf
+    return key, sum(gained) / len(gained)
+
+
+# ---------------- Genetic operators ----------------
+def canonical(word):
+    # kentät joita käsky ei käytä nollataan (asm_from_word -> assemble_line), joten
+    # samoin toimivat ohjelmat jakavat RAM-tavut ja kelpoisuusmuistin rivin
+    return armada_asm.assemble_line(core.asm_from_word(word))
+
+
+def random_instr(rng, length):
+    op = rng.choice(GENE_OPS)
+    a = rng.randrange(length) if op in (OP_JMP, OP_JZ) else rng.randrange(core.NREG)
+    if op in (OP_MOV, OP_ADD, OP_SUB, OP_CMP) and rng.random() < 0.5:
+        return encode(op, a, rng.randrange(1, core.NREG), 0)
+    imm = rng.randrange(core.N_SENSORS) if op == OP_SEN else rng.randrange(256)
+    return canonical(encode(op, a, 0, imm))
+
+
+def random_program(rng, max_len=MAX_LEN):
+    length = rng.randint(2, max_len)
+    return [random_instr(rng, length) for _ in range(length)]
+
+
+def mutate(rng, words, max_len=MAX_LEN):
+    words = list(words)
+    r = rng.random()
+    if r < 0.2 and len(words) < max_len:
+        words.insert(rng.randrange(len(words) + 1), random_instr(rng, len(words) + 1))
+    elif r < 0.35 and len(words) > 1:
+        del words[rng.randrange(len(words))]
+    elif r < 0.6:
+        words[rng.randrange(len(words))] = random_instr(rng, len(words))
+    else:
+        # yksi kenttä (op, a, b tai imm) vaihtuu
+        i = rng.randrange(len(words))
+        op, a, b, imm = core.decode(words[i])
+        field = rng.randrange(4)
+        if field == 0:
+            op = rng.choice(GENE_OPS)
+        elif field == 1:
+            a = rng.randrange(len(words)) if op in (OP_JMP, OP_JZ) else rng.randrange(core.NREG)
+        elif field == 2:
+            b = rng.randrange(core.NREG)
+        else:
+            imm = rng.randrange(256)
+        words[i] = canonical(encode(op, a, b, imm))
+    return words
+
+
+def crossover(rng, mother, father, max_len=MAX_LEN):
+    cut_m = rng.randrange(1, len(mother) + 1)
+    cut_f = rng.randrange(len(father))
+    return (list(mother[:cut_m]) + list(father[cut_f:]))[:max_len]
+
+
+def program_words(ram):
+    # RAM-kuva -> käskylista (loppuosan nollat pois; välissä olevat NOPit säilyvät)
+    nz = np.flatnonzero(ram)
+    return [int(w) for w in ram[:int(nz[-1]) + 1]] if len(nz) else [0]
+
+
+def genome_lines(words):
+    # koko genomin listaus luettavuutta varten. NOP-rivi kirjoitetaan edellisen käskyn
+    # toistona: se maksaa rivinä mutta ei tuo vaihtelua, joten NOP-täyte ei nosta pistettä.
+    lines = []
+    for w in words:
+        line = core.asm_from_word(w)
+        if core.decode(w)[0] == OP_NOP and lines:
+            line = lines[-1]
+        lines.append(line)
+    return lines
+
+
+def genome_legibility(words):
+    return core.legibility_score(genome_lines(words))
+
+
+def tournament(rng, population, fitness):
+    picks = rng.sample(range(len(population)), min(TOURNAMENT, len(population)))
+    return population[max(picks, key=lambda i: fitness[i])]
+
+
+# ---------------- Search ----------------
+class Evolution:
+    def __init__(self, population=100, seeds=(0, 1), n_bots=8, n_resources=core.RESOURCE_COUNT,
+                 ticks=300, budget=8, use_vm=False, max_len=MAX_LEN, rng_seed=0, start=None):
+        self.rng = random.Random(rng_seed)
+        self.size = population
+        self.episode = (tuple(seeds), n_bots, n_resources, ticks, budget, use_vm)
+        self.max_len = max_len
+        self.cache = {}  # RAM-tavut -> episodien energia (tai -inf)
+        self.evaluated = 0
+        self.hits = 0
+        if start is not None:
+            start = program_words(core.program_ram(start))
+            self.population = [start] + [mutate(self.rng, start, max_len) for _ in range(population - 1)]
+        else:
+            self.population = [random_program(self.rng, max_len) for _ in range(population)]
+        self.rams = None
+        self.fitness = None
+
+    def _evaluate(self, pool, processes=1):
+        rams = np.stack([core.program_ram(p) for p in self.population])
+        keys = [ram.tobytes() for ram in rams]
+        todo = list(dict.fromkeys(k for k in keys if k not in self.cache))
+        self.hits += len(keys) - len(todo)
+        self.evaluated += len(todo)
+        jobs = [(k,) + self.episode for k in todo]
+        if pool is None:
+            results = map(evaluate, jobs)
+        else:
+            results = pool.imap_unordered(evaluate, jobs, chunksize=max(1, len(jobs) // (4 * processes)))
+        for key, energy in results:
+            self.cache[key] = energy
+        legibility = np.array([genome_legibility(program_words(ram)) for ram in rams])
+        energy = np.array([self.cache[k] for k in keys])
+        self.rams = rams
+        self.fitness = energy - LEGIBILITY_WEIGHT * (100.0 - legibility)
+        return energy, legibility
+
+    def _breed(self):
+        rng = self.rng
+        order = np.argsort(-self.fitness, kind='stable')
+        fitness = self.fitness.tolist()
+        children = [self.population[i] for i in order[:ELITE]]
+        while len(children) < self.size:
+            parent = tournament(rng, self.population, fitness)
+            if rng.random() < P_CROSSOVER:
+                child = crossover(rng, parent, tournament(rng, self.population, fitness), self.max_len)
+                if rng.random() < 0.5:
+                    child = mutate(rng, child, self.max_len)
+            else:
+                child = mutate(rng, parent, self.max_len)
+            children.append(child)
+        self.population = children
+
+    def run(self, generations, processes=None, report=print):
+        # palauttaa (paras RAM, paras kelpoisuus); report(rivi) jokaisen sukupolven jälkeen
+        processes = processes or os.cpu_count()
+        pool = Pool(processes) if processes > 1 else None
+        try:
+            for gen in range(generations):
+                t0 = time.perf_counter()
+                energy, legibility = self._evaluate(pool, processes)
+                best = int(np.argmax(self.fitness))
+                if report:
+                    finite = self.fitness[np.isfinite(self.fitness)]
+                    report(f'gen {gen:4d}: best {self.fitness[best]:7.2f} (energy {energy[best]:6.2f}, '
+                           f'legibility {legibility[best]:5.1f}, {len(program_words(self.rams[best]))} instr) '
+                           f'mean {finite.mean() if len(finite) else -math.inf:7.2f}  '
+                           f'evaluated {self.evaluated} cached {self.hits}  {time.perf_counter() - t0:.2f}s')
+                if gen < generations - 1:
+                    self._breed()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        best = int(np.argmax(self.fitness))
+        return self.rams[best], float(self.fitness[best])
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Evolve Robot-T programs.')
+    ap.add_argument('--generations', type=int, default=30)
+    ap.add_argument('--population', type=int, default=100)
+    ap.add_argument('--episodes', type=int, default=2, help='episode seeds 0..N-1 per candidate')
+    ap.add_argument('--bots', type=int, default=8)
+    ap.add_argument('--resources', type=int, default=core.RESOURCE_COUNT)
+    ap.add_argument('--ticks', type=int, default=300)
+    ap.add_argument('--budget', type=int, default=8)
+    ap.add_argument('--engine', choices=('obj', 'vm'), default='obj')
+    ap.add_argument('--max-len', type=int, default=MAX_LEN)
+    ap.add_argument('--seed', type=int, default=0, help='seed of the genetic operators')
+    ap.add_argument('--start', help='assembly or .rbt program to seed the population')
+    ap.add_argument('--processes', type=int, default=None, help='1 = no pool')
+    ap.add_argument('--out', default='armada_best.rbt')
+    args = ap.parse_args()
+
+    start = armada_asm.read_program(args.start) if args.start else None
+    evo = Evolution(args.population, range(args.episodes), args.bots, args.resources, args.ticks,
+                    args.budget, args.engine == 'vm', args.max_len, args.seed, start)
+    ram, fitness = evo.run(args.generations, args.processes)
+    armada_asm.save_image(args.out, ram)
+    print(f'best fitness {fitness:.2f} -> {args.out}')
+    for line in armada_asm.disassemble(ram, numbered=True):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
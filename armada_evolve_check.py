@@ -0,0 +1,76 @@
+"""
+armada_evolve_check.py
+
+armada_evolve-kelpoisuuden tarkistukset (kuten oxoplect_vec.py:n pariteettiajo).
+- Välissä oleva NOP: Bot.get_program_lines pysähtyy ensimmäiseen nollaan, joten yhteinen
+  legibility_score näkee vain NOPia edeltävän osan. GP pisteyttää koko genomin
+  (armada_evolve.genome_lines), jolloin toistava ohjelma NOPin kanssa saa huonomman
+  pisteen kuin ilman eikä NOP piilota loppuohjelmaa.
+- Resurssienergia: MAX_ENERGY-katossa olevat botit eivät saa syömistään resursseista
+  täyttä RESOURCE_ENERGYä, joten Armada.resource_energy (episode_energy) jää alle
+  syötyjen resurssien määrän perusteella lasketun; obj ja vm antavat saman summan.
+Epäonnistunut tarkistus lopettaa nollasta poikkeavalla paluuarvolla.
+
+Käyttö:
+    python armada_evolve_check.py
+"""
+
+import math
+
+import numpy as np
+
+import armada_asm
+import armada_core as core
+import armada_evolve as evo
+import armada_headless
+from armada_core import MAX_ENERGY, OP_ADD, OP_JMP, OP_NOP, RESOURCE_ENERGY, encode
+
+
+def nop_check():
+    # palauttaa (ilman NOPia, NOPin kanssa, yhteinen pisteytys NOPin kanssa)
+    body = [encode(OP_ADD, 0, 0, 1)] * 8 + [encode(OP_JMP, 0)]
+    padded = body[:1] + [encode(OP_NOP)] + body[1:]
+    plain_score = evo.genome_legibility(evo.program_words(core.program_ram(body)))
+    ram = core.program_ram(padded)
+    words = evo.program_words(ram)
+    if len(words) != len(padded):
+        raise SystemExit(f'program_words dropped the tail after the NOP: {len(words)} != {len(padded)}')
+    padded_score = evo.genome_legibility(words)
+    if not padded_score < plain_score:
+        raise SystemExit(f'interior NOP does not lower genome legibility: {padded_score} >= {plain_score}')
+    bot = core.Bot(0, 0, 0, 0)
+    bot.load_words(ram)
+    shared = core.legibility_score(bot.get_program_lines())
+    if not shared == core.legibility_of(ram) == float(core.legibility_scores(np.stack([ram]))[0]):
+        raise SystemExit('shared legibility scorers disagree')
+    return plain_score, padded_score, shared
+
+
+def energy_check(seed=0, n_bots=8, ticks=300):
+    # forager-botit aloittavat energiakatosta; palauttaa (syödyt resurssit, saatu energia)
+    words = armada_asm.assemble(armada_headless.PROGRAMS['forager'])
+    gained = []
+    for use_vm in (False, True):
+        world = core.Armada(n_bots, core.RESOURCE_COUNT, seed=seed)
+        world.load_program(words)
+        for bot in world.bots:
+            bot.energy = MAX_ENERGY
+        world.run(ticks, use_vm=use_vm)
+        eaten = core.RESOURCE_COUNT - len(world.resources)
+        gained.append(world.resource_energy)
+    if not eaten:
+        raise SystemExit('forager ate no resources, energy check is vacuous')
+    if not math.isclose(*gained):
+        raise SystemExit(f'obj and vm resource energy differ: {gained}')
+    if not gained[0] < eaten * RESOURCE_ENERGY:
+        raise SystemExit(f'capped bots credited full resource energy: {gained[0]} for {eaten} resources')
+    return eaten, gained[0]
+
+
+if __name__ == '__main__':
+    plain, padded, shared = nop_check()
+    print(f'genome legibility without NOP {plain:.2f}, with interior NOP {padded:.2f} '
+          f'(shared scorer sees only the prefix: {shared:.2f}): ok')
+    eaten, gained = energy_check()
+    print(f'{eaten} resources eaten from the energy cap: {gained:.2f} energy gained '
+          f'(not {eaten * RESOURCE_ENERGY}): ok')
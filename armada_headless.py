@@ -0,0 +1,87 @@
+"""
+armada_headless.py
+
+Robot-T armadan eräajo ilman näyttöä (pygamea ei ladata lainkaan).
+- Lataa saman ohjelman jokaiselle botille (sisäänrakennettu tai tiedostosta)
+- Ajaa N ruutua täydellä nopeudella joko per-botti-tulkilla (obj) tai ArmadaVM:llä (vm)
+- Raportoi käskyt sekunnissa, ruudut sekunnissa ja maailman lopputilan
+
+Ohjelmatiedosto: assembly-teksti tai .rbt-ohjelmakuva (armada_asm.py).
+
+Käyttö:
+    python armada_headless.py --bots 10000 --ticks 500 --budget 16 --engine vm
+    python armada_headless.py --program counter --engine obj --no-jit
+    python armada_headless.py --program-file forager.rbt --seed 3
+"""
+
+import argparse
+import time
+
+import armada_asm
+import armada_core as core
+
+PROGRAMS = {
+    # ajaa lähintä resurssia kohti (ACT) ja syö sen perillä; lukee etäisyyden (SEN 2),
+    # mutta REPOon menee joka kierroksella vakiomerkki 1 (WRT ottaa vain välittömän arvon)
+    'forager': """
+        loop: SEN R0, 2
+              WRT 1
+              MOV R1, 2
+              ACT R1
+              MOV R1, 1
+              ACT R1
+              JMP loop
+    """,
+    # pelkkää laskentaa (JIT-lohkot), ei maailmaan koskevia käskyjä
+    'counter': """
+              MOV R0, 0
+        loop: ADD R0, 1
+              SUB R1, 1
+              CMP R0, 200
+              JZ 0
+              JMP loop
+    """,
+}
+
+
+def run(world, ticks, budget, use_vm):
+    # palauttaa (käskyjä, sekunteja)
+    t0 = time.perf_counter()
+    n = world.run(ticks, budget, use_vm)
+    return n, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Run a Robot-T armada without a display.')
+    ap.add_argument('--bots', type=int, default=1000)
+    ap.add_argument('--resources', type=int, default=core.RESOURCE_COUNT)
+    ap.add_argument('--ticks', type=int, default=200)
+    ap.add_argument('--budget', type=int, default=16, help='instructions per bot per tick')
+    ap.add_argument('--engine', choices=('obj', 'vm'), default='vm',
+                    help='obj = Bot.run_slice per bot, vm = lockstep ArmadaVM')
+    ap.add_argument('--program', choices=sorted(PROGRAMS), default='forager')
+    ap.add_argument('--program-file', help='assembly source or .rbt program image')
+    ap.add_argument('--no-jit', action='store_true', help='obj engine: interpreter only')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    core.JIT = not args.no_jit
+    if args.program_file:
+        words = armada_asm.read_program(args.program_file)
+    else:
+        words = armada_asm.assemble(PROGRAMS[args.program])
+    world = core.Armada(args.bots, args.resources, seed=args.seed)
+    world.load_program(words)
+    try:
+        n, dt = run(world, args.ticks, args.budget, args.engine == 'vm')
+    except OverflowError as e:
+        raise SystemExit(f'program overflowed a register: {e}')
+    alive, energy, left, writes = world.stats()
+    print(f'{args.bots} bots x {args.ticks} ticks ({args.engine}, budget {args.budget}): '
+          f'{n} instructions in {dt:.2f}s = {n / dt:,.0f} instr/s, {args.ticks / dt:.1f} ticks/s')
+    print(f'alive {alive}, mean energy {energy:.2f}, resources left {left}/{args.resources}, '
+          f'REPO writes {writes}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+armada_trace.py
+
+Robot-T armadan käskyjäljitys (trace) ja profilointi.
+- Tracer kiinnitetään maailmaan (world.tracer); kun se on None, Bot.run_slice ja
+  ArmadaVM.tick tarkistavat sen vain kerran viipaletta / tickiä kohti
+- Jokaisesta ajetusta käskystä rivi valmiiksi varattuun rengaspuskuriin:
+  (tick, botti, pc, opcode, kirjoitettu rekisteri, rekisterin muutos, zero flag, energia)
+  Puskuri säilyttää viimeiset `capacity` riviä; histogrammit lasketaan kaikista
+- Histogrammit per opcode ja per PC: osumat ja "tyhjät" käskyt (NOP / tuntematon opcode,
+  MOV/ADD/SUB joka ei muuttanut rekisteriä tai kirjoitti olemattomaan rekisteriin),
+  jotka maksavat STEP_COST energiaa tekemättä mitään
+- obj-moottorilla jäljitys ajaa tulkin käsky kerrallaan (JIT-lohkot ohitetaan)
+
+Tiedosto (.rbtt): 32 tavun otsake + rivit (TRACE_DTYPE, aikajärjestyksessä) +
+histogrammit (op_hits, op_idle, pc_hits, pc_idle little-endian int64:nä).
+Otsake: magic b'RBTT', versio (u16), otsakkeen koko (u16), rivejä (u64),
+käskyjä yhteensä (u64), rivin koko (u32), varattu (u32).
+
+Käyttö:
+    python armada_trace.py run --bots 200 --ticks 100 --engine vm --out forager.rbtt
+    python armada_trace.py run --program-file evolved.rbt --capacity 1000000
+    python armada_trace.py show forager.rbtt --top 20
+    tracer = armada_trace.attach(world); world.run(100); print(*tracer.report(), sep='\\n')
+"""
+
+import argparse
+import struct
+import time
+
+import numpy as np
+
+import armada_asm
+import armada_core as core
+from armada_core import OP_ADD, OP_MOV, OP_NAMES, OP_NOP, OP_SUB, RAM_WORDS
+
+MAGIC = b'RBTT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQII')
+TRACE_CAPACITY = 1 << 16
+TRACE_DTYPE = np.dtype([('tick', '<u4'), ('bot', '<i4'), ('pc', '<u2'), ('op', 'u1'), ('reg', 'i1'),
+                        ('zf', '?'), ('delta', '<i8'), ('energy', '<f4')])
+HIST = np.dtype('<i8')
+ALU_OPS = (OP_MOV, OP_ADD, OP_SUB)
+KNOWN_OPS = np.zeros(256, dtype=bool)
+KNOWN_OPS[[op for op in OP_NAMES if op != OP_NOP]] = True
+
+
+def idle_mask(op, reg, delta):
+    # käskyt joilla ei ollut vaikutusta: NOP / tuntematon opcode, tai ALU-käsky joka ei
+    # muuttanut mitään (kohde >= NREG tai sama arvo kuin ennen)
+    op = np.asarray(op)
+    alu = np.isin(op, ALU_OPS)
+    return ~KNOWN_OPS[op] | (alu & ((np.asarray(reg) < 0) | (np.asarray(delta) == 0)))
+
+
+class Tracer:
+    def __init__(self, capacity=TRACE_CAPACITY):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=TRACE_DTYPE)
+        self.op_hits = np.zeros(256, dtype=np.int64)
+        self.op_idle = np.zeros(256, dtype=np.int64)
+        self.pc_hits = np.zeros(RAM_WORDS, dtype=np.int64)
+        self.pc_idle = np.zeros(RAM_WORDS, dtype=np.int64)
+        self.count = 0  # kaikki jäljitetyt käskyt (puskurissa min(count, capacity))
+        self.pos = 0  # seuraava kirjoituskohta puskurissa
+
+    def clear(self):
+        for hist in (self.op_hits, self.op_idle, self.pc_hits, self.pc_idle):
+            hist[:] = 0
+        self.count = 0
+        self.pos = 0
+
+    # ---------------- Recording ----------------
+    def record(self, tick, bot, pc, op, reg, delta, zf, energy):
+        # yksi käsky (Bot.run_slice)
+        self.records[self.pos] = (tick, bot, pc, op, reg, zf, delta, energy)
+        self.pos = (self.pos + 1) % self.capacity
+        self.count += 1
+        self.op_hits[op] += 1
+        self.pc_hits[pc] += 1
+        if not KNOWN_OPS[op] or (op in ALU_OPS and (reg < 0 or delta == 0)):
+            self.op_idle[op] += 1
+            self.pc_idle[pc] += 1
+
+    def record_many(self, tick, bots, pc, op, reg, delta, zf, energy):
+        # yksi VM-tick: taulukot riveittäin (ArmadaVM.tick)
+        n = len(bots)
+        if not n:
+            return
+        self.op_hits += np.bincount(op, minlength=256)
+        self.pc_hits += np.bincount(pc, minlength=RAM_WORDS)
+        idle = idle_mask(op, reg, delta)
+        if idle.any():
+            self.op_idle += np.bincount(op[idle], minlength=256)
+            self.pc_idle += np.bincount(pc[idle], minlength=RAM_WORDS)
+        cols = (('tick', tick), ('bot', bots), ('pc', pc), ('op', op), ('reg', reg), ('zf', zf),
+                ('delta', delta), ('energy', energy))
+        skip = max(0, n - self.capacity)  # vain viimeiset capacity riviä mahtuvat
+        idx = (self.pos + skip + np.arange(n - skip)) % self.capacity
+        for name, values in cols:
+            values = np.asarray(values)
+            self.records[name][idx] = values[skip:] if values.ndim else values
+        self.pos = (self.pos + n) % self.capacity
+        self.count += n
+
+    # ---------------- Analysis ----------------
+    def trace(self):
+        # puskurin rivit aikajärjestyksessä (kopio)
+        if self.count <= self.capacity:
+            return self.records[:self.count].copy()
+        return np.concatenate([self.records[self.pos:], self.records[:self.pos]])
+
+    def hot_pcs(self, k=10):
+        # [(pc, osumat, tyhjät)] osumien mukaan laskevasti
+        order = np.argsort(-self.pc_hits, kind='stable')[:k]
+        return [(int(pc), int(self.pc_hits[pc]), int(self.pc_idle[pc])) for pc in order if self.pc_hits[pc]]
+
+    def op_table(self):
+        # [(nimi, osumat, tyhjät)] osumien mukaan laskevasti
+        order = np.argsort(-self.op_hits, kind='stable')
+        return [(OP_NAMES.get(int(op), f'OP{int(op)}'), int(self.op_hits[op]), int(self.op_idle[op]))
+                for op in order if self.op_hits[op]]
+
+    def report(self, ram=None, top=10):
+        # tekstirivit: opcodet ja kuumimmat PC:t (ram annettuna PC:n käsky mukaan)
+        total = max(1, self.count)
+        idle = int(self.op_idle.sum())
+        lines = [f'{self.count} instructions traced ({min(self.count, self.capacity)} kept), '
+                 f'{idle} idle ({100.0 * idle / total:.1f} %, {idle * core.STEP_COST:.2f} energy)']
+        lines.append('opcode     hits      %     idle')
+        for name, hits, wasted in self.op_table():
+            lines.append(f'{name:6s} {hits:9d} {100.0 * hits / total:6.1f} {wasted:8d}')
+        lines.append('pc         hits      %     idle')
+        for pc, hits, wasted in self.hot_pcs(top):
+            text = f'  {armada_asm.disassemble_word(ram[pc])}' if ram is not None else ''
+            lines.append(f'{pc:03d}    {hits:9d} {100.0 * hits / total:6.1f} {wasted:8d}{text}')
+        return lines
+
+    # ---------------- Files ----------------
+    def to_bytes(self):
+        rows = self.trace()
+        head = HEADER.pack(MAGIC, VERSION, HEADER.size, len(rows), self.count, TRACE_DTYPE.itemsize, 0)
+        hists = b''.join(h.astype(HIST).tobytes() for h in (self.op_hits, self.op_idle, self.pc_hits, self.pc_idle))
+        return head + rows.tobytes() + hists
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def from_bytes(cls, buf):
+        if len(buf) < HEADER.size:
+            raise ValueError('truncated trace header')
+        magic, version, size, rows, count, itemsize, _ = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError(f'not a Robot-T trace (magic {magic!r})')
+        if version != VERSION or itemsize != TRACE_DTYPE.itemsize:
+            raise ValueError(f'unsupported trace version {version}')
+        tracer = cls(max(1, rows))
+        tracer.records[:rows] = np.frombuffer(buf, dtype=TRACE_DTYPE, count=rows, offset=size)
+        tracer.count = count  # rivit ovat jo aikajärjestyksessä, joten pos = 0
+        offset = size + rows * itemsize
+        for hist in (tracer.op_hits, tracer.op_idle, tracer.pc_hits, tracer.pc_idle):
+            hist[:] = np.frombuffer(buf, dtype=HIST, count=len(hist), offset=offset)
+            offset += len(hist) * HIST.itemsize
+        return tracer
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def attach(world, capacity=TRACE_CAPACITY):
+    # jäljitys päälle (world.tracer); palauttaa Tracerin
+    world.tracer = Tracer(capacity)
+    return world.tracer
+
+
+def detach(world):
+    tracer, world.tracer = world.tracer, None
+    return tracer
+
+
+def main():
+    import armada_headless
+    ap = argparse.ArgumentParser(description='Trace and profile Robot-T programs.')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    run = sub.add_parser('run', help='run an armada with tracing and write a trace file')
+    run.add_argument('--bots', type=int, default=200)
+    run.add_argument('--resources', type=int, default=core.RESOURCE_COUNT)
+    run.add_argument('--ticks', type=int, default=100)
+    run.add_argument('--budget', type=int, default=16)
+    run.add_argument('--engine', choices=('obj', 'vm'), default='vm')
+    run.add_argument('--program', choices=sorted(armada_headless.PROGRAMS), default='forager')
+    run.add_argument('--program-file', help='assembly source or .rbt program image')
+    run.add_argument('--capacity', type=int, default=TRACE_CAPACITY, help='ring buffer rows')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--top', type=int, default=10)
+    run.add_argument('--out', default='armada.rbtt')
+    show = sub.add_parser('show', help='histograms of a trace file')
+    show.add_argument('src')
+    show.add_argument('--program-file', help='program to annotate the hot PCs with')
+    show.add_argument('--top', type=int, default=10)
+    args = ap.parse_args()
+
+    ram = None
+    if args.program_file:
+        ram = core.program_ram(armada_asm.read_program(args.program_file))
+    if args.cmd == 'show':
+        tracer = Tracer.load(args.src)
+    else:
+        if ram is None:
+            ram = core.program_ram(armada_asm.assemble(armada_headless.PROGRAMS[args.program]))
+        world = core.Armada(args.bots, args.resources, seed=args.seed)
+        world.load_program(ram)
+        tracer = attach(world, args.capacity)
+        t0 = time.perf_counter()
+        try:
+            world.run(args.ticks, args.budget, args.engine == 'vm')
+        except OverflowError as e:
+            print(f'program overflowed a register: {e}')
+        print(f'{args.bots} bots x {args.ticks} ticks ({args.engine}) traced in {time.perf_counter() - t0:.2f}s '
+              f'-> {tracer.save(args.out)}')
+    for line in tracer.report(ram, args.top):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -37,9 +37,11 @@ Robottien elämisen maalit (boidance)
 
 
 Käyttö:
-pip install pygame
+pip install pygame numpy
 python pc_robots_pygame.py
 
+Ilman näyttöä (ei pygamea): python oxoplect_headless.py --help
+
 Kommentit: tämä on kevyt PoC; toivottavasti auttaa alkuun.
 """
 
@@ -50,10 +52,15 @@ Kommentit: tämä on kevyt PoC; toivottavasti auttaa alkuun.
 odotetaan=True  # True => paina Välilyöntiä (Spacebar) jotta simulaatio etenee
 
 
-import pygame
-import random
+# pygame ladataan vasta piirrossa ja main():ssa, jotta simulaation ydintä
+# (World, Agent, GreenFieldToken) voi ajaa ilman näyttöä ja nopeammin
+import heapq
 import math
-from collections import deque
+
+import numpy as np
+
+from oxoplect_metrics import (Recorder, EV_ROUND, EV_MOVE, EV_REPAIR, EV_GENERATE,
+                              EV_GENERATE_FAILED, EV_COLLECT, EV_NOOP)
 
 # --- Asetukset ---
 WIDTH, HEIGHT = 1000, 700
@@ -63,8 +70,16 @@ AGENT_RADIUS = 18
 BUBBLE_RADIUS = 36
 
 #
-#
-ROUND_TIME = 0  # 0 = turn-based : advance a round, by pressing <spacebar>
+# Reaaliaikatila (odotetaan=False): simulaatio etenee kiinteällä aika-askeleella
+# piirrosta riippumatta. ROUND_TIME = sekuntia per kierros; 0 = yksi kierros per 1/FPS s.
+# Jos piirto jää jälkeen, yhdellä ruudulla ajetaan useita kierroksia (enintään
+# MAX_ROUNDS_PER_FRAME) ja agenttien paikat interpoloidaan kierrosten välillä.
+ROUND_TIME = 0  # 0 = 1/FPS s; vuoropohjainen tila (välilyönti) valitaan odotetaan=True:lla
+MAX_ROUNDS_PER_FRAME = 50
+# "Max speed" (M-näppäin): kierroksia ajetaan niin nopeasti kuin ehditään ja ruutu
+# piirretään vain MAX_SPEED_RENDER_EVERY sekunnin välein
+MAX_SPEED = False
+MAX_SPEED_RENDER_EVERY = 0.5
 
 # 
 #
@@ -80,6 +95,9 @@ GREENFIELD_ENERGY = 8
 
 FONT_SIZE = 14
 
+# S-näppäin tallentaa tilannekuvan tähän, L lataa sen (ks. oxoplect_snapshot)
+SNAPSHOT_PATH = 'oxoplect_snapshot.npz'
+
 # Värit
 WHITE = (245, 245, 245)
 BLACK = (20, 20, 20)
@@ -99,8 +117,120 @@ AGENT_COLORS = [
 def clamp(v, a, b):
     return max(a, min(b, v))
 
+# Satunnaisluvut arvotaan kierroksen alussa taulukoksi (WorldRNG.round_draws):
+# yksi rivi per agentti, ja jokaisella satunnaisella päätöksellä on oma kiinteä sarakkeensa.
+# Näin olio-polku (World) ja vektoroitu moottori (oxoplect_vec.VecWorld)
+# kuluttavat täsmälleen samat luvut, vaikka agentti ei tarvitsisi niitä kaikkia.
+U_ACTION = 0        # toiminnon valinta todennäköisyyksillä
+U_REPAIR = 1        # "health alhainen" -> REPAIR-bias
+U_GENERATE = 2      # GENERATE-yritys p_generate:llä
+U_MOVE_ANGLE = 3    # liikkeen suunta
+U_TOKEN_ANGLE = 4   # tokenin paikka kuplan reunalla
+U_COOLDOWN = 5      # generate cooldown 2..4
+U_BUFF = 6          # efficiency buff -mahdollisuus
+U_MUT_MOVE = 7      # poolien mutaatiot
+U_MUT_REPAIR = 8
+U_MUT_GENERATE = 9
+N_DRAWS = 10
+
+
+# Virtojen tunnisteet SeedSequencen spawn_key:ssä
+SETUP_STREAM = 0
+ROUND_STREAM = 1
+
+
+class WorldRNG:
+    # Maailman oma siemennetty satunnaislähde; globaalia random-tilaa ei käytetä,
+    # joten samassa prosessissa voi ajaa monta maailmaa rinnakkain.
+    # - setup: numpy Generator alkutilalle (agenttien ja alkutokenien paikat)
+    # - kierroksella k on oma virtansa SeedSequence(seed, spawn_key=(ROUND_STREAM, k)),
+    #   josta koko populaation taulukko arvotaan yhdellä kutsulla. Rivi i on agentin i
+    #   oma virta: se ei riipu muiden agenttien arvonnoista eikä populaation koosta,
+    #   ja kierroksen k luvut saadaan toistamatta kierroksia 1..k-1.
+    def __init__(self, seed=None):
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.setup = self._generator(SETUP_STREAM)
+
+    def _generator(self, *key):
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=key)))
+
+    def randint(self, a, b, size=None):
+        # kuten random.randint: molemmat päät mukana
+        return self.setup.integers(a, b, size=size, endpoint=True)
+
+    def round_draws(self, round_no, n):
+        # (n, N_DRAWS) -taulukko kierrokselle round_no
+        return self._generator(ROUND_STREAM, round_no).random((n, N_DRAWS))
+
+
+def uniform(u, a, b):
+    # sama kaava kuin random.uniform, mutta valmiiksi arvotulle u:lle
+    return a + (b - a) * u
+
 #
 # --- Luokat ---
+
+# Poimintasäde (agentin keskipisteestä tokeniin); myös SpatialGridin solukoko
+PICKUP_RADIUS = AGENT_RADIUS + 10
+
+
+def _order(pair):
+    return pair[0]
+
+
+class SpatialGrid:
+    # Tasavälinen ruudukko areenan päällä. Kun solun koko on vähintään
+    # haun säde, kaikki säteen sisällä olevat löytyvät 3x3 naapurisoluista.
+    def __init__(self, cell=PICKUP_RADIUS):
+        self.cell = cell
+        self.cells = {}
+
+    def build(self, items):
+        # items: olioita joilla x ja y; järjestys säilyy near()-tuloksissa
+        self.cells = {}
+        for order, it in enumerate(items):
+            key = (int(it.x // self.cell), int(it.y // self.cell))
+            self.cells.setdefault(key, []).append((order, it))
+
+    def near(self, x, y):
+        # Solujen listat ovat valmiiksi järjestyksessä, joten ne lomitetaan laiskasti:
+        # kutsuja joka lopettaa ensimmäiseen osumaan käy läpi vain muutaman ehdokkaan.
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        found = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                cell = self.cells.get((gx, gy))
+                if cell:
+                    found.append(cell)
+        for _, it in heapq.merge(*found, key=_order):
+            yield it
+
+
+class TokenStore:
+    # Tokenit lisäysjärjestyksessä. dict säilyttää järjestyksen, joten
+    # poisto on O(1) eikä listan läpikäynti kuten list.remove:ssa.
+    def __init__(self):
+        self._items = {}
+        self._next_key = 0
+
+    def add(self, token):
+        token.key = self._next_key
+        self._next_key += 1
+        self._items[token.key] = token
+
+    def remove(self, token):
+        del self._items[token.key]
+
+    def __contains__(self, token):
+        return self._items.get(getattr(token, 'key', None)) is token
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+
 class GreenFieldToken:
     def __init__(self, pos, owner_id=None):
         self.x, self.y = pos
@@ -111,6 +241,7 @@ class GreenFieldToken:
         self.lifetime -= 1
 
     def draw(self, surf):
+        import pygame
         alpha = clamp(int(255 * (self.lifetime / GREENFIELD_LIFETIME)), 30, 255)
         s = pygame.Surface((14, 14), pygame.SRCALPHA)
         pygame.draw.circle(s, (100, 230, 130, alpha), (7, 7), 6)
@@ -150,11 +281,11 @@ class Agent:
         self.repair_pool *= scale
         self.generate_pool *= scale
 
-    def slight_mutate_allocations(self):
+    def slight_mutate_allocations(self, u):
         # Pieni stokastinen muutos poolien jakoihin — simuloi oppimista/eksploraatiota
         # 
-        for attr in ['move_pool', 'repair_pool', 'generate_pool']:
-            delta = random.uniform(-1.2, 1.2)
+        for attr, col in (('move_pool', U_MUT_MOVE), ('repair_pool', U_MUT_REPAIR), ('generate_pool', U_MUT_GENERATE)):
+            delta = uniform(u[col], -1.2, 1.2)
             setattr(self, attr, max(0.0, getattr(self, attr) + delta))
         self.balance_pools()
 
@@ -164,21 +295,21 @@ class Agent:
         # - jos generate_pool > threshold ja cooldown==0 -> GENERATE
         # - muuten MOVE
         # satunnainen elementti
-        choices = []
+        u = world.draws[self.id]
         # probability weights: influenced by pool sizes
         total = self.move_pool + self.repair_pool + self.generate_pool + 1e-6
         # normalize to probabilities
         p_move = self.move_pool / total
         p_repair = self.repair_pool / total
         p_generate = self.generate_pool / total
-        r = random.random()
+        r = u[U_ACTION]
         # bias towards repair if health low
         if self.health < self.max_health * 0.5 and self.repair_pool > 1:
-            r2 = random.random()
+            r2 = u[U_REPAIR]
             if r2 < 0.6:
                 self.action = 'REPAIR'
                 return
-        if self.generate_cooldown <= 0 and self.generate_pool > 1 and random.random() < p_generate:
+        if self.generate_cooldown <= 0 and self.generate_pool > 1 and u[U_GENERATE] < p_generate:
             self.action = 'GENERATE'
             return
         # otherwise pick by probabilities
@@ -190,16 +321,17 @@ class Agent:
             self.action = 'GENERATE'
 
     def perform_action(self, world):
-        # Returns log/tokens produced for UI
-        log = ''
+        # Palauttaa tapahtuman (tyyppi, arvo1, arvo2); teksti muotoillaan vasta UI:ssa
+        # (ks. oxoplect_metrics.format_event)
         if not self.alive:
-            return 'dead'
+            return (EV_NOOP, 0.0, 0.0)
+        u = world.draws[self.id]
         if self.action == 'MOVE':
             energy = min(self.move_pool, self.bubble_energy * 0.6)
             # compute movement distance from energy and efficiency
             dist = energy * (1.0 + self.efficiency_buff) * 2.0
             # random direction
-            ang = random.random() * 2 * math.pi
+            ang = u[U_MOVE_ANGLE] * 2 * math.pi
             dx = math.cos(ang) * dist
             dy = math.sin(ang) * dist
             # Use "clamp()" here to keep the bots within a area
@@ -213,19 +345,19 @@ class Agent:
             self.x = clamp(self.x + dx, AGENT_RADIUS, WIDTH - AGENT_RADIUS)
             self.y = clamp(self.y + dy, AGENT_RADIUS, HEIGHT - AGENT_RADIUS)
             self.move_pool -= energy
-            log = f'MOVE - used {energy:.1f} energy, dist {dist:.1f}'
+            event = (EV_MOVE, energy, dist)
         elif self.action == 'REPAIR':
             energy = min(self.repair_pool, self.bubble_energy * 0.8)
             heal = energy * REPAIR_HEALTH_PER_ENERGY * (1.0 + self.efficiency_buff * 0.5)
             self.health = clamp(self.health + heal, 0, self.max_health)
             self.repair_pool -= energy
-            log = f'REPAIR - used {energy:.1f}, healed {heal:.1f}'
+            event = (EV_REPAIR, energy, heal)
         elif self.action == 'GENERATE':
             energy = min(self.generate_pool, self.bubble_energy * 0.9)
             # require minimum cost to actually spawn
             if energy >= GENERATE_COST and self.generate_cooldown <= 0:
                 # spawn token near agent
-                angle = random.random() * 2 * math.pi
+                angle = u[U_TOKEN_ANGLE] * 2 * math.pi
                 rx = clamp(self.x + math.cos(angle) * (BUBBLE_RADIUS + 12), 10, WIDTH - 10)
                 ry = clamp(self.y + math.sin(angle) * (BUBBLE_RADIUS + 12), 10, HEIGHT - 10)
                 world.spawn_token((rx, ry), owner_id=self.id)
@@ -235,19 +367,19 @@ class Agent:
                 leftover = max(0.0, energy - GENERATE_COST)
                 self.generate_pool -= leftover * 0.0
                 # set cooldown
-                self.generate_cooldown = 2 + random.randint(0, 2)
+                self.generate_cooldown = 2 + int(u[U_COOLDOWN] * 3)
                 # small chance to get an efficiency buff
-                if random.random() < 0.25:
+                if u[U_BUFF] < 0.25:
                     self.efficiency_buff += 0.02
-                log = f'GENERATE - spawned token, used {GENERATE_COST:.1f}'
+                event = (EV_GENERATE, GENERATE_COST, 0.0)
             else:
                 # Not enough energy; try to convert energy to small repair instead
                 converted = energy * 0.4
                 self.repair_pool += converted
                 self.generate_pool -= energy
-                log = f'GENERATE failed - converted {converted:.1f} to repair pool'
+                event = (EV_GENERATE_FAILED, converted, 0.0)
         else:
-            log = 'NOOP'
+            event = (EV_NOOP, 0.0, 0.0)
 
         # Ensure pools non-negative and rebalance to bubble energy
         #
@@ -261,18 +393,18 @@ class Agent:
         # cooldown decrement
         self.generate_cooldown = max(0, self.generate_cooldown - 1)
         # small entropy in allocations
-        self.slight_mutate_allocations()
+        self.slight_mutate_allocations(u)
         # agent dies if health 0 or 
         # if bubble is empty and there is no repair pool 
         if self.health <= 0 or (self.bubble_energy <= 0 and self.repair_pool < 0.1 and self.move_pool < 0.1):
             self.alive = False
-        return log
+        return event
 
     def collect_token_if_near(self, token):
         if not self.alive:
             return False
         d2 = (self.x - token.x) ** 2 + (self.y - token.y) ** 2
-        if d2 <= (AGENT_RADIUS + 10) ** 2:
+        if d2 <= PICKUP_RADIUS ** 2:
             # collect
             self.bubble_energy += GREENFIELD_ENERGY * (1.0 + self.efficiency_buff)
             # give small boost to pools
@@ -284,6 +416,7 @@ class Agent:
         return False
 
     def draw(self, surf, font):
+        import pygame
         # draw bubble (semi transparent)
         s = pygame.Surface((BUBBLE_RADIUS * 2, BUBBLE_RADIUS * 2), pygame.SRCALPHA)
         pygame.draw.circle(s, (180, 200, 255, 45), (BUBBLE_RADIUS, BUBBLE_RADIUS), BUBBLE_RADIUS)
@@ -321,49 +454,84 @@ class Agent:
         surf.blit(idtxt, (self.x - idtxt.get_width() / 2, hy - 18))
 
 class World:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = WorldRNG(seed)
         self.agents = []
-        self.tokens = []
+        self.tokens = TokenStore()
+        self.grid = SpatialGrid(PICKUP_RADIUS)
         self.round = 0
-        self.logs = deque(maxlen=8)
+        # kierroskohtaiset mittarit ja lokitapahtumat (recorder.timing = True -> vaiheajat)
+        self.recorder = Recorder()
+        # kierroksen satunnaisluvut, ks. WorldRNG.round_draws()
+        self.draws = []
 
     def spawn_agents(self, n):
+        xs = self.rng.randint(50, WIDTH - 50, n).tolist()
+        ys = self.rng.randint(80, HEIGHT - 80, n).tolist()
+        start = len(self.agents)  # id = indeksi, ks. draws[self.id]
         for i in range(n):
-            x = random.randint(50, WIDTH - 50)
-            y = random.randint(80, HEIGHT - 80)
-            self.agents.append(Agent(i, x, y))
+            self.agents.append(Agent(start + i, xs[i], ys[i]))
 
     # 
     def spawn_token(self, pos, owner_id=None):
-        self.tokens.append(GreenFieldToken(pos, owner_id=owner_id))
+        self.tokens.add(GreenFieldToken(pos, owner_id=owner_id))
+
+    def spawn_tokens(self, xs, ys, owners=None):
+        # kuten VecWorld.spawn_tokens; owners None = ei omistajaa
+        owners = [None] * len(xs) if owners is None else [None if o < 0 else o for o in owners]
+        for x, y, owner in zip(xs, ys, owners):
+            self.spawn_token((x, y), owner)
 
     # 
+    @property
+    def logs(self):
+        # viimeisimmät lokirivit tekstinä, uusin ensin
+        return self.recorder.log_lines()
+
     def next_round(self):
         self.round += 1
-        self.logs.appendleft(f'--- Round {self.round} ---')
-        # each agent decides
-        for a in self.agents:
-            if not a.alive:
-                continue
+        rec = self.recorder
+        rec.begin_round(self.round)
+        rec.event(self.round, -1, EV_ROUND)
+        self.draws = self.rng.round_draws(self.round, len(self.agents)).tolist()
+        # each agent decides (päätös riippuu vain agentin omasta tilasta, joten
+        # kaikki päättävät ensin ja toimivat sitten — tulos on sama kuin vuorotellen)
+        acting = [a for a in self.agents if a.alive]
+        t = rec.clock()
+        for a in acting:
             a.decide_action(self)
-            log = a.perform_action(self)
-            self.logs.appendleft(f'A{a.id}: {log}')
+        t = rec.lap('decide', t)
+        counts = [0] * (EV_NOOP + 1)
+        deaths = 0
+        n_tokens = len(self.tokens)
+        for a in acting:
+            kind, v1, v2 = a.perform_action(self)
+            rec.event(self.round, a.id, kind, v1, v2)
+            counts[kind] += 1
+            deaths += not a.alive
+        spawned = len(self.tokens) - n_tokens
+        t = rec.lap('perform', t)
         # tokens update and possible pickup
-        for t in list(self.tokens):
-            t.update()
-            if t.lifetime <= 0:
-                self.tokens.remove(t)
+        # agentit eivät liiku tässä vaiheessa, joten ruudukko rakennetaan kerran
+        self.grid.build(a for a in self.agents if a.alive)
+        expired = collected = 0
+        for t_ in list(self.tokens):
+            t_.update()
+            if t_.lifetime <= 0:
+                self.tokens.remove(t_)
+                expired += 1
                 continue
-            # check collisions
-            for a in self.agents:
-                if a.collect_token_if_near(t):
-                    self.logs.appendleft(f'A{a.id} collected token +{GREENFIELD_ENERGY}')
-                    try:
-                        self.tokens.remove(t)
-                    except ValueError:
-                        pass
+            # check collisions (vain naapurisolujen agentit, id-järjestyksessä)
+            for a in self.grid.near(t_.x, t_.y):
+                if a.collect_token_if_near(t_):
+                    rec.event(self.round, a.id, EV_COLLECT, GREENFIELD_ENERGY)
+                    self.tokens.remove(t_)
+                    collected += 1
                     break
+        t = rec.lap('tokens', t)
         # small regeneration: if agent has some generate_pool they regain small bubble energy
+        alive = 0
+        energy_total = pool_total = 0.0
         for a in self.agents:
             if not a.alive:
                 continue
@@ -372,8 +540,23 @@ class World:
             a.bubble_energy += recharge
             # clamp
             a.bubble_energy = min(a.bubble_energy, 120)
+            alive += 1
+            energy_total += a.bubble_energy
+            pool_total += a.move_pool + a.repair_pool + a.generate_pool
+        rec.lap('recharge', t)
+        rec.record(alive=alive, deaths=deaths, moves=counts[EV_MOVE], repairs=counts[EV_REPAIR],
+                   generates=counts[EV_GENERATE], generate_failed=counts[EV_GENERATE_FAILED],
+                   tokens_spawned=spawned, tokens_collected=collected, tokens_expired=expired,
+                   tokens_alive=len(self.tokens), energy_total=energy_total, pool_total=pool_total)
+
+    def stats(self):
+        # (elossa olevat, keskimääräinen bubble_energy elävillä, tokenit)
+        alive = [a.bubble_energy for a in self.agents if a.alive]
+        mean_energy = sum(alive) / len(alive) if alive else 0.0
+        return len(alive), mean_energy, len(self.tokens)
 
     def draw(self, surf, font):
+        import pygame
         # draw tokens
         for t in self.tokens:
             t.draw(surf)
@@ -385,72 +568,126 @@ class World:
         ly = 10
         pygame.draw.rect(surf, (245, 245, 250), (lx - 6, ly - 6, 306, 160))
         pygame.draw.rect(surf, BLACK, (lx - 6, ly - 6, 306, 160), 1)
-        for i, msg in enumerate(list(self.logs)):
+        for i, msg in enumerate(self.logs):
             txt = font.render(msg, True, BLACK)
             surf.blit(txt, (lx, ly + i * 18))
 
+def new_world(n_agents=N_AGENTS, n_tokens=3, seed=None, cls=World):
+    # cls voi olla myös oxoplect_vec.VecWorld (sama spawn-rajapinta ja arvonnat)
+    world = cls(seed)
+    world.spawn_agents(n_agents)
+    # spawn a few initial greenfields: one draw for all (x, y) pairs, same stream
+    # as alternating x / y draws per token
+    pos = world.rng.randint([60, 80], [WIDTH - 60, HEIGHT - 80], (n_tokens, 2))
+    world.spawn_tokens(pos[:, 0].tolist(), pos[:, 1].tolist())
+    return world
+
+def interpolated_positions(prev, world, alpha):
+    # prev: {id: (x, y)} ennen viimeistä kierrosta; alpha 0..1 kuinka pitkällä seuraavaa ollaan
+    pos = {}
+    for a in world.agents:
+        px, py = prev.get(a.id, (a.x, a.y))
+        pos[a.id] = (px + (a.x - px) * alpha, py + (a.y - py) * alpha)
+    return pos
+
 # --- Pygame loop ---
 
 def main():
+    import time
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('PC Robots - sandbox sim (turn-based)')
     clock = pygame.time.Clock()
     font = pygame.font.SysFont('consolas', FONT_SIZE)
 
-    world = World()
-    world.spawn_agents(N_AGENTS)
-    # spawn a few initial greenfields
-    for _ in range(3):
-        world.spawn_token((random.randint(60, WIDTH-60), random.randint(80, HEIGHT-80)))
+    world = new_world()
 
     running = True
     info = [
-        'Space = next round | R = reset | Esc = quit',
+        'Space = next round | R = reset | S/L = save/load snapshot | Esc = quit',
         'Agents: move / repair / generate (split energy pools in bubble)',
     ]
 
+    import oxoplect_render
+    renderer = oxoplect_render.Renderer(screen, font)
+    if not odotetaan:
+        info[0] = 'M = max speed on/off | R = reset | S/L = save/load snapshot | Esc = quit'
+
+    # kiinteän aika-askeleen tila
+    dt = ROUND_TIME if ROUND_TIME > 0 else 1.0 / FPS
+    max_speed = MAX_SPEED
+    acc = 0.0
+    prev_pos = None
+    last = time.perf_counter()
+    last_render = 0.0
+
     while running:
         #
         # 
         if odotetaan:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            # vuoropohjaisessa tilassa odotetaan tapahtumaa eikä pyöritetä silmukkaa turhaan
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    elif event.key == pygame.K_SPACE:
-                        world.next_round()
-                    elif event.key == pygame.K_r:
-                        world = World()
-                        world.spawn_agents(N_AGENTS)
+                elif event.key == pygame.K_SPACE and odotetaan:
+                    world.next_round()
+                elif event.key == pygame.K_m and not odotetaan:
+                    max_speed = not max_speed
+                elif event.key == pygame.K_r:
+                    world = new_world()  # kuten käynnistyksessä (myös alkutokenit)
+                    prev_pos = None
+                elif event.key == pygame.K_s:
+                    import oxoplect_snapshot
+                    oxoplect_snapshot.save(world, SNAPSHOT_PATH)
+                elif event.key == pygame.K_l:
+                    import oxoplect_snapshot
+                    try:
+                        world = oxoplect_snapshot.load(SNAPSHOT_PATH)
+                        prev_pos = None
+                    except FileNotFoundError:
+                        pass
+
+        positions = None
+        if odotetaan:
+            header = 'PC Robots - Sandbox Sim (Turn-based)'
+        elif max_speed:
+            # ajetaan yhden ruudun verran seinäkelloaikaa, piirretään harvoin
+            header = f'PC Robots - Sandbox Sim (max speed, round {world.round})'
+            end = time.perf_counter() + 1.0 / FPS
+            while time.perf_counter() < end:
+                world.next_round()
+            acc, prev_pos = 0.0, None
+            last = time.perf_counter()
+            if last - last_render < MAX_SPEED_RENDER_EVERY:
+                continue
+            last_render = last
         else:
-            world.next_round()
-
-        screen.fill(WHITE)
-        # draw header
-        header = font.render('PC Robots - Sandbox Sim (Turn-based)', True, BLACK)
-        screen.blit(header, (10, 8))
-        for i, s in enumerate(info):
-            t = font.render(s, True, BLACK)
-            screen.blit(t, (10, 30 + i * 18))
-
-        world.draw(screen, font)
-
-        # draw agents summary on left
-        sx = 10
-        sy = HEIGHT - 140
-        pygame.draw.rect(screen, (250, 250, 250), (sx - 6, sy - 6, 360, 128))
-        pygame.draw.rect(screen, BLACK, (sx - 6, sy - 6, 360, 128), 1)
-        for i, a in enumerate(world.agents):
-            st = f'A{a.id}: E{int(a.bubble_energy)} HP{int(a.health)} act:{a.action or "-"}'
-            st2 = f' pools M{int(a.move_pool)} R{int(a.repair_pool)} G{int(a.generate_pool)}'
-            txt = font.render(st + st2, True, BLACK)
-            screen.blit(txt, (sx, sy + i * 16))
-
-        pygame.display.flip()
-        clock.tick(FPS)
+            header = f'PC Robots - Sandbox Sim (real-time, {1.0 / dt:.0f} rounds/s)'
+            now = time.perf_counter()
+            acc += now - last
+            last = now
+            steps = min(int(acc // dt), MAX_ROUNDS_PER_FRAME)
+            for i in range(steps):
+                if i == steps - 1:
+                    prev_pos = {a.id: (a.x, a.y) for a in world.agents}
+                world.next_round()
+            acc = acc - steps * dt if steps < MAX_ROUNDS_PER_FRAME else 0.0
+            if prev_pos is not None:
+                positions = interpolated_positions(prev_pos, world, min(1.0, acc / dt))
+
+        # piirtää vain muuttuneet alueet (ks. oxoplect_render)
+        renderer.draw(world, header, info, positions)
+        if not odotetaan and not max_speed:
+            clock.tick(FPS)
 
     pygame.quit()
 
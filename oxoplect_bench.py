@@ -0,0 +1,185 @@
+"""
+oxoplect_bench.py
+
+Skaalautuvuusmittaus oxoplect-kierroksille (ilman näyttöä).
+- Moottorit:
+    obj   = World (olio per agentti, tokenien poiminta ruudukon kautta)
+    vec   = oxoplect_vec.VecWorld (taulukot)
+    naive = World, jossa poiminta käy jokaisen tokenin kohdalla läpi kaikki agentit
+            (alkuperäinen O(tokens x agents) -silmukka vertailukohdaksi)
+- Jokaiselle (moottori, agentit, tokeneita per agentti) -tapaukselle mitataan
+  kierrokset sekunnissa ja muistin huippukäyttö (tracemalloc alustuksen ja ensimmäisen
+  kierroksen ajan; ajanotto jatkaa samalla maailmalla ilman tracemallocia, koska se
+  hidastaa itse ajoa)
+- Tulokset JSON-tiedostoon; --compare vanha.json näyttää muutokset ja merkitsee
+  hidastumat, joten regressiot näkyvät versioiden välillä
+
+Käyttö:
+    python oxoplect_bench.py --out bench.json
+    python oxoplect_bench.py --agents 10,1000,100000 --engines vec --tokens-per-agent 0.1,10
+    python oxoplect_bench.py --out new.json --compare bench.json
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+import oxoplect as ox
+
+ENGINES = ('obj', 'vec', 'naive')
+# Suurin agenttimäärä jota moottorilla ajetaan oletuksena (--no-limits ohittaa);
+# olio-moottori 1M agentilla ja 10M tokenilla tarvitsisi arviolta yli 3 GiB muistia
+# (100k agenttia ja 1M tokenia: 324 MiB), naive on O(tokens x agents).
+AGENT_LIMITS = {'obj': 100_000, 'naive': 10_000, 'vec': None}
+REGRESSION = 0.8  # --compare: alle 80 % vanhasta nopeudesta = regressio
+
+
+class NaiveGrid:
+    # SpatialGrid-rajapinta ilman ruudukkoa: near() palauttaa aina kaikki agentit
+    def build(self, items):
+        self.items = list(items)
+
+    def near(self, x, y):
+        return self.items
+
+
+class NaiveWorld(ox.World):
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.grid = NaiveGrid()
+
+
+def make_world(engine, n_agents, n_tokens, seed=0):
+    if engine == 'vec':
+        import oxoplect_vec
+        cls = oxoplect_vec.VecWorld
+    else:
+        cls = NaiveWorld if engine == 'naive' else ox.World
+    return ox.new_world(n_agents, n_tokens, seed=seed, cls=cls)
+
+
+def time_rounds(world, n_agents, budget, max_rounds):
+    # Ajaa kierroksia kunnes aikaa on kulunut `budget` sekuntia (vähintään yksi kierros)
+    rounds = 0
+    tokens = 0
+    t0 = time.perf_counter()
+    while rounds < max_rounds:
+        world.next_round()
+        rounds += 1
+        tokens += world.stats()[2]
+        if time.perf_counter() - t0 >= budget:
+            break
+    dt = time.perf_counter() - t0
+    return {'rounds': rounds, 'seconds': dt, 'rounds_per_s': rounds / dt,
+            'agent_rounds_per_s': rounds * n_agents / dt, 'mean_tokens': tokens / rounds}
+
+
+def traced_world(engine, n_agents, n_tokens, rounds, seed=0):
+    # Alustus + `rounds` kierrosta tracemallocin alla: (maailma, alustuksen kesto, muistihuippu).
+    # Sama maailma jatkaa ajanottoon, joten suurta maailmaa ei rakenneta kahdesti.
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        world = make_world(engine, n_agents, n_tokens, seed)
+        setup = time.perf_counter() - t0
+        for _ in range(rounds):
+            world.next_round()
+        return world, setup, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(engine, n_agents, density, budget=2.0, max_rounds=1000, memory_rounds=1):
+    n_tokens = max(1, int(round(n_agents * density)))
+    row = {'engine': engine, 'agents': n_agents, 'tokens_per_agent': density, 'tokens': n_tokens}
+    world, row['setup_s'], row['peak_bytes'] = traced_world(engine, n_agents, n_tokens, memory_rounds)
+    row.update(time_rounds(world, n_agents, budget, max_rounds))
+    return row
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'time': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor()}
+
+
+def case_key(row):
+    return (row['engine'], row['agents'], row['tokens_per_agent'])
+
+
+def compare(old_rows, new_rows, threshold=REGRESSION):
+    # Palauttaa rivit (avain, vanha r/s, uusi r/s, suhde, regressio?) yhteisille tapauksille
+    old = {case_key(r): r for r in old_rows}
+    out = []
+    for r in new_rows:
+        o = old.get(case_key(r))
+        if o:
+            ratio = r['rounds_per_s'] / o['rounds_per_s']
+            out.append((case_key(r), o['rounds_per_s'], r['rounds_per_s'], ratio, ratio < threshold))
+    return out
+
+
+def _ints(text):
+    return [int(float(v)) for v in text.split(',')]
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark oxoplect rounds per second and peak memory.')
+    ap.add_argument('--agents', type=_ints, default=[10, 100, 1000, 10_000, 100_000, 1_000_000],
+                    help='comma separated, e.g. 10,1000,1e6')
+    ap.add_argument('--tokens-per-agent', type=lambda s: [float(v) for v in s.split(',')],
+                    default=[0.1, 1.0, 10.0])
+    ap.add_argument('--engines', type=lambda s: s.split(','), default=list(ENGINES))
+    ap.add_argument('--budget', type=float, default=2.0, help='seconds of rounds per case')
+    ap.add_argument('--max-rounds', type=int, default=1000)
+    ap.add_argument('--no-limits', action='store_true', help='ignore AGENT_LIMITS')
+    ap.add_argument('--out', default='oxoplect_bench.json')
+    ap.add_argument('--compare', metavar='OLD.json')
+    args = ap.parse_args()
+    for engine in args.engines:
+        if engine not in ENGINES:
+            ap.error(f'unknown engine {engine}, choose from {", ".join(ENGINES)}')
+
+    rows = []
+    for engine in args.engines:
+        limit = None if args.no_limits else AGENT_LIMITS[engine]
+        for n in args.agents:
+            if limit is not None and n > limit:
+                print(f'{engine:5s} {n:>8d} agents: skipped (limit {limit}, --no-limits to run)')
+                continue
+            for density in args.tokens_per_agent:
+                row = run_case(engine, n, density, args.budget, args.max_rounds)
+                rows.append(row)
+                print(f'{engine:5s} {n:>8d} agents {row["tokens"]:>8d} tokens: '
+                      f'{row["rounds_per_s"]:10.2f} rounds/s  {row["agent_rounds_per_s"]:12.0f} agent-rounds/s  '
+                      f'peak {row["peak_bytes"] / 2**20:8.1f} MiB')
+
+    with open(args.out, 'w') as f:
+        json.dump({'env': environment(), 'results': rows}, f, indent=1)
+    print(f'-> {args.out}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)['results']
+        regressions = 0
+        for key, before, after, ratio, slow in compare(old, rows):
+            regressions += slow
+            print(f'{key[0]:5s} {key[1]:>8d} agents x{key[2]:g}: {before:10.2f} -> {after:10.2f} rounds/s '
+                  f'({ratio:5.2f}x){"  REGRESSION" if slow else ""}')
+        if regressions:
+            raise SystemExit(f'{regressions} regression(s) vs {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
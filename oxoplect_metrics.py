@@ -0,0 +1,123 @@
+"""
+oxoplect_metrics.py
+
+Kierroskohtainen mittari- ja tapahtumakirjuri oxoplect-maailmoille (World ja VecWorld).
+- Jokaiselle kierrokselle yksi rivi esivaratussa numpy-taulukossa: toiminnot tyypeittäin,
+  tokenit (syntyneet / poimitut / vanhentuneet), kuolemat, energian summat
+- Valinnainen vaiheajastin (timing=True): decide, perform, tokens, recharge sekunteina
+- Tapahtumat tallennetaan tupleina; tekstiksi ne muotoillaan vasta kun käyttöliittymä
+  kysyy (log_lines), eikä jokaiselle agentille joka kierroksella
+
+Käyttö:
+    world.recorder.timing = True
+    ...
+    table = world.recorder.table()      # rakenteinen taulukko, yksi rivi per kierros
+    table['tokens_collected'].sum(), table['t_tokens'].mean()
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+# Tapahtumatyypit
+EV_ROUND, EV_MOVE, EV_REPAIR, EV_GENERATE, EV_GENERATE_FAILED, EV_COLLECT, EV_NOOP, EV_ACTIONS, EV_COLLECTED = range(9)
+
+COUNTERS = ('alive', 'deaths', 'moves', 'repairs', 'generates', 'generate_failed',
+            'tokens_spawned', 'tokens_collected', 'tokens_expired', 'tokens_alive')
+TOTALS = ('energy_total', 'pool_total')
+PHASES = ('decide', 'perform', 'tokens', 'recharge')
+ROUND_DTYPE = np.dtype([('round', np.int64)] + [(c, np.int64) for c in COUNTERS]
+                       + [(t, np.float64) for t in TOTALS] + [('t_' + p, np.float64) for p in PHASES])
+EVENT_DTYPE = np.dtype([('round', np.int64), ('agent', np.int64), ('kind', np.int8),
+                        ('a', np.float64), ('b', np.float64), ('c', np.float64)])
+
+
+def format_event(ev):
+    rnd, agent, kind, a, b, c = ev
+    if kind == EV_ROUND:
+        return f'--- Round {rnd} ---'
+    if kind == EV_MOVE:
+        return f'A{agent}: MOVE - used {a:.1f} energy, dist {b:.1f}'
+    if kind == EV_REPAIR:
+        return f'A{agent}: REPAIR - used {a:.1f}, healed {b:.1f}'
+    if kind == EV_GENERATE:
+        return f'A{agent}: GENERATE - spawned token, used {a:.1f}'
+    if kind == EV_GENERATE_FAILED:
+        return f'A{agent}: GENERATE failed - converted {a:.1f} to repair pool'
+    if kind == EV_COLLECT:
+        return f'A{agent} collected token +{a:g}'
+    if kind == EV_ACTIONS:
+        return f'MOVE {a:.0f} REPAIR {b:.0f} GENERATE {c:.0f}'
+    if kind == EV_COLLECTED:
+        return f'{a:.0f} tokens collected +{b:g} each'
+    return f'A{agent}: NOOP'
+
+
+class Recorder:
+    def __init__(self, capacity=1024, timing=False, log_size=8):
+        self.rows = np.zeros(capacity, dtype=ROUND_DTYPE)
+        self.n = 0
+        self.timing = timing
+        self.events = deque(maxlen=log_size)
+        self._lines = None  # muotoillut rivit välimuistissa kunnes tulee uusia tapahtumia
+
+    # --- kierrokset ---
+
+    def begin_round(self, round_no):
+        if self.n == len(self.rows):
+            grown = np.zeros(2 * len(self.rows), dtype=ROUND_DTYPE)
+            grown[:self.n] = self.rows
+            self.rows = grown
+        self.rows[self.n]['round'] = round_no
+        self.n += 1
+
+    def record(self, **values):
+        # asettaa nykyisen kierroksen kenttiä, esim. record(moves=3, deaths=0)
+        row = self.rows[self.n - 1]
+        for name, value in values.items():
+            row[name] = value
+
+    def table(self):
+        return self.rows[:self.n]
+
+    # --- vaiheajastin ---
+
+    def clock(self):
+        return time.perf_counter() if self.timing else 0.0
+
+    def lap(self, phase, start):
+        # lisää kuluneen ajan vaiheelle ja palauttaa uuden aloitusajan
+        if not self.timing:
+            return 0.0
+        now = time.perf_counter()
+        self.rows[self.n - 1]['t_' + phase] += now - start
+        return now
+
+    # --- tapahtumat ---
+
+    def event(self, rnd, agent, kind, a=0.0, b=0.0, c=0.0):
+        self.events.append((rnd, agent, kind, a, b, c))
+        self._lines = None
+
+    def log_lines(self):
+        # uusin ensin, kuten vanha World.logs
+        if self._lines is None:
+            self._lines = [format_event(ev) for ev in reversed(self.events)]
+        return self._lines
+
+    # --- tilannekuvat ---
+
+    def state(self):
+        return {'rec_rows': self.table().copy(),
+                'rec_events': np.array(list(self.events), dtype=EVENT_DTYPE),
+                'rec_log_size': np.int64(self.events.maxlen)}
+
+    @classmethod
+    def from_state(cls, state, timing=False):
+        rec = cls(max(1024, len(state['rec_rows'])), timing, int(state['rec_log_size']))
+        rec.n = len(state['rec_rows'])
+        rec.rows[:rec.n] = state['rec_rows']
+        for ev in state['rec_events'].tolist():
+            rec.events.append(ev)
+        return rec
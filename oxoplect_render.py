@@ -0,0 +1,184 @@
+"""
+oxoplect_render.py
+
+Välimuistiin perustuva piirtokerros oxoplect-käyttöliittymälle.
+- Kuplan ja tokenien spritet piirretään kerran (token-sprite jokaiselle alpha-tasolle)
+- font.render-tulokset pidetään välimuistissa, kunnes teksti muuttuu
+- Joka ruudulla verrataan jokaisen agentin, tokenin ja paneelin piirtoparametreja
+  edelliseen: vain muuttuneet alueet (dirty rects) piirretään uudelleen ja päivitetään
+  näytölle. Jos mikään ei muuttunut, ruutua ei kosketa lainkaan.
+
+Agent.draw / World.draw jäävät referenssipiirroksi; main() käyttää Rendereriä.
+"""
+
+import pygame
+
+import oxoplect as ox
+
+# Jos likaisia alueita on enemmän kuin tämä (tai ne kattavat ison osan ruudusta),
+# koko ruutu piirretään kerralla
+MAX_DIRTY_RECTS = 64
+FULL_REDRAW_AREA = 0.4
+TEXT_CACHE_SIZE = 4096
+
+
+class Renderer:
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.width, self.height = screen.get_size()
+        self._text = {}
+        self._tokens = {}
+        self._bubble = pygame.Surface((ox.BUBBLE_RADIUS * 2, ox.BUBBLE_RADIUS * 2), pygame.SRCALPHA)
+        pygame.draw.circle(self._bubble, (180, 200, 255, 45), (ox.BUBBLE_RADIUS, ox.BUBBLE_RADIUS), ox.BUBBLE_RADIUS)
+        self._panels = {}
+        self._prev = None  # {avain: (rect, signature)} edelliseltä ruudulta
+
+    def invalidate(self):
+        # seuraava draw() piirtää koko ruudun (esim. ikkuna paljastui tai vaihtui)
+        self._prev = None
+
+    # --- välimuistit ---
+
+    def text(self, msg, color=ox.BLACK):
+        surf = self._text.get((msg, color))
+        if surf is None:
+            if len(self._text) >= TEXT_CACHE_SIZE:
+                self._text.clear()
+            surf = self._text[(msg, color)] = self.font.render(msg, True, color)
+        return surf
+
+    def token_sprite(self, alpha):
+        surf = self._tokens.get(alpha)
+        if surf is None:
+            surf = self._tokens[alpha] = pygame.Surface((14, 14), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (100, 230, 130, alpha), (7, 7), 6)
+        return surf
+
+    def _panel(self, name, size, lines, line_h, box):
+        # paneeli = laatikko + tekstirivit yhtenä pintana; rakennetaan uudelleen vain kun rivit muuttuvat
+        cached = self._panels.get(name)
+        if cached and cached[0] == lines:
+            return cached[1]
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, box[0], box[1])
+        pygame.draw.rect(surf, ox.BLACK, box[1], 1)
+        for i, msg in enumerate(lines):
+            surf.blit(self.text(msg), (6, 6 + i * line_h))
+        self._panels[name] = (lines, surf)
+        return surf
+
+    # --- näkymän kuvaus: (avain, rect, signature, piirtofunktio) ---
+
+    def _items(self, world, header, info, positions=None):
+        items = []
+        items.append((('header',), pygame.Rect(0, 0, self.width, 30 + len(info) * 18), (header,) + tuple(info),
+                      lambda: self._draw_header(header, info)))
+        for t in world.tokens:
+            alpha = ox.clamp(int(255 * (t.lifetime / ox.GREENFIELD_LIFETIME)), 30, 255)
+            x, y = int(t.x - 7), int(t.y - 7)
+            items.append((('token', t.key), pygame.Rect(x, y, 14, 14), (x, y, alpha),
+                          lambda x=x, y=y, alpha=alpha: self.screen.blit(self.token_sprite(alpha), (x, y))))
+        for a in world.agents:
+            sig = self._agent_signature(a, positions.get(a.id) if positions else None)
+            items.append((('agent', a.id), pygame.Rect(sig[0] - 40, sig[1] - 52, 80, 104), sig,
+                          lambda a=a, sig=sig: self._draw_agent(a, sig)))
+        logs = tuple(world.logs)
+        lx, ly = self.width - 300, 10
+        panel = self._panel('logs', (306, 160), logs, 18, ((245, 245, 250), (0, 0, 306, 160)))
+        items.append((('logs',), pygame.Rect(lx - 6, ly - 6, 306, 160), logs,
+                      lambda: self.screen.blit(panel, (lx - 6, ly - 6))))
+        lines = tuple(f'A{a.id}: E{int(a.bubble_energy)} HP{int(a.health)} act:{a.action or "-"}'
+                      f' pools M{int(a.move_pool)} R{int(a.repair_pool)} G{int(a.generate_pool)}'
+                      for a in world.agents)
+        sx, sy = 10, self.height - 140
+        w = max([360] + [self.text(s).get_width() + 6 for s in lines])
+        h = self.height - (sy - 6)
+        summary = self._panel('summary', (w, h), lines, 16, ((250, 250, 250), (0, 0, 360, 128)))
+        items.append((('summary',), pygame.Rect(sx - 6, sy - 6, w, h), lines,
+                      lambda: self.screen.blit(summary, (sx - 6, sy - 6))))
+        return items
+
+    @staticmethod
+    def _agent_signature(a, pos=None):
+        # kaikki mikä vaikuttaa agentin pikseleihin; pos = interpoloitu näyttöpaikka
+        x, y = pos if pos else (a.x, a.y)
+        total = max(1e-6, a.move_pool + a.repair_pool + a.generate_pool)
+        return (int(x), int(y), int(36 * (a.health / a.max_health)), f'E:{a.bubble_energy:.0f}',
+                int(40 * (a.move_pool / total)), int(40 * (a.repair_pool / total)),
+                int(40 * (a.generate_pool / total)))
+
+    def _draw_header(self, header, info):
+        self.screen.blit(self.text(header), (10, 8))
+        for i, s in enumerate(info):
+            self.screen.blit(self.text(s), (10, 30 + i * 18))
+
+    def _draw_agent(self, a, sig):
+        # sama kuva kuin Agent.draw, mutta spriteistä ja välimuistin teksteistä
+        x, y, health_w, e_label, w1, w2, w3 = sig
+        surf = self.screen
+        surf.blit(self._bubble, (x - ox.BUBBLE_RADIUS, y - ox.BUBBLE_RADIUS))
+        pygame.draw.circle(surf, a.col, (x, y), ox.AGENT_RADIUS)
+        pygame.draw.circle(surf, ox.BLACK, (x, y), ox.AGENT_RADIUS, 2)
+        hx, hy = x - 18, y - ox.AGENT_RADIUS - 12
+        pygame.draw.rect(surf, ox.GRAY, (hx, hy, 36, 6))
+        pygame.draw.rect(surf, (60, 200, 80), (hx, hy, health_w, 6))
+        pygame.draw.rect(surf, ox.BLACK, (hx, hy, 36, 6), 1)
+        e_text = self.text(e_label)
+        surf.blit(e_text, (x - e_text.get_width() // 2, y + ox.AGENT_RADIUS + 4))
+        by, mx = y + ox.AGENT_RADIUS + 24, x - 20
+        pygame.draw.rect(surf, (200, 80, 80), (mx, by, w1, 6))
+        pygame.draw.rect(surf, (80, 200, 100), (mx + w1, by, w2, 6))
+        pygame.draw.rect(surf, (80, 200, 200), (mx + w1 + w2, by, w3, 6))
+        idtxt = self.text(f'A{a.id}')
+        surf.blit(idtxt, (x - idtxt.get_width() // 2, hy - 18))
+
+    # --- piirto ---
+
+    def draw(self, world, header, info, positions=None):
+        # Piirtää muuttuneet alueet ja päivittää ne näytölle. Palauttaa True jos jotain piirrettiin.
+        # positions: {agentin id: (x, y)} näytettäville paikoille (reaaliaikatilan interpolointi)
+        items = self._items(world, header, info, positions)
+        current = {key: (rect, sig) for key, rect, sig, _ in items}
+        prev, self._prev = self._prev, current
+        if prev is None:
+            self._paint(items, None)
+            pygame.display.flip()
+            return True
+
+        dirty = []
+        for key, (rect, sig) in current.items():
+            old = prev.get(key)
+            if old is None:
+                dirty.append(rect)
+            elif old[1] != sig:
+                dirty.append(old[0].union(rect) if old[0].colliderect(rect) else old[0])
+                if not old[0].colliderect(rect):
+                    dirty.append(rect)
+        dirty.extend(rect for key, (rect, _) in prev.items() if key not in current)
+        if not dirty:
+            return False
+
+        area = sum(r.w * r.h for r in dirty)
+        if len(dirty) > MAX_DIRTY_RECTS or area > FULL_REDRAW_AREA * self.width * self.height:
+            self._paint(items, None)
+            pygame.display.flip()
+            return True
+        for r in dirty:
+            self._paint(items, r)
+        pygame.display.update(dirty)
+        return True
+
+    def _paint(self, items, clip):
+        # Taustan täyttö ja kaikkien leikkausalueeseen osuvien kohteiden piirto
+        # alkuperäisessä järjestyksessä (otsikko, tokenit, agentit, paneelit).
+        self.screen.set_clip(clip)
+        self.screen.fill(ox.WHITE)
+        if clip is None:
+            for _, _, _, draw in items:
+                draw()
+        else:
+            rects = [rect for _, rect, _, _ in items]
+            for i in clip.collidelistall(rects):
+                items[i][3]()
+        self.screen.set_clip(None)
@@ -0,0 +1,174 @@
+"""
+oxoplect_snapshot.py
+
+Maailman koko tilan binäärinen tilannekuva (snapshot) ja palautus.
+- Tallentaa agentit, tokenit, kierroslaskurin, WorldRNG:n tilan ja mittarit
+  (oxoplect_metrics.Recorder) yhteen .npz-tiedostoon
+  (pelkkiä numpy-taulukoita, ei picklea); toimii sekä World- että VecWorld-maailmoille
+- Pitkä ajo voi kirjoittaa checkpointin K kierroksen välein (run_with_checkpoints)
+- restore_round(dir, N) lataa lähimmän checkpointin <= N ja ajaa loput kierrokset;
+  koska kierroksen k satunnaisluvut riippuvat vain siemenestä ja k:sta, tulos on sama
+  kuin alusta asti ajettu
+
+Käyttö:
+    python oxoplect_snapshot.py run --seed 1 --rounds 100000 --every 1000 --dir ckpt
+    python oxoplect_snapshot.py restore --dir ckpt --round 73456
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+import oxoplect as ox
+from oxoplect_metrics import Recorder
+
+AGENT_FIELDS = ('x', 'y', 'health', 'max_health', 'bubble_energy', 'move_pool', 'repair_pool',
+                'generate_pool', 'generate_cooldown', 'efficiency_buff', 'alive')
+ACTIONS = ('MOVE', 'REPAIR', 'GENERATE')  # koodit 0..2, -1 = None (kuten oxoplect_vec)
+CHECKPOINT_NAME = 'round_{:09d}.npz'
+
+
+def world_state(world):
+    # Maailma -> {nimi: numpy-taulukko}
+    state = {
+        'round': np.int64(world.round),
+        'seed': np.array(str(world.rng.seed)),
+        'setup_state': np.array(json.dumps(world.rng.setup.bit_generator.state)),
+    }
+    state.update(world.recorder.state())
+    if hasattr(world, 'agents'):
+        state['engine'] = np.array('obj')
+        for name in AGENT_FIELDS:
+            state['a_' + name] = np.array([getattr(a, name) for a in world.agents],
+                                          dtype=bool if name == 'alive' else None)
+        state['a_id'] = np.array([a.id for a in world.agents], dtype=np.int64)
+        state['a_action'] = np.array([ACTIONS.index(a.action) if a.action else -1 for a in world.agents],
+                                     dtype=np.int8)
+        tokens = list(world.tokens)
+        state['t_x'] = np.array([t.x for t in tokens], dtype=float)
+        state['t_y'] = np.array([t.y for t in tokens], dtype=float)
+        state['t_lifetime'] = np.array([t.lifetime for t in tokens], dtype=np.int64)
+        state['t_owner'] = np.array([-1 if t.owner_id is None else t.owner_id for t in tokens], dtype=np.int64)
+    else:
+        state['engine'] = np.array('vec')
+        for name in AGENT_FIELDS:
+            state['a_' + name] = getattr(world, name)
+        state['a_id'] = np.arange(world.n_agents, dtype=np.int64)
+        state['a_action'] = world.action
+        state['t_x'], state['t_y'] = world.tx, world.ty
+        state['t_lifetime'], state['t_owner'] = world.tlife, world.towner
+    return state
+
+
+def world_from_state(state):
+    # {nimi: taulukko} -> World tai VecWorld (sen mukaan kumpi tallennettiin)
+    engine = str(state['engine'])
+    seed = int(str(state['seed']))
+    if engine == 'vec':
+        import oxoplect_vec
+        world = oxoplect_vec.VecWorld(seed)
+        world._alloc_agents(len(state['a_x']))
+        for name in AGENT_FIELDS:
+            getattr(world, name)[:] = state['a_' + name]
+        world.action[:] = state['a_action']
+        world.tx, world.ty = state['t_x'].copy(), state['t_y'].copy()
+        world.tlife, world.towner = state['t_lifetime'].copy(), state['t_owner'].copy()
+    else:
+        world = ox.World(seed)
+        cols = {name: state['a_' + name].tolist() for name in AGENT_FIELDS}
+        for i, idx in enumerate(state['a_id'].tolist()):
+            a = ox.Agent(idx, cols['x'][i], cols['y'][i])
+            for name in AGENT_FIELDS:
+                setattr(a, name, cols[name][i])
+            code = int(state['a_action'][i])
+            a.action = ACTIONS[code] if code >= 0 else None
+            world.agents.append(a)
+        for x, y, life, owner in zip(state['t_x'].tolist(), state['t_y'].tolist(),
+                                     state['t_lifetime'].tolist(), state['t_owner'].tolist()):
+            t = ox.GreenFieldToken((x, y), owner_id=None if owner < 0 else owner)
+            t.lifetime = life
+            world.tokens.add(t)
+    world.round = int(state['round'])
+    world.rng.setup.bit_generator.state = json.loads(str(state['setup_state']))
+    world.recorder = Recorder.from_state(state)
+    return world
+
+
+def save(world, path):
+    with open(path, 'wb') as f:
+        np.savez(f, **world_state(world))
+    return path
+
+
+def load(path):
+    with np.load(path, allow_pickle=False) as data:
+        return world_from_state({k: data[k] for k in data.files})
+
+
+def checkpoints(directory):
+    # {kierros: polku} hakemiston checkpointeille
+    found = {}
+    for path in glob.glob(os.path.join(directory, 'round_*.npz')):
+        m = re.search(r'round_(\d+)\.npz$', path)
+        if m:
+            found[int(m.group(1))] = path
+    return found
+
+
+def run_with_checkpoints(world, rounds, every, directory):
+    # Ajaa `rounds` kierrosta ja kirjoittaa checkpointin aina kun world.round % every == 0
+    os.makedirs(directory, exist_ok=True)
+    if world.round % every == 0:
+        save(world, os.path.join(directory, CHECKPOINT_NAME.format(world.round)))
+    for _ in range(rounds):
+        world.next_round()
+        if world.round % every == 0:
+            save(world, os.path.join(directory, CHECKPOINT_NAME.format(world.round)))
+    return world
+
+
+def restore_round(directory, round_no):
+    # Lähin checkpoint <= round_no ja loput kierrokset ajetaan eteenpäin
+    usable = [r for r in checkpoints(directory) if r <= round_no]
+    if not usable:
+        raise FileNotFoundError(f'no checkpoint at or before round {round_no} in {directory}')
+    world = load(checkpoints(directory)[max(usable)])
+    while world.round < round_no:
+        world.next_round()
+    return world
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Checkpointed oxoplect runs.')
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    run = sub.add_parser('run')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--agents', type=int, default=ox.N_AGENTS)
+    run.add_argument('--engine', choices=('obj', 'vec'), default='obj')
+    run.add_argument('--rounds', type=int, default=10000)
+    run.add_argument('--every', type=int, default=1000)
+    run.add_argument('--dir', default='oxoplect_checkpoints')
+    restore = sub.add_parser('restore')
+    restore.add_argument('--dir', default='oxoplect_checkpoints')
+    restore.add_argument('--round', type=int, required=True)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.cmd == 'run':
+        import oxoplect_headless
+        world = oxoplect_headless.make_world(args.seed, args.agents, args.engine)
+        run_with_checkpoints(world, args.rounds, args.every, args.dir)
+    else:
+        world = restore_round(args.dir, args.round)
+    alive, energy, tokens = world.stats()
+    print(f'round {world.round}: alive {alive}, mean energy {energy:.2f}, tokens {tokens} '
+          f'({(time.perf_counter() - t0) * 1000:.1f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+oxoplect_sweep.py
+
+Parametrihaku oxoplect-vakioille prosessipoolilla (kaikki ytimet).
+- Parametrit: MOVE_COST_PER_UNIT, REPAIR_HEALTH_PER_ENERGY, GENERATE_COST,
+  GREENFIELD_LIFETIME, GREENFIELD_ENERGY (muut pysyvät oletusarvoissa)
+- Joko ruudukko (--grid, kaikki yhdistelmät) tai satunnaisotos (--sample + --range)
+- Jokainen (parametrit, siemen) -solu ajetaan omana ajonaan ja sen rivi kirjoitetaan
+  heti tulostaulukkoon (CSV). Sama siemen -> sama tulos.
+- Keskeytynyt haku jatkuu samalla komennolla: valmiit solut luetaan CSV:stä ja ohitetaan.
+
+Käyttö:
+    python oxoplect_sweep.py --grid GENERATE_COST=4,6,8 --grid GREENFIELD_ENERGY=6,8,10 \\
+        --seeds 0-9 --rounds 300 --out sweep.csv
+    python oxoplect_sweep.py --sample 200 --sample-seed 1 \\
+        --range GENERATE_COST=3:12 --range GREENFIELD_LIFETIME=10:60 --seeds 0-4
+
+Huom: MOVE_COST_PER_UNIT on mukana, mutta liikkeen säännöt eivät (vielä) käytä sitä.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import oxoplect as ox
+import oxoplect_headless
+
+PARAMS = ('MOVE_COST_PER_UNIT', 'REPAIR_HEALTH_PER_ENERGY', 'GENERATE_COST',
+          'GREENFIELD_LIFETIME', 'GREENFIELD_ENERGY')
+DEFAULTS = {name: getattr(ox, name) for name in PARAMS}
+METRICS = ('final_alive', 'min_alive', 'final_mean_energy', 'mean_energy', 'mean_tokens', 'seconds')
+FIELDS = ('cell', 'seed') + PARAMS + METRICS
+
+
+def cell_key(params, seed):
+    # yksikäsitteinen tunniste solulle; sama merkkijono kirjoitetaan CSV:hen
+    return ';'.join(f'{name}={params[name]!r}' for name in PARAMS) + f';seed={seed}'
+
+
+def _parse_value(name, text):
+    # int-parametrit hyväksyvät myös 6.5 / 1e3 (kuten oxoplect_bench._ints)
+    if isinstance(DEFAULTS[name], int):
+        return int(float(text))
+    return type(DEFAULTS[name])(text)
+
+
+def grid_cells(grid):
+    # grid: {nimi: [arvot]} -> kaikki yhdistelmät, puuttuvat parametrit oletuksina
+    names = list(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        params = dict(DEFAULTS)
+        params.update(zip(names, values))
+        yield params
+
+
+def sample_cells(ranges, n, sample_seed=0):
+    # ranges: {nimi: (lo, hi)}; kokonaislukuparametrit arvotaan kokonaislukuina
+    rng = random.Random(sample_seed)
+    for _ in range(n):
+        params = dict(DEFAULTS)
+        for name, (lo, hi) in ranges.items():
+            if isinstance(DEFAULTS[name], int):
+                params[name] = rng.randint(int(lo), int(hi))
+            else:
+                params[name] = round(rng.uniform(lo, hi), 4)
+        yield params
+
+
+def run_cell(job):
+    # Ajetaan työprosessissa: asetetaan moduulin vakiot tälle solulle ja ajetaan maailma.
+    # Kaikki parametrit asetetaan joka kerta, koska pool käyttää prosesseja uudelleen.
+    params, seed, rounds, n_agents, engine = job
+    for name, value in params.items():
+        setattr(ox, name, value)
+    t0 = time.perf_counter()
+    alive, energy, tokens = oxoplect_headless.run(seed, rounds, n_agents, engine)
+    row = dict(params, cell=cell_key(params, seed), seed=seed)
+    row.update(final_alive=int(alive[-1]), min_alive=int(alive.min()),
+               final_mean_energy=float(energy[-1]), mean_energy=float(energy.mean()),
+               mean_tokens=float(tokens.mean()), seconds=round(time.perf_counter() - t0, 3))
+    return row
+
+
+def finished_cells(path):
+    # Lukee valmiit solut. Kaatumisessa kesken jäänyt viimeinen rivi poistetaan.
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    with open(path, newline='') as f:
+        return {row['cell'] for row in csv.DictReader(f) if row.get('cell')}
+
+
+def sweep(cells, seeds, rounds, out, n_agents=ox.N_AGENTS, engine='obj', processes=None):
+    done = finished_cells(out)
+    jobs = [(params, seed, rounds, n_agents, engine)
+            for params in cells for seed in seeds
+            if cell_key(params, seed) not in done]
+    print(f'{len(done)} cells already in {out}, {len(jobs)} to run')
+    new_file = not os.path.exists(out) or os.path.getsize(out) == 0
+    with open(out, 'a', newline='') as f, Pool(processes or os.cpu_count()) as pool:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+        for i, row in enumerate(pool.imap_unordered(run_cell, jobs), 1):
+            writer.writerow(row)
+            f.flush()
+            if i % 50 == 0 or i == len(jobs):
+                print(f'{i}/{len(jobs)}')
+    return out
+
+
+def load_results(path):
+    # CSV -> {sarake: numpy-taulukko}
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    cols = {'cell': np.array([r['cell'] for r in rows])}
+    for name in FIELDS[1:]:
+        cols[name] = np.array([float(r[name]) for r in rows])
+    return cols
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Parameter sweep over oxoplect constants.')
+    ap.add_argument('--grid', action='append', default=[], metavar='NAME=v1,v2,...')
+    ap.add_argument('--range', action='append', default=[], metavar='NAME=lo:hi')
+    ap.add_argument('--sample', type=int, default=0, help='random sample size over --range')
+    ap.add_argument('--sample-seed', type=int, default=0)
+    ap.add_argument('--seeds', default='0-4')
+    ap.add_argument('--rounds', type=int, default=200)
+    ap.add_argument('--agents', type=int, default=ox.N_AGENTS)
+    ap.add_argument('--engine', choices=('obj', 'vec'), default='obj')
+    ap.add_argument('--processes', type=int, default=None)
+    ap.add_argument('--out', default='oxoplect_sweep.csv')
+    args = ap.parse_args()
+
+    grid = {}
+    for spec in args.grid:
+        name, _, values = spec.partition('=')
+        if name not in PARAMS:
+            ap.error(f'unknown parameter {name}, choose from {", ".join(PARAMS)}')
+        try:
+            grid[name] = [_parse_value(name, v) for v in values.split(',')]
+        except ValueError:
+            ap.error(f'bad value in {spec!r}: {name} takes numbers')
+    ranges = {}
+    for spec in args.range:
+        name, _, span = spec.partition('=')
+        if name not in PARAMS:
+            ap.error(f'unknown parameter {name}, choose from {", ".join(PARAMS)}')
+        bounds = []
+        for bound in span.partition(':')[::2]:
+            try:
+                bounds.append(float(bound))
+            except ValueError:
+                ap.error(f'bad bound {bound!r} in {spec!r}: expected {name}=lo:hi with numbers')
+        if bounds[0] > bounds[1]:
+            ap.error(f'empty range in {spec!r}: lo is greater than hi')
+        ranges[name] = tuple(bounds)
+
+    if args.sample:
+        cells = list(sample_cells(ranges, args.sample, args.sample_seed))
+    else:
+        cells = list(grid_cells(grid))
+    sweep(cells, oxoplect_headless.parse_seeds(args.seeds), args.rounds, args.out,
+          args.agents, args.engine, args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+"""
+oxoplect_vec.py
+
+Vektoroitu (struct-of-arrays) versio oxoplect-maailmasta.
+- Jokainen agentin kenttä (health, bubble_energy, poolit, cooldown, efficiency_buff, ...)
+  on yksi NumPy-taulukko koko populaatiolle
+- VecWorld.next_round ajaa decide / perform / rebalance -vaiheet taulukko-operaatioina
+- Satunnaisluvut tulevat samasta WorldRNG.round_draws -taulukosta kuin olio-polulla,
+  joten samalla siemenellä tulokset ovat samat (oxoplect.World on referenssi)
+
+Käyttö:
+    import oxoplect, oxoplect_vec
+    vec = oxoplect_vec.VecWorld(seed=1); vec.spawn_agents(100000)
+    # tai olio-maailmasta: oxoplect_vec.VecWorld.from_world(world)
+    vec.next_round()
+
+python oxoplect_vec.py  -> ajaa pariteettitarkistuksen olio-polkua vastaan
+"""
+
+import copy
+import math
+
+import numpy as np
+
+import oxoplect as ox
+from oxoplect_metrics import Recorder, EV_ROUND, EV_ACTIONS, EV_COLLECTED
+
+# Toimintokoodit action-taulukossa (-1 = ei toimintoa vielä)
+NO_ACTION, MOVE, REPAIR, GENERATE = -1, 0, 1, 2
+ACTION_NAMES = {MOVE: 'MOVE', REPAIR: 'REPAIR', GENERATE: 'GENERATE'}
+
+# Montako tokenia poiminta käsittelee kerralla (kukin 3x3 naapurisolua)
+PICKUP_CHUNK = 1 << 18
+# 3x3 naapurisolujen siirtymät (x, y)
+_NEIGHBOURS_X = np.repeat([-1, 0, 1], 3)
+_NEIGHBOURS_Y = np.tile([-1, 0, 1], 3)
+
+
+def _clamp(v, a, b):
+    # sama kuin oxoplect.clamp, mutta taulukoille
+    return np.maximum(a, np.minimum(b, v))
+
+
+class VecGrid:
+    # oxoplect.SpatialGrid taulukoille: agentit lajitellaan soluittain kerran
+    # kierroksessa, ja kyselyt tarkistavat vain 3x3 naapurisolut.
+    def __init__(self, x, y, members, cell=ox.PICKUP_RADIUS):
+        self.cell = cell
+        self.ncx = int(ox.WIDTH // cell) + 1
+        self.ncy = int(ox.HEIGHT // cell) + 1
+        cid = self._cell_id(x[members] // cell, y[members] // cell)
+        order = np.argsort(cid, kind='stable')  # solun sisällä indeksijärjestys säilyy
+        self.members = members[order]
+        self.mx, self.my = x[self.members], y[self.members]
+        self.start = np.searchsorted(cid[order], np.arange(self.ncx * self.ncy + 1))
+
+    def _cell_id(self, cx, cy):
+        cx = np.clip(cx, 0, self.ncx - 1).astype(np.int64)
+        cy = np.clip(cy, 0, self.ncy - 1).astype(np.int64)
+        return cy * self.ncx + cx
+
+    def first_within(self, qx, qy, radius=ox.PICKUP_RADIUS, chunk=PICKUP_CHUNK):
+        # pienin jäsenindeksi säteen sisällä jokaiselle kyselypisteelle (-1 = ei ketään)
+        out = np.full(len(qx), -1, dtype=np.int64)
+        if not len(self.members):
+            return out
+        for s in range(0, len(qx), chunk):
+            out[s:s + chunk] = self._first_within(qx[s:s + chunk], qy[s:s + chunk], radius)
+        return out
+
+    def _first_within(self, qx, qy, radius):
+        # Solun jäsenet ovat indeksijärjestyksessä, joten 3x3 solua käydään rinnakkain
+        # alusta alkaen ja kysely loppuu kun yksikään jäljellä oleva ehdokas ei voi olla
+        # löydettyä pienempi. Tiheässä parvessa ehdokkaita tarkistetaan vain muutama.
+        none = np.iinfo(np.int64).max
+        gx = (qx // self.cell)[:, None] + _NEIGHBOURS_X
+        gy = (qy // self.cell)[:, None] + _NEIGHBOURS_Y
+        inside = (gx >= 0) & (gx < self.ncx) & (gy >= 0) & (gy < self.ncy)
+        cid = self._cell_id(gx, gy)
+        pos = np.where(inside, self.start[cid], 0)
+        end = np.where(inside, self.start[cid + 1], 0)
+        best = np.full(len(qx), none, dtype=np.int64)
+        rows = np.arange(len(qx))
+        r2 = radius ** 2
+        last = len(self.members) - 1
+        while len(rows):
+            ms = np.minimum(pos, last)
+            cand = np.where(pos < end, self.members[ms], none)
+            need = cand < best[rows, None]
+            live = need.any(axis=1)
+            rows, pos, end, ms, cand, need = rows[live], pos[live], end[live], ms[live], cand[live], need[live]
+            if not len(rows):
+                break
+            d2 = (self.mx[ms] - qx[rows, None]) ** 2 + (self.my[ms] - qy[rows, None]) ** 2
+            hit = need & (d2 <= r2)
+            best[rows] = np.minimum(best[rows], np.where(hit, cand, none).min(axis=1))
+            pos = np.where(need, pos + 1, end)  # solu jonka ehdokas ei voita löydettyä on valmis
+        return np.where(best == none, -1, best)
+
+
+class VecWorld:
+    def __init__(self, seed=None):
+        self.rng = ox.WorldRNG(seed)
+        self.round = 0
+        self.recorder = Recorder()
+        self._alloc_agents(0)
+        self.tx = np.zeros(0)
+        self.ty = np.zeros(0)
+        self.tlife = np.zeros(0, dtype=np.int64)
+        self.towner = np.zeros(0, dtype=np.int64)  # -1 = ei omistajaa
+
+    def _alloc_agents(self, n):
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.health = np.full(n, 80.0)
+        self.max_health = np.full(n, 100.0)
+        self.bubble_energy = np.full(n, 30.0)
+        self.move_pool = np.full(n, 10.0)
+        self.repair_pool = np.full(n, 10.0)
+        self.generate_pool = np.full(n, 10.0)
+        self.generate_cooldown = np.zeros(n, dtype=np.int64)
+        self.efficiency_buff = np.zeros(n)
+        self.action = np.full(n, NO_ACTION, dtype=np.int8)
+        self.alive = np.ones(n, dtype=bool)
+
+    @property
+    def n_agents(self):
+        return len(self.x)
+
+    @property
+    def n_tokens(self):
+        return len(self.tx)
+
+    @classmethod
+    def from_world(cls, world):
+        # Kopioi olio-maailman tila taulukoiksi
+        vec = cls()
+        agents = world.agents
+        vec._alloc_agents(len(agents))
+        for name in ('x', 'y', 'health', 'max_health', 'bubble_energy', 'move_pool',
+                     'repair_pool', 'generate_pool', 'generate_cooldown', 'efficiency_buff', 'alive'):
+            getattr(vec, name)[:] = [getattr(a, name) for a in agents]
+        codes = {v: k for k, v in ACTION_NAMES.items()}
+        vec.action[:] = [codes.get(a.action, NO_ACTION) for a in agents]
+        tokens = list(world.tokens)
+        vec.tx = np.array([t.x for t in tokens], dtype=float)
+        vec.ty = np.array([t.y for t in tokens], dtype=float)
+        vec.tlife = np.array([t.lifetime for t in tokens], dtype=np.int64)
+        vec.towner = np.array([-1 if t.owner_id is None else t.owner_id for t in tokens], dtype=np.int64)
+        vec.rng = copy.deepcopy(world.rng)
+        vec.round = world.round
+        vec.recorder = copy.deepcopy(world.recorder)
+        return vec
+
+    def spawn_agents(self, n):
+        # samat arvonnat samassa järjestyksessä kuin World.spawn_agents
+        xs = self.rng.randint(50, ox.WIDTH - 50, n)
+        ys = self.rng.randint(80, ox.HEIGHT - 80, n)
+        old = self.n_agents
+        grown = VecWorld()
+        grown._alloc_agents(old + n)
+        for name in ('x', 'y', 'health', 'max_health', 'bubble_energy', 'move_pool', 'repair_pool',
+                     'generate_pool', 'generate_cooldown', 'efficiency_buff', 'action', 'alive'):
+            arr = getattr(grown, name)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        self.x[old:], self.y[old:] = xs, ys
+
+    def spawn_token(self, pos, owner_id=None):
+        self.spawn_tokens(np.array([pos[0]], dtype=float), np.array([pos[1]], dtype=float),
+                          np.array([-1 if owner_id is None else owner_id]))
+
+    def spawn_tokens(self, xs, ys, owners=None):
+        # owners None = ei omistajaa (-1)
+        self.tx = np.concatenate([self.tx, np.asarray(xs, dtype=float)])
+        self.ty = np.concatenate([self.ty, np.asarray(ys, dtype=float)])
+        self.tlife = np.concatenate([self.tlife, np.full(len(xs), ox.GREENFIELD_LIFETIME, dtype=np.int64)])
+        owners = np.full(len(xs), -1) if owners is None else np.asarray(owners)
+        self.towner = np.concatenate([self.towner, owners.astype(np.int64)])
+
+    def stats(self):
+        # kuten World.stats: (elossa olevat, keskim. bubble_energy elävillä, tokenit)
+        n = int(self.alive.sum())
+        mean_energy = float(self.bubble_energy[self.alive].mean()) if n else 0.0
+        return n, mean_energy, self.n_tokens
+
+    # --- kierros ---
+
+    @property
+    def logs(self):
+        return self.recorder.log_lines()
+
+    def next_round(self):
+        self.round += 1
+        rec = self.recorder
+        rec.begin_round(self.round)
+        rec.event(self.round, -1, EV_ROUND)
+        u = self.rng.round_draws(self.round, self.n_agents)
+        idx = np.flatnonzero(self.alive)
+        t = rec.clock()
+        self._decide(idx, u[idx])
+        counts = np.bincount(self.action[idx], minlength=3) if len(idx) else np.zeros(3, dtype=np.int64)
+        t = rec.lap('decide', t)
+        spawned, failed, deaths = self._perform(idx, u[idx])
+        t = rec.lap('perform', t)
+        expired, collected = self._update_tokens()
+        t = rec.lap('tokens', t)
+        rec.event(self.round, -1, EV_ACTIONS, counts[MOVE], counts[REPAIR], counts[GENERATE])
+        if collected:
+            rec.event(self.round, -1, EV_COLLECTED, collected, ox.GREENFIELD_ENERGY)
+        # passiivinen lataus generate_poolista
+        alive = self.alive
+        be = np.minimum(self.bubble_energy[alive] + self.generate_pool[alive] * 0.02, 120)
+        self.bubble_energy[alive] = be
+        rec.lap('recharge', t)
+        pools = self.move_pool[alive] + self.repair_pool[alive] + self.generate_pool[alive]
+        rec.record(alive=len(be), deaths=deaths, moves=counts[MOVE], repairs=counts[REPAIR],
+                   generates=spawned, generate_failed=failed, tokens_spawned=spawned,
+                   tokens_collected=collected, tokens_expired=expired, tokens_alive=self.n_tokens,
+                   energy_total=be.sum(), pool_total=pools.sum())
+
+    def _decide(self, idx, u):
+        mp, rp, gp = self.move_pool[idx], self.repair_pool[idx], self.generate_pool[idx]
+        total = mp + rp + gp + 1e-6
+        p_move = mp / total
+        p_repair = rp / total
+        p_generate = gp / total
+        r = u[:, ox.U_ACTION]
+        repair_first = ((self.health[idx] < self.max_health[idx] * 0.5) & (rp > 1)
+                        & (u[:, ox.U_REPAIR] < 0.6))
+        generate_first = ((self.generate_cooldown[idx] <= 0) & (gp > 1)
+                          & (u[:, ox.U_GENERATE] < p_generate))
+        action = np.where(r < p_move, MOVE, np.where(r < p_move + p_repair, REPAIR, GENERATE))
+        action = np.where(generate_first, GENERATE, action)
+        action = np.where(repair_first, REPAIR, action)
+        self.action[idx] = action
+
+    def _perform(self, idx, u):
+        act = self.action[idx]
+        be = self.bubble_energy[idx]
+        buff = self.efficiency_buff[idx]
+        mp, rp, gp = self.move_pool[idx], self.repair_pool[idx], self.generate_pool[idx]
+        cd = self.generate_cooldown[idx]
+
+        # MOVE
+        m = act == MOVE
+        if m.any():
+            energy = np.minimum(mp[m], be[m] * 0.6)
+            dist = energy * (1.0 + buff[m]) * 2.0
+            ang = u[m, ox.U_MOVE_ANGLE] * 2 * math.pi
+            mi = idx[m]
+            self.x[mi] = _clamp(self.x[mi] + np.cos(ang) * dist, ox.AGENT_RADIUS, ox.WIDTH - ox.AGENT_RADIUS)
+            self.y[mi] = _clamp(self.y[mi] + np.sin(ang) * dist, ox.AGENT_RADIUS, ox.HEIGHT - ox.AGENT_RADIUS)
+            mp[m] -= energy
+
+        # REPAIR
+        m = act == REPAIR
+        if m.any():
+            energy = np.minimum(rp[m], be[m] * 0.8)
+            heal = energy * ox.REPAIR_HEALTH_PER_ENERGY * (1.0 + buff[m] * 0.5)
+            mi = idx[m]
+            self.health[mi] = _clamp(self.health[mi] + heal, 0, self.max_health[mi])
+            rp[m] -= energy
+
+        # GENERATE
+        m = act == GENERATE
+        gen = fail = ()
+        if m.any():
+            energy = np.minimum(gp[m], be[m] * 0.9)
+            ok = (energy >= ox.GENERATE_COST) & (cd[m] <= 0)
+            gen = np.flatnonzero(m)[ok]
+            if len(gen):
+                gi = idx[gen]
+                angle = u[gen, ox.U_TOKEN_ANGLE] * 2 * math.pi
+                rx = _clamp(self.x[gi] + np.cos(angle) * (ox.BUBBLE_RADIUS + 12), 10, ox.WIDTH - 10)
+                ry = _clamp(self.y[gi] + np.sin(angle) * (ox.BUBBLE_RADIUS + 12), 10, ox.HEIGHT - 10)
+                self.spawn_tokens(rx, ry, gi)
+                gp[gen] -= ox.GENERATE_COST
+                cd[gen] = 2 + (u[gen, ox.U_COOLDOWN] * 3).astype(np.int64)
+                buff[gen] += np.where(u[gen, ox.U_BUFF] < 0.25, 0.02, 0.0)
+            fail = np.flatnonzero(m)[~ok]
+            if len(fail):
+                # ei tarpeeksi energiaa: osa muunnetaan repair-pooliin
+                energy = energy[~ok]
+                rp[fail] += energy * 0.4
+                gp[fail] -= energy
+
+        mp = np.maximum(0.0, mp)
+        rp = np.maximum(0.0, rp)
+        gp = np.maximum(0.0, gp)
+        be = np.maximum(0.0, be - 0.2)
+        cd = np.maximum(0, cd - 1)
+        # slight_mutate_allocations + balance_pools
+        mp = np.maximum(0.0, mp + ox.uniform(u[:, ox.U_MUT_MOVE], -1.2, 1.2))
+        rp = np.maximum(0.0, rp + ox.uniform(u[:, ox.U_MUT_REPAIR], -1.2, 1.2))
+        gp = np.maximum(0.0, gp + ox.uniform(u[:, ox.U_MUT_GENERATE], -1.2, 1.2))
+        s = mp + rp + gp
+        empty = s <= 0
+        scale = be / np.where(empty, 1.0, s)
+        mp = np.where(empty, be / 3.0, mp * scale)
+        rp = np.where(empty, be / 3.0, rp * scale)
+        gp = np.where(empty, be / 3.0, gp * scale)
+
+        self.move_pool[idx] = mp
+        self.repair_pool[idx] = rp
+        self.generate_pool[idx] = gp
+        self.bubble_energy[idx] = be
+        self.generate_cooldown[idx] = cd
+        self.efficiency_buff[idx] = buff
+        dead = (self.health[idx] <= 0) | ((be <= 0) & (rp < 0.1) & (mp < 0.1))
+        self.alive[idx[dead]] = False
+        return len(gen), len(fail), int(dead.sum())
+
+    def _update_tokens(self):
+        # lifetime ja vanhentuneiden poisto; palauttaa (vanhentuneet, poimitut)
+        self.tlife -= 1
+        keep = self.tlife > 0
+        expired = len(keep) - int(keep.sum())
+        self.tx, self.ty = self.tx[keep], self.ty[keep]
+        self.tlife, self.towner = self.tlife[keep], self.towner[keep]
+        if not self.n_tokens:
+            return expired, 0
+        # jokaisen tokenin poimii pienin-indeksinen elävä agentti säteen sisällä
+        taker = VecGrid(self.x, self.y, np.flatnonzero(self.alive)).first_within(self.tx, self.ty)
+        got = taker >= 0
+        who = taker[got]
+        if len(who):
+            self._collect(who)
+        self.tx, self.ty = self.tx[~got], self.ty[~got]
+        self.tlife, self.towner = self.tlife[~got], self.towner[~got]
+        return expired, len(who)
+
+    def _collect(self, who):
+        # np.add.at lisää tokenijärjestyksessä, kuten olio-polun silmukka
+        np.add.at(self.bubble_energy, who, ox.GREENFIELD_ENERGY * (1.0 + self.efficiency_buff[who]))
+        bonus = ox.GREENFIELD_ENERGY * 0.4
+        np.add.at(self.move_pool, who, bonus * 0.4)
+        np.add.at(self.repair_pool, who, bonus * 0.3)
+        np.add.at(self.generate_pool, who, bonus * 0.3)
+
+
+def max_difference(world, vec):
+    # Suurin ero olio-maailman ja VecWorldin välillä (0.0 = identtiset)
+    diff = 0.0
+    for name in ('x', 'y', 'health', 'bubble_energy', 'move_pool', 'repair_pool',
+                 'generate_pool', 'generate_cooldown', 'efficiency_buff', 'alive'):
+        ref = np.array([getattr(a, name) for a in world.agents], dtype=float)
+        diff = max(diff, float(np.max(np.abs(ref - getattr(vec, name)), initial=0.0)))
+    tokens = list(world.tokens)
+    if len(tokens) != vec.n_tokens:
+        return math.inf
+    ref = np.array([(t.x, t.y, t.lifetime) for t in tokens], dtype=float).reshape(-1, 3)
+    got = np.stack([vec.tx, vec.ty, vec.tlife], axis=1)
+    return max(diff, float(np.max(np.abs(ref - got), initial=0.0)))
+
+
+def parity_check(seed=1, n_agents=ox.N_AGENTS, rounds=200):
+    world = ox.new_world(n_agents, seed=seed)
+    vec = VecWorld.from_world(world)
+    worst = 0.0
+    for _ in range(rounds):
+        world.next_round()
+        vec.next_round()
+        worst = max(worst, max_difference(world, vec))
+    return worst
+
+
+if __name__ == '__main__':
+    # pariteetti on tarkka: mikä tahansa ero lopettaa nollasta poikkeavalla paluuarvolla
+    failed = []
+    for seed in range(3):
+        diff = parity_check(seed)
+        print(f'seed {seed}: max difference {diff:.3g}')
+        if diff != 0:
+            failed.append(seed)
+    if failed:
+        raise SystemExit(f'parity broken for seeds {failed}')
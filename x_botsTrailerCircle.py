@@ -1,7 +1,31 @@
-import pygame
-import numpy as np
+"""
+x_botsTrailerCircle.py
+
+Bots run short command sequences (FWD, RT, LT, FWD_UNTIL, TRAIL), eat green dots
+and learn which sequences paid off.
+- FWD_UNTIL drives straight until the next pixel step would leave the arena or
+  touch a dot. With RAY_MARCH the stopping step is solved analytically from the
+  heading ray (arena edges + dot circles from DotField's grid index) and the bot
+  jumps there at once, paying MOVE_COST per skipped step; RAY_MARCH = False keeps
+  the original pixel loop as the reference.
+- TRAIL heads for the centroid of the bots with at least FAT_FACTOR times its
+  energy. With a TrailCache the swarm's energies are sorted once per frame and x/y
+  prefix sums kept, so each centroid is a binary search plus an O(1) lookup
+  (positions and energies of the others as they were at the start of the frame).
+
+- V switches between the per-object bots and the NumPy population engine
+  (x_botsTrailerCircle_vec.VecSwarm).
+
+Käyttö:
+    python x_botsTrailerCircle.py
+"""
+
+import bisect
+import math
 import random
 
+import numpy as np
+
 # --- Config ---
 WIDTH, HEIGHT = 800, 600
 BOT_COUNT = 50
@@ -26,13 +50,15 @@ TURN_ANGLE = 1
 MOVE_COST = 0.3
 DOT_ENERGY = 200
 SEQ_MIN_LEN = 4
+QUEUE_LEN = 6  # commands per sequence
 PREF_INCREASE = 0.01
 FAT_FACTOR = 1.2  # 20% more energy than self
 TRAIL_REACH_DIST = 1  # Distance threshold to "arrive" at trail target
-
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
+EDGE = 5  # bots stay within [EDGE, WIDTH - EDGE] x [EDGE, HEIGHT - EDGE]
+DOT_HIT_RADIUS = 8  # a step ending closer than this to a dot hits it
+DOT_CELL = 32  # DotField grid cell size (>= 4/3 * DOT_HIT_RADIUS for the ray query)
+DOT_GRID_MIN = 4000  # below this many dots one vector check beats the grid walk (first_dot_step)
+RAY_MARCH = True  # FWD_UNTIL: analytic jump (True) or pixel steps (False, reference)
 
 # --- Command definitions ---
 FWD, RT, LT, FWD_UNTIL, TRAIL = 0, 1, 2, 3, 4
@@ -40,6 +66,7 @@ COMMANDS = [FWD, RT, LT, FWD_UNTIL, TRAIL]
 
 def draw_dashed_line(surf, color, start_pos, end_pos, width=1, dash_length=5):
     """Draw a dashed line between two points."""
+    import pygame
     x1, y1 = start_pos
     x2, y2 = end_pos
     dl = dash_length
@@ -55,15 +82,213 @@ def draw_dashed_line(surf, color, start_pos, end_pos, width=1, dash_length=5):
         end = (x1 + dx * min(i + dl, length), y1 + dy * min(i + dl, length))
         pygame.draw.line(surf, color, start, end, width)
 
+class DotField(list):
+    """List of [x, y] dots with a grid index that is rebuilt after any change."""
+
+    def __init__(self, dots=()):
+        super().__init__(dots)
+        self._grid = None
+
+    def _changed(method):
+        def wrapper(self, *args):
+            self._grid = None
+            return method(self, *args)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    append = _changed(list.append)
+    extend = _changed(list.extend)
+    insert = _changed(list.insert)
+    remove = _changed(list.remove)
+    pop = _changed(list.pop)
+    clear = _changed(list.clear)
+    __setitem__ = _changed(list.__setitem__)
+    __delitem__ = _changed(list.__delitem__)
+    __iadd__ = _changed(list.__iadd__)
+    del _changed
+
+    def grid(self):
+        # (xs, ys, {cell: dot indices})
+        if self._grid is None:
+            xs = np.array([d[0] for d in self], dtype=float)
+            ys = np.array([d[1] for d in self], dtype=float)
+            cells = {}
+            for i, (cx, cy) in enumerate(zip((xs // DOT_CELL).astype(int).tolist(),
+                                             (ys // DOT_CELL).astype(int).tolist())):
+                cells.setdefault((cx, cy), []).append(i)
+            self._grid = (xs, ys, cells)
+        return self._grid
+
+
+def _first_hit_step(qx, qy, x0, y0, dx, dy, max_steps):
+    """Smallest step j in 1..max_steps where (x0 + j*dx, y0 + j*dy) is within
+    DOT_HIT_RADIUS of a dot (qx, qy arrays), or None."""
+    if not len(qx) or max_steps < 1:
+        return None
+    vx, vy = x0 - qx, y0 - qy
+    a = dx * dx + dy * dy
+    b = 2 * (vx * dx + vy * dy)
+    c = vx * vx + vy * vy - DOT_HIT_RADIUS ** 2
+    disc = b * b - 4 * a * c
+    ok = disc > 0
+    if not ok.any():
+        return None
+    qx, qy, b, disc = qx[ok], qy[ok], b[ok], disc[ok]
+    # first integer step inside the root interval, then +-1 against rounding
+    j = np.maximum(1, np.floor((-b - np.sqrt(disc)) / (2 * a)) + 1)
+    best = None
+    for cand in (j - 1, j, j + 1):
+        px, py = x0 + cand * dx, y0 + cand * dy
+        hit = (cand >= 1) & (cand <= max_steps) & ((px - qx) ** 2 + (py - qy) ** 2 < DOT_HIT_RADIUS ** 2)
+        if hit.any():
+            first = int(cand[hit].min())
+            best = first if best is None else min(best, first)
+    return best
+
+
+def first_dot_step(dots, x0, y0, dx, dy, max_steps):
+    """First step along the ray that touches a dot (None = no dot within max_steps).
+    A DotField with at least DOT_GRID_MIN dots is queried cell by cell along the ray,
+    smaller ones and plain lists are checked whole. Measured per query on random rays
+    in the 800 x 600 arena: 15 dots 81 us whole vs 268 us walk, the two even out
+    around 4000 dots, and at 16000 dots the walk takes 0.40 ms against 1.0 ms."""
+    if not isinstance(dots, DotField):
+        qx = np.array([d[0] for d in dots], dtype=float)
+        qy = np.array([d[1] for d in dots], dtype=float)
+        return _first_hit_step(qx, qy, x0, y0, dx, dy, max_steps)
+    xs, ys, cells = dots.grid()
+    if len(xs) < DOT_GRID_MIN:
+        return _first_hit_step(xs, ys, x0, y0, dx, dy, max_steps)
+    if max_steps < 1:
+        return None
+    # samples every half cell: a dot within DOT_HIT_RADIUS of the ray lies in the
+    # 3x3 cells around the nearest sample
+    speed = math.hypot(dx, dy)
+    h = DOT_CELL / 2
+    length = max_steps * speed
+    seen = set()
+    best = None
+    t = 0.0
+    while t <= length + h:
+        sx, sy = int((x0 + dx * t / speed) // DOT_CELL), int((y0 + dy * t / speed) // DOT_CELL)
+        idx = []
+        for cell in ((sx + i, sy + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            if cell not in seen:
+                seen.add(cell)
+                idx.extend(cells.get(cell, ()))
+        if idx:
+            hit = _first_hit_step(xs[idx], ys[idx], x0, y0, dx, dy, max_steps if best is None else best - 1)
+            if hit is not None:
+                best = hit
+        if best is not None and best * speed <= t - h / 2:
+            break  # dots not yet seen would hit later than best
+        t += h
+    return best
+
+
+def edge_steps(x0, y0, dx, dy):
+    """Number of consecutive steps j = 1, 2, ... with (x0 + j*dx, y0 + j*dy) inside the arena."""
+    lo, hi = -math.inf, math.inf
+    for p, d, size in ((x0, dx, WIDTH), (y0, dy, HEIGHT)):
+        if d == 0:
+            if not EDGE <= p <= size - EDGE:
+                return 0
+            continue
+        a, b = (EDGE - p) / d, (size - EDGE - p) / d
+        lo, hi = max(lo, min(a, b)), min(hi, max(a, b))
+
+    def inside(j):
+        x, y = x0 + j * dx, y0 + j * dy
+        return EDGE <= x <= WIDTH - EDGE and EDGE <= y <= HEIGHT - EDGE
+
+    if lo > 1 or not inside(1):
+        return 0
+    k = max(1, int(math.floor(hi)))
+    while k > 1 and not inside(k):
+        k -= 1
+    while inside(k + 1):
+        k += 1
+    return k
+
+
+def energy_steps(energy, cost=MOVE_COST):
+    """Steps the FWD_UNTIL loop takes before energy drops to <= 0."""
+    if energy <= 0:
+        return 0
+    k = max(1, math.ceil(energy / cost))
+    while k > 1 and energy - (k - 1) * cost <= 0:
+        k -= 1
+    while energy - k * cost > 0:
+        k += 1
+    return k
+
+
+class TrailCache:
+    """Frame snapshot of the swarm for TRAIL targets: energies sorted ascending with
+    prefix sums of x and y, so the bots with energy >= threshold are a suffix."""
+
+    def __init__(self, bots=None):
+        self.bots = bots
+        self._row = {}
+        if bots is not None:
+            self.update()
+
+    def update(self):
+        # call once per frame before the bots step
+        n = len(self.bots)
+        self.load(np.fromiter((b.energy for b in self.bots), dtype=float, count=n),
+                  np.fromiter((b.x for b in self.bots), dtype=float, count=n),
+                  np.fromiter((b.y for b in self.bots), dtype=float, count=n))
+        self._row = {id(b): i for i, b in enumerate(self.bots)}
+
+    def load(self, energy, x, y):
+        # snapshot from arrays (row i = bot i)
+        order = np.argsort(energy, kind='stable')
+        self.e, self.x, self.y = energy, x, y
+        self.energy = energy[order]
+        self.sum_x = np.concatenate(([0.0], np.cumsum(x[order])))
+        self.sum_y = np.concatenate(([0.0], np.cumsum(y[order])))
+        self._energies = self.energy.tolist()
+        self._sx, self._sy = self.sum_x.tolist(), self.sum_y.tolist()
+        self._e, self._x, self._y = energy.tolist(), x.tolist(), y.tolist()
+
+    def target(self, bot):
+        """Centroid of the other bots with energy >= bot.energy * FAT_FACTOR, or None if fewer than 2."""
+        n = len(self._energies)
+        threshold = bot.energy * FAT_FACTOR
+        i = bisect.bisect_left(self._energies, threshold)
+        count, sx, sy = n - i, self._sx[n] - self._sx[i], self._sy[n] - self._sy[i]
+        row = self._row.get(id(bot))
+        if row is not None and self._e[row] >= threshold:
+            count, sx, sy = count - 1, sx - self._x[row], sy - self._y[row]
+        if count < 2:
+            return None
+        return (sx / count, sy / count)
+
+    def targets(self, rows, energies):
+        """target() for snapshot rows at once: (tx, ty, found) arrays."""
+        n = len(self.energy)
+        threshold = energies * FAT_FACTOR
+        i = np.searchsorted(self.energy, threshold, side='left')
+        count, sx, sy = n - i, self.sum_x[n] - self.sum_x[i], self.sum_y[n] - self.sum_y[i]
+        own = self.e[rows] >= threshold
+        count = count - own
+        sx = np.where(own, sx - self.x[rows], sx)
+        sy = np.where(own, sy - self.y[rows], sy)
+        found = count >= 2
+        count = np.maximum(count, 1)
+        return sx / count, sy / count, found
+
+
 class Bot:
-    def __init__(self, x, y, color, all_bots_ref):
+    def __init__(self, x, y, color, all_bots_ref, trail_cache=None):
         self.x, self.y = x, y
         self.angle = random.uniform(0, 360)
         self.energy = 30
         self.color = color
         
         # Start with a random sequence
-        self.command_queue = [random.choice(COMMANDS) for _ in range(6)]
+        self.command_queue = [random.choice(COMMANDS) for _ in range(QUEUE_LEN)]
         self.cmd_index = 0
         
         # Learning: store sequences and preferences
@@ -72,6 +297,7 @@ class Bot:
         
         # Access to other bots
         self.all_bots_ref = all_bots_ref
+        self.trail_cache = trail_cache  # TrailCache shared by the swarm (None = scan all_bots_ref)
         
         # Trail state
         self.trail_target = None
@@ -83,12 +309,12 @@ class Bot:
         new_y = self.y + BOT_SPEED * np.sin(np.radians(self.angle))
 
         # Check arena bounds (edge detection)
-        if new_x < 5 or new_x > WIDTH - 5 or new_y < 5 or new_y > HEIGHT - 5:
+        if new_x < EDGE or new_x > WIDTH - EDGE or new_y < EDGE or new_y > HEIGHT - EDGE:
             return False  # Hit arena edge
 
         # Check for bounty (energy dot)
         for dx, dy in dots:
-            if np.hypot(new_x - dx, new_y - dy) < 8:
+            if np.hypot(new_x - dx, new_y - dy) < DOT_HIT_RADIUS:
                 if not check_only:
                     self.energy += DOT_ENERGY
                     self.bounty_count += 1
@@ -99,9 +325,33 @@ class Bot:
             self.x, self.y = new_x, new_y
             self.energy -= MOVE_COST
         return True
+
+    def _fwd_until_steps(self, dots):
+        """FWD_UNTIL pixel by pixel (reference)."""
+        moved = True
+        while moved and self.energy > 0:
+            moved = self._move_forward(dots, check_only=True)
+            if moved:
+                self._move_forward(dots)  # Actually move and spend energy
+
+    def _fwd_until_march(self, dots):
+        """FWD_UNTIL in one jump: the step count is the smallest of the edge, dot
+        and energy limits along the heading ray; the dot is not eaten (as in
+        the check_only probe of the pixel loop)."""
+        rad = math.radians(self.angle)
+        dx, dy = BOT_SPEED * math.cos(rad), BOT_SPEED * math.sin(rad)
+        k = min(edge_steps(self.x, self.y, dx, dy), energy_steps(self.energy))
+        hit = first_dot_step(dots, self.x, self.y, dx, dy, k)
+        if hit is not None:
+            k = hit - 1
+        if k > 0:
+            self.x, self.y = self.x + k * dx, self.y + k * dy
+            self.energy -= k * MOVE_COST
     
     def _set_trail_target(self):
         """Pick a new trail target based on well-off bots."""
+        if self.trail_cache is not None:
+            return self.trail_cache.target(self)
         well_off = [b for b in self.all_bots_ref if b is not self and b.energy >= self.energy * FAT_FACTOR]
         if len(well_off) < 2:
             return None
@@ -144,11 +394,10 @@ class Bot:
             self.energy -= MOVE_COST
 
         elif cmd == FWD_UNTIL:
-            moved = True
-            while moved and self.energy > 0:
-                moved = self._move_forward(dots, check_only=True)
-                if moved:
-                    self._move_forward(dots)  # Actually move and spend energy
+            if RAY_MARCH:
+                self._fwd_until_march(dots)
+            else:
+                self._fwd_until_steps(dots)
         
         elif cmd == TRAIL:
             if not self.trail_target:
@@ -168,7 +417,7 @@ class Bot:
     def mutate_sequence(self):
         # Occasionally try another sequence
         if random.random() < 0.2:
-            self.command_queue = [random.choice(COMMANDS) for _ in range(6)]
+            self.command_queue = [random.choice(COMMANDS) for _ in range(QUEUE_LEN)]
             self.cmd_index = 0
         else:
             # Weighted pick of known sequences
@@ -180,47 +429,72 @@ class Bot:
             self.cmd_index = 0
 
 def spawn_dots():
-    return [[random.randint(0, WIDTH), random.randint(0, HEIGHT)] for _ in range(DOT_COUNT)]
+    return DotField([random.randint(0, WIDTH), random.randint(0, HEIGHT)] for _ in range(DOT_COUNT))
 
 # --- Main ---
-bots = []
-bots.extend(Bot(random.randint(0, WIDTH), random.randint(0, HEIGHT),
-                (random.randint(100,255), random.randint(100,255), random.randint(100,255)),
-                bots)
-            for _ in range(BOT_COUNT))
-
-dots = spawn_dots()
-running = True
-frame_counter = 0
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    screen.fill((0, 0, 0))
-    
-    # Draw dots
-    for dx, dy in dots:
-        pygame.draw.circle(screen, (0, 255, 0), (int(dx), int(dy)), 5)
-    
-    # Update and draw bots
-    for bot in bots:
-        bot.step(dots)
-        pygame.draw.circle(screen, bot.color, (int(bot.x), int(bot.y)), 6)
-        if bot.is_trailing and bot.trail_target:
-            draw_dashed_line(screen, (0, 0, 255), (bot.x, bot.y), bot.trail_target, width=1, dash_length=6)
-    
-    pygame.display.flip()
-    clock.tick(60)
-    
-    frame_counter += 1
-    if frame_counter % 300 == 0:  # Every 5 seconds
+def main():
+    import pygame
+    from x_botsTrailerCircle_vec import VecSwarm
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Trailer circle (V: engine obj)')
+    clock = pygame.time.Clock()
+    use_vec = False
+
+    bots = []
+    trail = TrailCache(bots)
+    bots.extend(Bot(random.randint(0, WIDTH), random.randint(0, HEIGHT),
+                    (random.randint(100,255), random.randint(100,255), random.randint(100,255)),
+                    bots, trail)
+                for _ in range(BOT_COUNT))
+
+    swarm = VecSwarm(len(bots))
+    dots = spawn_dots()
+    running = True
+    frame_counter = 0
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_v:
+                use_vec = not use_vec
+                pygame.display.set_caption(f"Trailer circle (V: engine {'vec' if use_vec else 'obj'})")
+
+        screen.fill((0, 0, 0))
+
+        # Draw dots
+        for dx, dy in dots:
+            pygame.draw.circle(screen, (0, 255, 0), (int(dx), int(dy)), 5)
+
+        # Update and draw bots
+        if use_vec:
+            swarm.load(bots)
+            swarm.step(dots)
+            swarm.store(bots)
+        else:
+            trail.update()
+            for bot in bots:
+                bot.step(dots)
         for bot in bots:
-            bot.learn()
-            bot.mutate_sequence()
-        if len(dots) < DOT_COUNT:
-            dots.extend(spawn_dots()[:DOT_COUNT - len(dots)])
+            pygame.draw.circle(screen, bot.color, (int(bot.x), int(bot.y)), 6)
+            if bot.is_trailing and bot.trail_target:
+                draw_dashed_line(screen, (0, 0, 255), (bot.x, bot.y), bot.trail_target, width=1, dash_length=6)
+
+        pygame.display.flip()
+        clock.tick(60)
+
+        frame_counter += 1
+        if frame_counter % 300 == 0:  # Every 5 seconds
+            for bot in bots:
+                bot.learn()
+                bot.mutate_sequence()
+            if len(dots) < DOT_COUNT:
+                dots.extend(spawn_dots()[:DOT_COUNT - len(dots)])
+
+    pygame.quit()
 
-pygame.quit()
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""
+x_botsTrailerCircle_vec.py
+
+Vektoroitu (struct-of-arrays) populaatiomoottori x_botsTrailerCircle-boteille.
+- x, y, angle, energy, cmd_index, komentojonot (n x QUEUE_LEN), bounty_count ja
+  TRAIL-kohteet ovat NumPy-taulukoita koko parvelle
+- VecSwarm.step ajaa yhden komennon jokaiselle botille maskatuilla
+  taulukko-operaatioilla komentotyypeittäin (FWD, RT, LT, FWD_UNTIL, TRAIL)
+- Pisteet (dots) ovat yhteisiä: ruudun alussa pistettä koskettavat liikkeet
+  ratkaistaan bottien järjestyksessä yksi kerrallaan (syöty piste poistuu
+  myöhemmiltä), muut kaikki kerralla. Koska ruudun aikana pisteitä vain poistuu,
+  tulos on sama kuin olio-botit peräkkäin ajettuna
+- TRAIL käyttää ruudun alun TrailCachea ja FWD_UNTIL analyyttista ray marchia
+  (RAY_MARCH = True -semantiikka); x_botsTrailerCircle.Bot on referenssi
+
+Käyttö:
+    import x_botsTrailerCircle as tc, x_botsTrailerCircle_vec as tv
+    swarm = tv.VecSwarm.from_bots(bots)
+    swarm.step(dots)              # yksi ruutu; learn_and_mutate() 300 ruudun välein
+    swarm.store(bots)
+
+python x_botsTrailerCircle_vec.py  -> ajaa pariteettitarkistuksen olio-botteja vastaan
+"""
+
+import copy
+import random
+
+import numpy as np
+
+import x_botsTrailerCircle as tc
+from x_botsTrailerCircle import (BOT_SPEED, COMMANDS, DOT_ENERGY, DOT_HIT_RADIUS, EDGE, FWD, FWD_UNTIL,
+                                 HEIGHT, LT, MOVE_COST, PREF_INCREASE, QUEUE_LEN, RT, TRAIL,
+                                 TRAIL_REACH_DIST, TURN_ANGLE, WIDTH)
+
+
+def _dot_arrays(dots):
+    if isinstance(dots, tc.DotField):
+        xs, ys, _ = dots.grid()
+        return xs, ys
+    return (np.array([d[0] for d in dots], dtype=float).reshape(-1),
+            np.array([d[1] for d in dots], dtype=float).reshape(-1))
+
+
+def _inside(x0, y0, dx, dy, j):
+    x, y = x0 + j * dx, y0 + j * dy
+    return (EDGE <= x) & (x <= WIDTH - EDGE) & (EDGE <= y) & (y <= HEIGHT - EDGE)
+
+
+def edge_steps(x0, y0, dx, dy):
+    # tc.edge_steps riveittäin
+    lo = np.full(len(x0), -np.inf)
+    hi = np.full(len(x0), np.inf)
+    blocked = np.zeros(len(x0), dtype=bool)
+    for p, d, size in ((x0, dx, WIDTH), (y0, dy, HEIGHT)):
+        zero = d == 0
+        blocked |= zero & ~((EDGE <= p) & (p <= size - EDGE))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a, b = (EDGE - p) / d, (size - EDGE - p) / d
+        lo = np.where(zero, lo, np.maximum(lo, np.minimum(a, b)))
+        hi = np.where(zero, hi, np.minimum(hi, np.maximum(a, b)))
+    ok = ~blocked & ~(lo > 1) & _inside(x0, y0, dx, dy, 1)
+    k = np.where(ok, np.maximum(1, np.floor(np.where(ok, hi, 1))), 0).astype(np.int64)
+    m = ok & (k > 1) & ~_inside(x0, y0, dx, dy, k)
+    while m.any():
+        k[m] -= 1
+        m &= (k > 1) & ~_inside(x0, y0, dx, dy, k)
+    m = ok & _inside(x0, y0, dx, dy, k + 1)
+    while m.any():
+        k[m] += 1
+        m &= _inside(x0, y0, dx, dy, k + 1)
+    return k
+
+
+def energy_steps(energy, cost=MOVE_COST):
+    # tc.energy_steps riveittäin
+    k = np.maximum(1, np.ceil(energy / cost)).astype(np.int64)
+    m = (k > 1) & (energy - (k - 1) * cost <= 0)
+    while m.any():
+        k[m] -= 1
+        m &= (k > 1) & (energy - (k - 1) * cost <= 0)
+    m = energy - k * cost > 0
+    while m.any():
+        k[m] += 1
+        m &= energy - k * cost > 0
+    return np.where(energy > 0, k, 0)
+
+
+def first_dot_steps(qx, qy, x0, y0, dx, dy, max_steps):
+    # tc.first_dot_step riveittäin (rivit x pisteet); 0 = ei osumaa
+    hit_at = np.zeros(len(x0), dtype=np.int64)
+    if not len(qx) or not len(x0):
+        return hit_at
+    x0, y0, dx, dy = x0[:, None], y0[:, None], dx[:, None], dy[:, None]
+    vx, vy = x0 - qx, y0 - qy
+    a = dx * dx + dy * dy
+    b = 2 * (vx * dx + vy * dy)
+    c = vx * vx + vy * vy - DOT_HIT_RADIUS ** 2
+    disc = b * b - 4 * a * c
+    ok = disc > 0
+    j = np.maximum(1, np.floor((-b - np.sqrt(np.where(ok, disc, 0))) / (2 * a)) + 1)
+    best = np.full(len(hit_at), np.inf)
+    limit = max_steps[:, None]
+    for cand in (j - 1, j, j + 1):
+        px, py = x0 + cand * dx, y0 + cand * dy
+        hit = ok & (cand >= 1) & (cand <= limit) & ((px - qx) ** 2 + (py - qy) ** 2 < DOT_HIT_RADIUS ** 2)
+        best = np.minimum(best, np.where(hit, cand, np.inf).min(axis=1))
+    found = np.isfinite(best)
+    hit_at[found] = best[found]
+    return hit_at
+
+
+class VecSwarm:
+    def __init__(self, n):
+        self.n = n
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.angle = np.zeros(n)
+        self.energy = np.zeros(n)
+        self.cmd_index = np.zeros(n, dtype=np.int64)
+        self.queue = np.zeros((n, QUEUE_LEN), dtype=np.int8)
+        self.bounty_count = np.zeros(n, dtype=np.int64)
+        self.trail_x = np.zeros(n)
+        self.trail_y = np.zeros(n)
+        self.has_trail = np.zeros(n, dtype=bool)
+        self.is_trailing = np.zeros(n, dtype=bool)
+        self.preferences = [{} for _ in range(n)]  # sekvenssi -> paino kuten Bot.preferences
+        self.trail = tc.TrailCache()
+
+    @classmethod
+    def from_bots(cls, bots):
+        swarm = cls(len(bots))
+        swarm.load(bots)
+        return swarm
+
+    def load(self, bots):
+        if len(bots) != self.n:
+            raise ValueError(f'swarm has {self.n} rows, got {len(bots)} bots')
+        for i, b in enumerate(bots):
+            if len(b.command_queue) != QUEUE_LEN:
+                raise ValueError(f'bot {i}: command queue length {len(b.command_queue)} != {QUEUE_LEN}')
+            self.queue[i] = b.command_queue
+            self.preferences[i] = dict(b.preferences)
+            self.has_trail[i] = bool(b.trail_target)
+            if b.trail_target:
+                self.trail_x[i], self.trail_y[i] = b.trail_target
+        self.x[:] = [b.x for b in bots]
+        self.y[:] = [b.y for b in bots]
+        self.angle[:] = [b.angle for b in bots]
+        self.energy[:] = [b.energy for b in bots]
+        self.cmd_index[:] = [b.cmd_index for b in bots]
+        self.bounty_count[:] = [b.bounty_count for b in bots]
+        self.is_trailing[:] = [b.is_trailing for b in bots]
+
+    def store(self, bots):
+        cols = zip(self.x.tolist(), self.y.tolist(), self.angle.tolist(), self.energy.tolist(),
+                   self.cmd_index.tolist(), self.queue.tolist(), self.bounty_count.tolist(),
+                   self.has_trail.tolist(), self.trail_x.tolist(), self.trail_y.tolist(),
+                   self.is_trailing.tolist(), self.preferences)
+        for b, (x, y, angle, energy, idx, queue, bounty, has, tx, ty, trailing, prefs) in zip(bots, cols):
+            b.x, b.y, b.angle, b.energy = x, y, angle, energy
+            b.cmd_index, b.command_queue, b.bounty_count = idx, queue, bounty
+            b.trail_target = (tx, ty) if has else None
+            b.is_trailing = trailing
+            b.preferences = prefs
+
+    # ---------------- One frame ----------------
+    def step(self, dots):
+        # kaikki botit yhden komennon (Bot.step jokaiselle järjestyksessä)
+        self.trail.load(self.energy.copy(), self.x.copy(), self.y.copy())
+        live = np.flatnonzero(self.energy > 0)
+        self.is_trailing[live] = False
+        cmd = self.queue[live, self.cmd_index[live]]
+        self.cmd_index[live] = (self.cmd_index[live] + 1) % QUEUE_LEN
+
+        m = live[cmd == RT]
+        self.angle[m] += TURN_ANGLE
+        self.energy[m] -= MOVE_COST
+        m = live[cmd == LT]
+        self.angle[m] -= TURN_ANGLE
+        self.energy[m] -= MOVE_COST
+
+        movers = np.sort(np.concatenate([live[cmd == FWD], self._trail(live[cmd == TRAIL])]))
+        qx, qy = _dot_arrays(dots)
+        eaters, eat_xy = self._move_forward(movers, qx, qy)
+        marchers, march = self._fwd_until(live[cmd == FWD_UNTIL], qx, qy)
+        self._resolve_dots(dots, eaters, eat_xy, marchers, march)
+
+    def _trail(self, rows):
+        # uudet kohteet ruudun alun tilanteesta, sitten kohti kohdetta; palauttaa liikkuvat rivit
+        need = rows[~self.has_trail[rows]]
+        if len(need):
+            tx, ty, found = self.trail.targets(need, self.energy[need])
+            self.trail_x[need[found]], self.trail_y[need[found]] = tx[found], ty[found]
+            self.has_trail[need] = found
+        rows = rows[self.has_trail[rows]]
+        self.is_trailing[rows] = True
+        dx, dy = self.trail_x[rows] - self.x[rows], self.trail_y[rows] - self.y[rows]
+        reached = np.hypot(dx, dy) < TRAIL_REACH_DIST
+        self.has_trail[rows[reached]] = False
+        go = ~reached
+        self.angle[rows[go]] = np.degrees(np.arctan2(dy[go], dx[go]))
+        return rows[go]
+
+    def _move_forward(self, rows, qx, qy):
+        # Bot._move_forward: vapaat liikkuvat heti; pistettä koskettavat -> (rivit, uudet paikat)
+        rad = np.radians(self.angle[rows])
+        nx = self.x[rows] + BOT_SPEED * np.cos(rad)
+        ny = self.y[rows] + BOT_SPEED * np.sin(rad)
+        ok = ~((nx < EDGE) | (nx > WIDTH - EDGE) | (ny < EDGE) | (ny > HEIGHT - EDGE))
+        touch = np.zeros(len(rows), dtype=bool)
+        if len(qx):
+            touch = (np.hypot(nx[:, None] - qx, ny[:, None] - qy) < DOT_HIT_RADIUS).any(axis=1)
+        free = ok & ~touch
+        r = rows[free]
+        self.x[r], self.y[r] = nx[free], ny[free]
+        self.energy[r] -= MOVE_COST
+        eat = ok & touch
+        return rows[eat], (nx[eat], ny[eat])
+
+    def _fwd_until(self, rows, qx, qy):
+        # Bot._fwd_until_march; pisteen rajoittamat -> (rivit, (dx, dy, raja ilman pisteitä))
+        rad = np.radians(self.angle[rows])
+        dx, dy = BOT_SPEED * np.cos(rad), BOT_SPEED * np.sin(rad)
+        x0, y0 = self.x[rows], self.y[rows]
+        limit = np.minimum(edge_steps(x0, y0, dx, dy), energy_steps(self.energy[rows]))
+        hit = first_dot_steps(qx, qy, x0, y0, dx, dy, limit)
+        k = np.where(hit > 0, hit - 1, limit)
+        go = (k > 0) & (hit == 0)
+        r = rows[go]
+        self.x[r], self.y[r] = x0[go] + k[go] * dx[go], y0[go] + k[go] * dy[go]
+        self.energy[r] -= k[go] * MOVE_COST
+        dot = hit > 0
+        return rows[dot], (dx[dot], dy[dot], limit[dot], k[dot])
+
+    def _resolve_dots(self, dots, eaters, eat_xy, marchers, march):
+        # pistettä koskettavat rivit bottien järjestyksessä; aiemmin syöty piste ei enää pysäytä
+        jobs = sorted([(int(r), 0, i) for i, r in enumerate(eaters.tolist())] +
+                      [(int(r), 1, i) for i, r in enumerate(marchers.tolist())])
+        eaten = 0
+        for row, kind, i in jobs:
+            if kind == 0:
+                nx, ny = float(eat_xy[0][i]), float(eat_xy[1][i])
+                for dx, dy in dots:
+                    if np.hypot(nx - dx, ny - dy) < DOT_HIT_RADIUS:
+                        self.energy[row] += DOT_ENERGY
+                        self.bounty_count[row] += 1
+                        dots.remove([dx, dy])
+                        eaten += 1
+                        break
+                else:
+                    self.x[row], self.y[row] = nx, ny
+                    self.energy[row] -= MOVE_COST
+            else:
+                dx, dy, limit, k = (float(march[0][i]), float(march[1][i]), int(march[2][i]), int(march[3][i]))
+                x0, y0 = float(self.x[row]), float(self.y[row])
+                if eaten:
+                    hit = tc.first_dot_step(dots, x0, y0, dx, dy, limit)
+                    k = limit if hit is None else hit - 1
+                if k > 0:
+                    self.x[row], self.y[row] = x0 + k * dx, y0 + k * dy
+                    self.energy[row] -= k * MOVE_COST
+
+    # ---------------- Learning (300 ruudun välein) ----------------
+    def learn_and_mutate(self):
+        # Bot.learn + Bot.mutate_sequence jokaiselle botille järjestyksessä (samat random-kutsut)
+        for i in range(self.n):
+            prefs = self.preferences[i]
+            if self.bounty_count[i] > 0:
+                seq = tuple(self.queue[i].tolist())
+                if seq not in prefs:
+                    prefs[seq] = 1.0
+                prefs[seq] *= (1.0 + PREF_INCREASE)
+            self.bounty_count[i] = 0
+            if random.random() < 0.2:
+                self.queue[i] = [random.choice(COMMANDS) for _ in range(QUEUE_LEN)]
+            else:
+                sequences = list(prefs.keys())
+                weights = np.array([prefs[s] for s in sequences])
+                weights /= weights.sum()
+                self.queue[i] = random.choices(sequences, weights=weights)[0]
+            self.cmd_index[i] = 0
+
+
+def max_difference(bots, swarm):
+    # suurin ero olio-bottien ja VecSwarmin välillä (0.0 = identtiset, inf = diskreetti ero)
+    diff = 0.0
+    for name in ('x', 'y', 'angle', 'energy'):
+        ref = np.array([getattr(b, name) for b in bots], dtype=float)
+        diff = max(diff, float(np.max(np.abs(ref - getattr(swarm, name)), initial=0.0)))
+    same = (np.array_equal([b.cmd_index for b in bots], swarm.cmd_index)
+            and np.array_equal([b.command_queue for b in bots], swarm.queue)
+            and np.array_equal([b.bounty_count for b in bots], swarm.bounty_count)
+            and [b.trail_target is not None for b in bots] == swarm.has_trail.tolist()
+            and [b.preferences for b in bots] == swarm.preferences)
+    return diff if same else float('inf')
+
+
+def parity_check(seed=1, n_bots=tc.BOT_COUNT, frames=900):
+    # olio-botit (TrailCache + RAY_MARCH) ja VecSwarm rinnakkain; palauttaa suurimman eron
+    random.seed(seed)
+    bots = []
+    trail = tc.TrailCache(bots)
+    bots.extend(tc.Bot(random.randint(0, WIDTH), random.randint(0, HEIGHT), (255, 255, 255), bots, trail)
+                for _ in range(n_bots))
+    dots = tc.spawn_dots()
+    swarm = VecSwarm.from_bots(bots)
+    vec_dots = tc.DotField(copy.deepcopy(list(dots)))
+    worst = 0.0
+    for frame in range(1, frames + 1):
+        trail.update()
+        for bot in bots:
+            bot.step(dots)
+        swarm.step(vec_dots)
+        if frame % 300 == 0:
+            state = random.getstate()
+            for bot in bots:
+                bot.learn()
+                bot.mutate_sequence()
+            random.setstate(state)
+            swarm.learn_and_mutate()
+            if len(dots) < tc.DOT_COUNT:
+                new = tc.spawn_dots()[:tc.DOT_COUNT - len(dots)]
+                dots.extend(copy.deepcopy(new))
+                vec_dots.extend(new)
+        if list(dots) != list(vec_dots):
+            return float('inf')
+        worst = max(worst, max_difference(bots, swarm))
+    return worst
+
+
+if __name__ == '__main__':
+    # pariteetti on tarkka: mikä tahansa ero lopettaa nollasta poikkeavalla paluuarvolla
+    failed = []
+    for seed in range(3):
+        diff = parity_check(seed)
+        print(f'seed {seed}: max difference {diff:.3g}')
+        if diff != 0:
+            failed.append(seed)
+    if failed:
+        raise SystemExit(f'parity broken for seeds {failed}')